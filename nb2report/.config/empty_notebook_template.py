@@ -0,0 +1,11 @@
+# %%
+"""
+
+Enter your code here =)
+
+"""
+
+# %% [markdown]
+# # Asserts
+#
+# Note: automatic tests will check all asserts to be true
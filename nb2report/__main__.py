@@ -0,0 +1,9 @@
+# -*- coding: utf-8 -*-
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+
+import sys
+
+from nb2report.cli import main
+
+
+sys.exit(main())
@@ -0,0 +1,274 @@
+# -*- coding: utf-8 -*-
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+
+import io
+import os
+
+from pathlib import PurePosixPath
+
+
+ARCHIVE_SUFFIXES = ('.zip', '.tar', '.tar.gz', '.tgz')
+HANDLES = {}
+
+
+def is_archive(path):
+    """ Check if some path is a supported scaffold archive.
+
+    >>> is_archive('scaffold.tar.gz')
+    True
+
+    Parameters
+    ----------
+    path: str
+        Path to check.
+
+    Returns
+    -------
+    bool
+        True for zip and (gzipped) tar files.
+    """
+    return str(path).endswith(ARCHIVE_SUFFIXES)
+
+
+def _normalize(name):
+    """ Normalize an archive member name.
+
+    >>> _normalize('./A/b.ipynb')
+    'A/b.ipynb'
+
+    Parameters
+    ----------
+    name: str
+        Member name, as stored in the archive.
+
+    Returns
+    -------
+    str
+        Member name, as a '/' separated path without any leading './'.
+    """
+    return name[2:] if name.startswith('./') else name
+
+
+def _get_handle(path):
+    """ Get the handle of this process on some archive.
+
+    Handles are opened once per process and kept for further reads. Worker
+    processes never reuse the handle of the process they were forked from.
+
+    Zip archives are listed from their central directory. Tar archives have
+    none, so their member headers are read once and indexed by name.
+
+    Parameters
+    ----------
+    path: str
+        Path to the archive.
+
+    Returns
+    -------
+    zipfile.ZipFile or tarfile.TarFile, dict
+        Archive handle.
+        File members by normalized name.
+    """
+    import tarfile
+    import zipfile
+
+    pid, handle, members = HANDLES.get(path, (None, None, None))
+    if pid != os.getpid():
+        if path.endswith('.zip'):
+            handle = zipfile.ZipFile(path)
+            members = {_normalize(x.filename): x
+                       for x in handle.infolist() if not x.is_dir()}
+        else:
+            handle = tarfile.open(path)
+            members = {_normalize(x.name): x
+                       for x in handle.getmembers() if x.isfile()}
+        HANDLES[path] = (os.getpid(), handle, members)
+
+    return handle, members
+
+
+def _iter_names(path):
+    """ Iterate over the names of the file members of some archive.
+
+    Parameters
+    ----------
+    path: str
+        Path to the archive.
+
+    Returns
+    -------
+    iterable(str)
+        Normalized member names, in archive order.
+    """
+    return iter(_get_handle(path)[1])
+
+
+class Member(object):
+    """ Path-like reference to a member of a scaffold archive.
+
+    Members support the path operations the reporting engine relies on,
+    joining, `relative_to`, `name`, `suffix` and `is_file`, and are opened
+    through `open_file`. They only hold the archive path and the member
+    name, so they are cheap to send to worker processes.
+    """
+    __slots__ = ('archive', 'member')
+
+    def __init__(self, archive, member=''):
+        self.archive = str(archive)
+        self.member = member.strip('/')
+
+    def __truediv__(self, other):
+        other = str(other)
+        return Member(self.archive,
+                      self.member + '/' + other if self.member else other)
+
+    def __eq__(self, other):
+        return isinstance(other, Member) \
+            and (self.archive, self.member) == (other.archive, other.member)
+
+    def __hash__(self):
+        return hash((self.archive, self.member))
+
+    def __str__(self):
+        return os.path.join(self.archive, self.member)
+
+    def __repr__(self):
+        return 'Member({!r}, {!r})'.format(self.archive, self.member)
+
+    @property
+    def name(self):
+        return PurePosixPath(self.member).name
+
+    @property
+    def suffix(self):
+        return PurePosixPath(self.member).suffix
+
+    def relative_to(self, other):
+        """ Get the path of this member relative to another one.
+
+        Parameters
+        ----------
+        other: Member
+            Ancestor member, as the scaffold root.
+
+        Returns
+        -------
+        PurePosixPath
+            Relative path.
+        """
+        return PurePosixPath(self.member).relative_to(other.member)
+
+    def is_file(self):
+        """ Check if this member is a file of the archive.
+
+        Returns
+        -------
+        bool
+            True if the archive holds a file member with this name.
+        """
+        return self.member in _get_handle(self.archive)[1]
+
+    def open(self, mode='r'):
+        """ Open the member for reading, without extracting it.
+
+        Parameters
+        ----------
+        mode: str
+            'r' to read text or 'rb' to read bytes.
+
+        Returns
+        -------
+        file
+            Member file object.
+        """
+        import zipfile
+
+        handle, members = _get_handle(self.archive)
+        if isinstance(handle, zipfile.ZipFile):
+            raw = handle.open(members[self.member])
+        else:
+            raw = handle.extractfile(members[self.member])
+
+        return raw if 'b' in mode else io.TextIOWrapper(raw, encoding='utf-8')
+
+
+def open_file(f, mode='r'):
+    """ Open a file or an archive member for reading.
+
+    Parameters
+    ----------
+    f: str, Path or Member
+        Path to the file, or archive member.
+    mode: str
+        'r' to read text or 'rb' to read bytes.
+
+    Returns
+    -------
+    file
+        File object.
+    """
+    if isinstance(f, Member):
+        return f.open(mode)
+
+    return open(f, mode)
+
+
+def find_root(path, prefix=''):
+    """ Get the scaffold root of some archive.
+
+    Scaffolds can be archived from their root directory or from above it,
+    keeping some leading directories, as 'framework/version/', in every
+    member name. In the latter case the prefix is the scaffold root.
+
+    Parameters
+    ----------
+    path: str
+        Path to the archive.
+    prefix: str
+        Leading directories of the scaffold root, if archived from above it.
+
+    Returns
+    -------
+    Member
+        Scaffold root.
+    """
+    prefix = prefix.strip('/')
+    if prefix and all(x.startswith(prefix + '/') for x in _iter_names(path)):
+        return Member(path, prefix)
+
+    return Member(path)
+
+
+def list_notebooks(root, suffixes):
+    """ List the notebooks of an archived scaffold.
+
+    Hidden members, or members under hidden directories, and python files
+    which are not percent-format scripts are skipped.
+
+    Parameters
+    ----------
+    root: Member
+        Scaffold root, as returned by `find_root`.
+    suffixes: tuple(str)
+        Notebook files suffixes.
+
+    Returns
+    -------
+    list(str)
+        Notebook paths, relative to the scaffold root.
+    """
+    from nb2report.percent import is_script
+
+    start = len(root.member) + 1 if root.member else 0
+    notebooks = []
+
+    for name in _iter_names(root.archive):
+        if root.member and not name.startswith(root.member + '/'):
+            continue
+        name = name[start:]
+        if name.endswith(suffixes) \
+                and not any(x.startswith('.') for x in name.split('/')) \
+                and (not name.endswith('.py') or is_script(root / name)):
+            notebooks.append(name)
+
+    return notebooks
@@ -0,0 +1,438 @@
+# -*- coding: utf-8 -*-
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+
+import argparse
+import json
+import logging
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from pathlib import Path
+from nb2report import reporting, scaffolding
+from nb2report.cell_utils import classify_cells
+
+
+BENCHMARK_FORMAT = 1
+BENCHMARK_SUITES = ('materialize', 'pipeline', 'startup')
+PIPELINE_PHASES = ('scaffold', 'discovery', 'load', 'run_cell', 'render')
+STARTUP_COMMANDS = (
+    ('--help',),
+    ('scaffold', '--help'),
+    ('run', '--help'),
+    ('render', '--help'),
+)
+STARTUP_TARGET_SECONDS = 0.15
+
+
+def _copyfile_notebooks(current_path, notebooks):
+    """ Generate notebooks copying the template file, one by one.
+
+    This is how notebooks were generated before materialize strategies were
+    available. It is kept as the baseline of the benchmark.
+
+    Parameters
+    ----------
+    current_path: Path
+        Root testing path.
+    notebooks: list(str)
+        Notebook paths, relative to the root testing path.
+    """
+    for notebook in notebooks:
+        shutil.copyfile(str(scaffolding.TEMPLATE_NOTEBOOK_PATH),
+                        str(current_path / notebook))
+
+
+def bench_materialize(notebooks=10000, dirs=100, threads=None, repeat=3):
+    """ Compare the notebook materialize strategies.
+
+    Each strategy generates the same notebooks, spread over some directories,
+    in a new temporary directory on every repetition.
+
+    Parameters
+    ----------
+    notebooks: int
+        Number of notebooks to generate.
+    dirs: int
+        Number of directories to spread the notebooks over.
+    threads: int
+        Number of threads creating notebooks. None to let the pool decide.
+    repeat: int
+        Number of repetitions of each strategy. The best one is kept.
+
+    Returns
+    -------
+    list(dict)
+        Benchmark result of each strategy.
+    """
+    plan = dict(
+        dirs=['dir%d' % i for i in range(dirs)],
+        notebooks=['dir%d/nb%d.ipynb' % (i % dirs, i)
+                   for i in range(notebooks)]
+    )
+    strategies = [('copyfile', _copyfile_notebooks)] + [
+        (x, lambda y, z, strategy=x: scaffolding._generate_notebooks(
+            y, z, strategy=strategy, threads=threads))
+        for x in scaffolding.MATERIALIZE_STRATEGIES
+    ]
+
+    results = []
+    for name, generate in strategies:
+        durations = []
+        for _ in range(repeat):
+            root = Path(tempfile.mkdtemp(prefix='nb2report-bench-'))
+            try:
+                scaffolding._materialize(dict(dirs=plan['dirs'], notebooks=[]),
+                                         root)
+                start = time.perf_counter()
+                generate(root, plan['notebooks'])
+                durations.append(time.perf_counter() - start)
+            finally:
+                shutil.rmtree(str(root))
+
+        results.append(dict(
+            format=BENCHMARK_FORMAT,
+            benchmark='materialize',
+            strategy=name,
+            notebooks=notebooks,
+            threads=threads,
+            seconds=min(durations),
+            notebooks_per_second=notebooks / min(durations)
+        ))
+
+    return results
+
+
+def synthesize_schema(depth=3, fanout=4, notebooks_per_leaf=10):
+    """ Synthesize a markdown tests schema of some shape.
+
+    Every title has `fanout` subtitles down to `depth` levels, and every
+    title at the last level lists `notebooks_per_leaf` notebooks:
+
+        # Section 0
+        ## Section 0.0
+        * Notebook 0
+
+    Parameters
+    ----------
+    depth: int
+        Number of title levels.
+    fanout: int
+        Number of subtitles of each title.
+    notebooks_per_leaf: int
+        Number of notebooks listed at each title of the last level.
+
+    Returns
+    -------
+    generator(str)
+        Markdown schema lines.
+    """
+    def _titles(prefix, level):
+        for i in range(fanout):
+            section = prefix + [str(i)]
+            yield '{} Section {}\n'.format('#' * level, '.'.join(section))
+            if level < depth:
+                yield from _titles(section, level + 1)
+            else:
+                for j in range(notebooks_per_leaf):
+                    yield '* Notebook {}\n'.format(j)
+
+    return _titles([], 1)
+
+
+def synthesize_notebook(asserts=10, output_size=80):
+    """ Synthesize a test notebook.
+
+    The notebook is the template notebook followed by some assert cells.
+    Each assert cell holds a stored output of the given size, as notebooks
+    saved after being run do.
+
+    Parameters
+    ----------
+    asserts: int
+        Number of assert cells.
+    output_size: int
+        Number of characters of the stored output of each assert cell.
+
+    Returns
+    -------
+    dict
+        iPython notebook representation.
+    """
+    notebook = json.loads(scaffolding._get_template(
+        scaffolding.TEMPLATE_NOTEBOOK_PATH))
+    notebook['cells'].extend(
+        dict(cell_type='code', execution_count=i + 1, metadata={},
+             source=['True'],
+             outputs=[dict(output_type='stream', name='stdout',
+                           text=['x' * output_size])])
+        for i in range(asserts)
+    )
+    return notebook
+
+
+def _bench_phases(root, depth, fanout, notebooks_per_leaf, asserts,
+                  output_size):
+    """ Time every phase of the pipeline once, on a synthetic scaffold.
+
+    Parameters
+    ----------
+    root: Path
+        Empty directory where the scaffold is created.
+    depth: int
+        Number of title levels of the schema.
+    fanout: int
+        Number of subtitles of each title.
+    notebooks_per_leaf: int
+        Number of notebooks of each leaf directory.
+    asserts: int
+        Number of assert cells of each notebook.
+    output_size: int
+        Output size, in characters, of each assert cell.
+
+    Returns
+    -------
+    dict
+        Seconds and number of processed items by phase.
+    """
+    timings = {}
+
+    def _time(phase, items, func, *args):
+        start = time.perf_counter()
+        func(*args)
+        timings[phase] = (time.perf_counter() - start, items)
+
+    schema_path = root / 'schema.md'
+    with open(str(schema_path), 'w') as f:
+        f.writelines(synthesize_schema(depth, fanout, notebooks_per_leaf))
+
+    scaffolding.BASE_DIR = str(root)
+    _time('scaffold', fanout ** depth * notebooks_per_leaf,
+          scaffolding.create, 'bench', 'synthetic', str(schema_path))
+
+    current_path = root / 'bench' / 'synthetic'
+    scaffold = []
+    _time('discovery', fanout ** depth * notebooks_per_leaf,
+          reporting._explore_scaffolding, current_path, scaffold)
+
+    notebooks = [x['path'] for x in scaffold if x['notebook']]
+    content = json.dumps(synthesize_notebook(asserts, output_size))
+    for notebook in notebooks:
+        with open(str(notebook), 'w') as f:
+            f.write(content)
+
+    _time('load', len(notebooks), lambda: [
+        list(classify_cells(reporting._load_notebook(str(x))['cells']))
+        for x in notebooks
+    ])
+
+    code = "print('x' * {}); True".format(output_size)
+    reporting._get_interpreter()
+    _time('run_cell', asserts, lambda: [
+        reporting._run_cell(code) for _ in range(asserts)
+    ])
+
+    results = dict.fromkeys(notebooks, 'OK')
+    del reporting.REPORTING_ITEMS[:]
+    try:
+        _time('render', len(scaffold), lambda: (
+            reporting._report_scaffolding(scaffold, results),
+            reporting._render_summary('bench synthetic',
+                                      str(root / 'summary.html'))
+        ))
+    finally:
+        del reporting.REPORTING_ITEMS[:]
+
+    return timings
+
+
+def bench_pipeline(depth=3, fanout=4, notebooks_per_leaf=10, asserts=10,
+                   output_size=80, repeat=3):
+    """ Time the phases of the testing pipeline on a synthetic scaffold.
+
+    The scaffold is synthesized from a schema of the given shape, in a new
+    temporary directory on every repetition, and these phases are timed on
+    their own:
+
+        scaffold: scaffolding.create from the schema.
+        discovery: traversal of the scaffold.
+        load: loading and classifying the cells of every notebook.
+        run_cell: executing `asserts` cells of `output_size` characters of
+            output, which is the overhead paid by every cell.
+        render: reporting every scaffold item and rendering the summary.
+
+    Parameters
+    ----------
+    depth: int
+        Number of title levels of the schema.
+    fanout: int
+        Number of subtitles of each title.
+    notebooks_per_leaf: int
+        Number of notebooks of each leaf directory.
+    asserts: int
+        Number of assert cells of each notebook.
+    output_size: int
+        Output size, in characters, of each assert cell.
+    repeat: int
+        Number of repetitions. The best time of each phase is kept.
+
+    Returns
+    -------
+    list(dict)
+        Benchmark result of each phase, in pipeline order.
+    """
+    params = dict(depth=depth, fanout=fanout,
+                  notebooks_per_leaf=notebooks_per_leaf, asserts=asserts,
+                  output_size=output_size)
+    durations = {x: [] for x in PIPELINE_PHASES}
+    items = {}
+    base_dir = scaffolding.BASE_DIR
+
+    for _ in range(repeat):
+        root = Path(tempfile.mkdtemp(prefix='nb2report-bench-'))
+        try:
+            timings = _bench_phases(root, **params)
+        finally:
+            scaffolding.BASE_DIR = base_dir
+            shutil.rmtree(str(root))
+
+        for phase, (seconds, count) in timings.items():
+            durations[phase].append(seconds)
+            items[phase] = count
+
+    return [
+        dict(format=BENCHMARK_FORMAT,
+             benchmark='pipeline',
+             phase=phase,
+             items=items[phase],
+             seconds=min(durations[phase]),
+             seconds_per_item=min(durations[phase]) / max(items[phase], 1),
+             python=platform.python_version(),
+             **params)
+        for phase in PIPELINE_PHASES
+    ]
+
+
+def bench_startup(repeat=3):
+    """ Time the startup of the non-executing nb2report commands.
+
+    Every command runs on a new interpreter, so the time includes the
+    interpreter startup and every import the command pays for.
+
+    Parameters
+    ----------
+    repeat: int
+        Number of repetitions of each command. The best one is kept.
+
+    Returns
+    -------
+    list(dict)
+        Benchmark result of each command, holding whether it is within
+        STARTUP_TARGET_SECONDS.
+    """
+    results = []
+    for command in STARTUP_COMMANDS:
+        durations = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            subprocess.run([sys.executable, '-m', 'nb2report'] + list(command),
+                           stdout=subprocess.DEVNULL, check=True)
+            durations.append(time.perf_counter() - start)
+
+        results.append(dict(
+            format=BENCHMARK_FORMAT,
+            benchmark='startup',
+            command=' '.join(command),
+            seconds=min(durations),
+            target_seconds=STARTUP_TARGET_SECONDS,
+            within_target=min(durations) <= STARTUP_TARGET_SECONDS,
+            python=platform.python_version()
+        ))
+
+    return results
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(prog='Benchmark nb2report')
+    parser.add_argument('--suite',
+                        action='append',
+                        choices=BENCHMARK_SUITES,
+                        help='Benchmark suite to run. It can be given several '
+                             'times. All suites are run by default.')
+
+    parser.add_argument("-n", '--notebooks',
+                        type=int,
+                        default=10000,
+                        help='Number of notebooks to generate.')
+
+    parser.add_argument('--dirs',
+                        type=int,
+                        default=100,
+                        help='Number of directories to spread notebooks over.')
+
+    parser.add_argument('--threads',
+                        type=int,
+                        default=None,
+                        help='Number of threads creating notebooks.')
+
+    parser.add_argument('--depth',
+                        type=int,
+                        default=3,
+                        help='Number of title levels of the synthetic schema.')
+
+    parser.add_argument('--fanout',
+                        type=int,
+                        default=4,
+                        help='Number of subtitles of each title.')
+
+    parser.add_argument('--notebooks-per-leaf',
+                        type=int,
+                        default=10,
+                        help='Number of notebooks of each leaf directory.')
+
+    parser.add_argument('--asserts',
+                        type=int,
+                        default=10,
+                        help='Number of assert cells of each notebook.')
+
+    parser.add_argument('--output-size',
+                        type=int,
+                        default=80,
+                        help='Output size, in characters, of each cell.')
+
+    parser.add_argument('--repeat',
+                        type=int,
+                        default=3,
+                        help='Number of repetitions of each benchmark.')
+
+    parser.add_argument('-o', '--output',
+                        default=None,
+                        help='JSON lines file to write the results to. '
+                             'Standard output by default.')
+
+    args = parser.parse_args(sys.argv[1:])
+    logging.getLogger('nb2report').setLevel(logging.WARNING)
+    suites = args.suite or BENCHMARK_SUITES
+
+    results = []
+    if 'materialize' in suites:
+        results.extend(bench_materialize(args.notebooks, args.dirs,
+                                         args.threads, args.repeat))
+    if 'pipeline' in suites:
+        results.extend(bench_pipeline(args.depth, args.fanout,
+                                      args.notebooks_per_leaf, args.asserts,
+                                      args.output_size, args.repeat))
+    if 'startup' in suites:
+        results.extend(bench_startup(args.repeat))
+
+    output = open(args.output, 'w') if args.output else sys.stdout
+    try:
+        for result in results:
+            output.write(json.dumps(result, sort_keys=True) + '\n')
+    finally:
+        if output is not sys.stdout:
+            output.close()
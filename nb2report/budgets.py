@@ -0,0 +1,269 @@
+# -*- coding: utf-8 -*-
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+
+import json
+import logging
+import tracemalloc
+
+
+logger = logging.getLogger('nb2report')
+
+OVER_BUDGET_RESULT = 'OVER-BUDGET'
+BUDGET_KEY = 'budget'
+SECONDS = 'seconds'
+MEMORY_MB = 'memory_mb'
+ROWS_PER_SECOND = 'rows_per_second'
+BUDGET_LIMITS = (SECONDS, MEMORY_MB, ROWS_PER_SECOND)
+DEFAULT_TOLERANCE = 0.2
+MIN_BASELINE_SECONDS = 0.05
+ACTIVE_TRACKERS = []
+
+
+def read_budget(metadata):
+    """ Read the performance budget declared by some notebook or cell.
+
+    Budgets are declared at the `budget` key of the notebook or cell
+    metadata, with any of these limits:
+
+        "metadata": {"budget": {"seconds": 2.5, "memory_mb": 512,
+                                "rows_per_second": 100000}, ...}
+
+    `seconds` is the maximum wall time and `memory_mb` the maximum peak
+    memory allocated, in megabytes. `rows_per_second` only applies to assert
+    cells, which then report the number of rows they processed instead of
+    True or False.
+
+    >>> read_budget({'budget': {'seconds': 2, 'whatever': 1}})
+    {'seconds': 2.0}
+
+    Parameters
+    ----------
+    metadata: dict
+        Notebook or cell metadata.
+
+    Returns
+    -------
+    dict
+        Limit by name. Empty if no budget is declared. Unknown or invalid
+        limits are ignored.
+    """
+    declared = metadata.get(BUDGET_KEY) or {}
+    if not isinstance(declared, dict):
+        logger.warning('Ignoring budget, it must be an object: %s', declared)
+        return {}
+
+    budget = {}
+    for name, limit in declared.items():
+        try:
+            if name not in BUDGET_LIMITS:
+                raise ValueError('unknown limit')
+            budget[name] = float(limit)
+        except (TypeError, ValueError) as ex:
+            logger.warning('Ignoring budget limit %s=%s: %s', name, limit, ex)
+
+    return budget
+
+
+class MemoryTracker(object):
+    """ Context manager measuring the peak memory allocated by the code it
+    wraps.
+
+    Memory is traced with tracemalloc, so only allocations going through
+    the Python allocators, as objects and numpy arrays, are measured.
+    Tracing is started on enter, unless it was already, and stopped on exit.
+    Disabled trackers cost nothing.
+
+    Trackers can be nested, as one for a whole notebook and one for each of
+    its cells. Entering a tracker resets the traced peak, so the peak
+    reached until then is kept by the trackers already entered.
+
+    Attributes
+    ----------
+    peak: int
+        Peak memory allocated while the context was entered, above the
+        memory allocated before, in bytes. None while it is entered, or if
+        the tracker is disabled.
+    """
+    __slots__ = ('enabled', 'started', 'base', 'traced_peak', 'peak')
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.started = False
+        self.base = 0
+        self.traced_peak = 0
+        self.peak = None
+
+    def __enter__(self):
+        if self.enabled:
+            if not tracemalloc.is_tracing():
+                self.started = True
+                tracemalloc.start()
+            elif hasattr(tracemalloc, 'reset_peak'):  # Python >= 3.9
+                traced_peak = tracemalloc.get_traced_memory()[1]
+                for tracker in ACTIVE_TRACKERS:
+                    tracker.traced_peak = max(tracker.traced_peak,
+                                              traced_peak)
+                tracemalloc.reset_peak()
+            self.base = tracemalloc.get_traced_memory()[0]
+            self.traced_peak = 0
+            ACTIVE_TRACKERS.append(self)
+        return self
+
+    def __exit__(self, *exc):
+        if self.enabled:
+            ACTIVE_TRACKERS.remove(self)
+            traced_peak = max(self.traced_peak,
+                              tracemalloc.get_traced_memory()[1])
+            self.peak = max(traced_peak - self.base, 0)
+            if self.started:
+                tracemalloc.stop()
+        return False
+
+
+def check(budget, seconds, peak=None, rows=None, label='notebook'):
+    """ Check some measures against a budget.
+
+    >>> check({'seconds': 1.0}, 1.5)
+    ['notebook took 1.50s, over its 1.00s budget']
+
+    Parameters
+    ----------
+    budget: dict
+        Limit by name, as returned by `read_budget`.
+    seconds: float
+        Wall time.
+    peak: int
+        Peak memory allocated, in bytes. None if not measured.
+    rows: int
+        Rows processed. None if not reported.
+    label: str
+        Name of what was measured, as 'notebook' or 'cell 3'.
+
+    Returns
+    -------
+    list(str)
+        Description of every exceeded limit.
+    """
+    violations = []
+
+    if SECONDS in budget and seconds > budget[SECONDS]:
+        violations.append('{} took {:.2f}s, over its {:.2f}s budget'.format(
+            label, seconds, budget[SECONDS]))
+
+    if MEMORY_MB in budget and peak is not None \
+            and peak > budget[MEMORY_MB] * (1 << 20):
+        violations.append('{} peaked at {:.1f}MB, over its {:.1f}MB '
+                          'budget'.format(label, peak / (1 << 20),
+                                          budget[MEMORY_MB]))
+
+    if ROWS_PER_SECOND in budget and rows is not None:
+        rate = rows / seconds if seconds else float('inf')
+        if rate < budget[ROWS_PER_SECOND]:
+            violations.append('{} processed {:.0f} rows/s, under its {:.0f} '
+                              'rows/s budget'.format(label, rate,
+                                                     budget[ROWS_PER_SECOND]))
+
+    return violations
+
+
+def load_baseline(f):
+    """ Load the timings of a baseline run.
+
+    Baselines are the JSON lines result sink of a previous run, as written
+    with `--sink jsonl:FILE`.
+
+    Parameters
+    ----------
+    f: str
+        Path to the JSON lines results file.
+
+    Returns
+    -------
+    dict
+        Timings by notebook path: the notebook `seconds`, and the `asserts`
+        seconds by cell index. Notebooks without timings are left out.
+    """
+    baseline = {}
+
+    with open(str(f)) as lines:
+        for line in lines:
+            record = json.loads(line)
+            if record.get('seconds') is None:
+                continue
+            timings = baseline.setdefault(record['path'],
+                                          dict(seconds=None, asserts={}))
+            if record['type'] == 'notebook':
+                timings['seconds'] = record['seconds']
+            elif record['type'] == 'assert':
+                timings['asserts'][record['cell']] = record['seconds']
+
+    return baseline
+
+
+def compare(outcome, timings, tolerance=DEFAULT_TOLERANCE):
+    """ Compare the timings of a notebook against its baseline.
+
+    Timings shorter than MIN_BASELINE_SECONDS in the baseline are too noisy
+    to be compared, so they are skipped.
+
+    Parameters
+    ----------
+    outcome: dict
+        Test result record of the notebook.
+    timings: dict
+        Baseline timings of the notebook, as loaded by `load_baseline`. None
+        if the notebook is not in the baseline.
+    tolerance: float
+        Allowed slowdown, as a fraction of the baseline time.
+
+    Returns
+    -------
+    list(str)
+        Description of every slowdown beyond the tolerance.
+    """
+    if not timings:
+        return []
+
+    measures = [('notebook', outcome['seconds'], timings['seconds'])]
+    measures.extend(('cell {}'.format(x['cell']), x['seconds'],
+                     timings['asserts'].get(x['cell']))
+                    for x in outcome['asserts'])
+
+    return [
+        '{} took {:.2f}s, {:.0%} slower than the {:.2f}s baseline'.format(
+            label, seconds, seconds / base - 1, base)
+        for label, seconds, base in measures
+        if seconds is not None and base is not None
+        and base >= MIN_BASELINE_SECONDS
+        and seconds > base * (1 + tolerance)
+    ]
+
+
+def flag(outcome, violations):
+    """ Flag some test result record with budget violations.
+
+    Passing notebooks with violations are OVER-BUDGET. Failing ones keep
+    their result, as functional failures come first.
+
+    Parameters
+    ----------
+    outcome: dict
+        Test result record.
+    violations: list(str)
+        Budget violations.
+
+    Returns
+    -------
+    dict
+        New test result record, with the `violations` added to the ones it
+        had.
+    """
+    if not violations:
+        return outcome
+
+    return dict(
+        outcome,
+        result=OVER_BUDGET_RESULT if outcome['result'] == 'OK'
+        else outcome['result'],
+        violations=outcome.get('violations', []) + violations
+    )
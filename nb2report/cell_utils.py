@@ -39,6 +39,96 @@ def assert_cell(cell):
     return _is_cell
 
 
+class Cell(object):
+    """ Pre-classified iPython notebook cell.
+
+    The cell is validated and classified once, when it is built, so scanning
+    schemas and notebooks does not validate nor strip the cells again on
+    every check.
+
+    Attributes
+    ----------
+    kind: str
+        Cell type: markdown, code...
+    source: list(str)
+        Cell source lines.
+    first_line: str
+        First source line, stripped. Empty if the source is empty.
+    is_title: bool
+        True if it starts with the title/subtitle markdown token: #
+    is_list: bool
+        True if it starts with the list markdown token: *
+    is_assert: bool
+        True if its first line contains the assert token.
+    metadata: dict
+        Cell metadata. Empty if the cell has none.
+    """
+    __slots__ = ('kind', 'source', 'first_line', 'is_title', 'is_list',
+                 'is_assert', 'metadata')
+
+    def __init__(self, kind, source, metadata=None):
+        self.kind = kind
+        self.source = source
+        self.metadata = metadata or {}
+        first_line = source[0] if source else ''
+        self.first_line = first_line.strip()
+        self.is_title = self.first_line[:1] == '#'
+        self.is_list = self.first_line[:1] == '*'
+        self.is_assert = '# asserts' in first_line.lower()
+
+    @classmethod
+    def from_dict(cls, cell):
+        """ Build the cell record of an iPython notebook cell.
+
+        Parameters
+        ----------
+        cell: dict
+            iPython notebook cell representation.
+
+        Returns
+        -------
+        Cell
+            Cell record.
+        """
+        assert_cell(cell)
+        return cls(cell['cell_type'], cell['source'], cell.get('metadata'))
+
+    @property
+    def is_markdown(self):
+        """ True if it is a markdown cell. """
+        return self.kind == 'markdown'
+
+    @property
+    def is_code(self):
+        """ True if it is a code cell. """
+        return self.kind == 'code'
+
+    @property
+    def code(self):
+        """ All the code from the source, None if it is not a code cell. """
+        if self.is_code:
+            return ''.join(self.source)
+
+
+def classify_cells(cells):
+    """ Build the cell records of some notebook cells.
+
+    Cell records are passed through as they are.
+
+    Parameters
+    ----------
+    cells: iterable(dict)
+        iPython notebook cell representations.
+
+    Returns
+    -------
+    generator(Cell)
+        Cell records.
+    """
+    for cell in cells:
+        yield cell if isinstance(cell, Cell) else Cell.from_dict(cell)
+
+
 def is_assert(cell):
     """ Ensure given cell contains the assert token.
 
@@ -52,10 +142,7 @@ def is_assert(cell):
     bool
         True it is an assert cell. False otherwise.
     """
-    try:
-        return assert_cell(cell) and '# asserts' in cell['source'][0].lower()
-    except IndexError:
-        return False
+    return Cell.from_dict(cell).is_assert
 
 
 def is_list(cell):
@@ -74,10 +161,7 @@ def is_list(cell):
     bool
         True if it is a list cell. False otherwise.
     """
-    try:
-        return assert_cell(cell) and cell['source'][0].strip()[0] == '*'
-    except IndexError:
-        return False
+    return Cell.from_dict(cell).is_list
 
 
 def is_title(cell):
@@ -96,10 +180,7 @@ def is_title(cell):
     bool
         True if it is a title cell. False otherwise.
     """
-    try:
-        return assert_cell(cell) and cell['source'][0].strip()[0] == '#'
-    except IndexError:
-        return False
+    return Cell.from_dict(cell).is_title
 
 
 def is_markdown(cell):
@@ -115,7 +196,7 @@ def is_markdown(cell):
     bool
         True if it is a markdown cell. False otherwise.
     """
-    return assert_cell(cell) and cell['cell_type'] == 'markdown'
+    return Cell.from_dict(cell).is_markdown
 
 
 def is_code(cell):
@@ -131,7 +212,7 @@ def is_code(cell):
     bool
         True if it is a code cell. False otherwise.
     """
-    return assert_cell(cell) and cell['cell_type'] == 'code'
+    return Cell.from_dict(cell).is_code
 
 
 def get_first_line(cell):
@@ -147,12 +228,11 @@ def get_first_line(cell):
     str
         First line from source field.
     """
-    if not assert_cell(cell) or 'source' not in cell:
-        raise AssertionError('Wrong cell format: %s' % cell)
-    try:
-        return cell['source'][0].strip()
-    except IndexError as e:
-        raise IndexError('Cell source is empty. %s' % e)
+    record = Cell.from_dict(cell)
+    if not record.source:
+        raise IndexError('Cell source is empty.')
+
+    return record.first_line
 
 
 def get_code(cell):
@@ -168,5 +248,4 @@ def get_code(cell):
     str
         All the code from the source field.
     """
-    if is_code(cell):
-        return ''.join(cell['source'])
+    return Cell.from_dict(cell).code
@@ -0,0 +1,212 @@
+# -*- coding: utf-8 -*-
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+
+import argparse
+import logging
+import sys
+
+from nb2report import coordinator, journal, preflight, reporting, \
+    scaffolding
+
+
+def _add_framework_arguments(parser):
+    """ Add the framework name, version and logging level arguments.
+
+    Parameters
+    ----------
+    parser: argparse.ArgumentParser
+        Parser to add the arguments to.
+    """
+    parser.add_argument("-n", '--name',
+                        required=True,
+                        help='Name of the framework.')
+
+    parser.add_argument("-v", '--version',
+                        required=True,
+                        help='Version of the framework.')
+
+    parser.add_argument('--log-level',
+                        default='INFO',
+                        choices=['DEBUG', 'INFO', 'WARNING', 'ERROR'],
+                        help='Logging level.')
+
+
+def _render(args):
+    """ Render the summary report from the journal, executing nothing.
+
+    Parameters
+    ----------
+    args: argparse.Namespace
+        Parsed command line arguments.
+    """
+    reporting.generate_partial_summary(args.name, args.version,
+                                       archive_path=args.archive)
+
+
+def _merge(args):
+    """ Merge journals of separate runs into the framework journal.
+
+    Parameters
+    ----------
+    args: argparse.Namespace
+        Parsed command line arguments.
+    """
+    journal.merge(
+        reporting.BASE_DIR / args.name / args.version
+        / reporting.JOURNAL_FILE_NAME,
+        args.journals
+    )
+
+
+def _preflight(args):
+    """ Check that all the notebooks can be executed, executing nothing.
+
+    Parameters
+    ----------
+    args: argparse.Namespace
+        Parsed command line arguments.
+
+    Returns
+    -------
+    int
+        Exit status: 1 if any problem was found, 0 otherwise.
+    """
+    problems = reporting.run_preflight(args.name, args.version,
+                                       archive_path=args.archive,
+                                       workers=args.workers)
+    if problems:
+        print(preflight.format_report(problems))
+        return 1
+
+    return 0
+
+
+def _worker(args):
+    """ Execute notebooks pulled from a coordinator.
+
+    Parameters
+    ----------
+    args: argparse.Namespace
+        Parsed command line arguments.
+    """
+    reporting.run_worker(args.name, args.version, args.connect,
+                         fail_fast=args.fail_fast, archive_path=args.archive,
+                         track_inputs=args.track_inputs)
+
+
+def _build_parser():
+    """ Build the command line parser of every subcommand.
+
+    Building it imports the modules of all the subcommands, which must stay
+    cheap: iPython and Jinja are imported only when notebooks are executed
+    or reports rendered.
+
+    Returns
+    -------
+    argparse.ArgumentParser
+        Command line parser.
+    """
+    parser = argparse.ArgumentParser(prog='nb2report')
+    subparsers = parser.add_subparsers(dest='command', metavar='command')
+    subparsers.required = True
+
+    scaffold = subparsers.add_parser(
+        'scaffold',
+        help='Create the testing scaffolding from a tests schema.'
+    )
+    scaffolding._add_arguments(scaffold)
+    scaffold.set_defaults(func=scaffolding._main)
+
+    run = subparsers.add_parser(
+        'run',
+        help='Execute the tests and generate the summary report.'
+    )
+    reporting._add_arguments(run)
+    run.set_defaults(func=reporting._main)
+
+    render = subparsers.add_parser(
+        'render',
+        help='Generate the summary report from the journal, executing '
+             'nothing.'
+    )
+    _add_framework_arguments(render)
+    render.add_argument('--archive',
+                        default=None,
+                        help='Zip or tar archive holding the scaffold.')
+    render.set_defaults(func=_render)
+
+    merge = subparsers.add_parser(
+        'merge',
+        help='Merge journals of separate runs into the framework journal.'
+    )
+    _add_framework_arguments(merge)
+    merge.add_argument('journals',
+                       nargs='+',
+                       help='Journal files to merge, in order. The last '
+                            'record of each notebook wins.')
+    merge.set_defaults(func=_merge)
+
+    check = subparsers.add_parser(
+        'preflight',
+        help='Check that all the notebooks can be executed, executing '
+             'nothing, and report every problem found.'
+    )
+    _add_framework_arguments(check)
+    check.add_argument('--archive',
+                       default=None,
+                       help='Zip or tar archive holding the scaffold.')
+    check.add_argument('--workers',
+                       type=int,
+                       default=None,
+                       help='Number of worker processes. One per CPU by '
+                            'default.')
+    check.set_defaults(func=_preflight)
+
+    worker = subparsers.add_parser(
+        'worker',
+        help='Execute notebooks pulled from a coordinator started with '
+             'run --serve.'
+    )
+    _add_framework_arguments(worker)
+    worker.add_argument('--connect',
+                        required=True,
+                        type=coordinator.parse_address,
+                        metavar='HOST:PORT',
+                        help='Coordinator address.')
+    worker.add_argument('--fail-fast',
+                        action='store_true',
+                        help='Stop each notebook at its first failing '
+                             'assert.')
+    worker.add_argument('--archive',
+                        default=None,
+                        help='Zip or tar archive holding the scaffold.')
+    worker.add_argument('--track-inputs',
+                        action='store_true',
+                        help='Record the files each notebook reads and the '
+                             'modules it imports.')
+    worker.set_defaults(func=_worker)
+
+    return parser
+
+
+def main(argv=None):
+    """ Run the nb2report command line.
+
+    Parameters
+    ----------
+    argv: list(str)
+        Command line arguments. None to read them from sys.argv.
+
+    Returns
+    -------
+    int
+        Exit status of the subcommand. None for success.
+    """
+    args = _build_parser().parse_args(
+        sys.argv[1:] if argv is None else argv)
+    logging.basicConfig(stream=sys.stdout, level=args.log_level)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
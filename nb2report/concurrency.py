@@ -0,0 +1,337 @@
+# -*- coding: utf-8 -*-
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+
+import logging
+import os
+import queue
+import time
+
+from nb2report import tracing
+
+
+logger = logging.getLogger('nb2report')
+
+CONTROL_INTERVAL = 1.0
+CPU_LOW = 0.75
+CPU_HIGH = 0.95
+MEMORY_RESERVE = 0.1
+
+
+def parse_bounds(value):
+    """ Parse the concurrency bounds of an adaptive pool.
+
+    >>> parse_bounds('2:8')
+    (2, 8)
+
+    Parameters
+    ----------
+    value: str
+        Minimum and maximum number of concurrent notebooks, separated by a
+        colon.
+
+    Returns
+    -------
+    int, int
+        Minimum and maximum number of concurrent notebooks.
+    """
+    low, _, high = value.partition(':')
+    low, high = int(low), int(high or low)
+    if not 0 < low <= high:
+        raise ValueError('Bounds must be MIN:MAX, with 0 < MIN <= MAX: '
+                         '{}'.format(value))
+
+    return low, high
+
+
+class CpuSampler(object):
+    """ Sampler of the CPU utilisation of the host.
+
+    Utilisation is measured from /proc/stat between samples. Hosts without
+    it fall back to the load average per CPU.
+    """
+
+    def __init__(self):
+        self.last = self._read()
+
+    @staticmethod
+    def _read():
+        """ Read the busy and total CPU time of the host.
+
+        Returns
+        -------
+        int, int
+            Busy and total CPU time, in clock ticks. None if unknown.
+        """
+        try:
+            with open('/proc/stat') as stat:
+                times = [int(x) for x in stat.readline().split()[1:]]
+        except (OSError, ValueError):
+            return None
+
+        idle = sum(times[3:5])  # idle and iowait
+        return sum(times) - idle, sum(times)
+
+    def utilisation(self):
+        """ Get the CPU utilisation since the last sample.
+
+        Returns
+        -------
+        float
+            Busy fraction of the CPU time, from 0 to 1.
+        """
+        current = self._read()
+        if current is None or self.last is None:
+            return min(os.getloadavg()[0] / (os.cpu_count() or 1), 1.0)
+
+        busy, total = (x - y for x, y in zip(current, self.last))
+        self.last = current
+        return busy / total if total > 0 else 0.0
+
+
+def memory():
+    """ Get the available and total memory of the host.
+
+    Returns
+    -------
+    int, int
+        Available and total memory, in bytes.
+    """
+    try:
+        with open('/proc/meminfo') as meminfo:
+            info = dict(x.split(':', 1) for x in meminfo)
+        return tuple(int(info[x].split()[0]) << 10
+                     for x in ('MemAvailable', 'MemTotal'))
+    except (OSError, KeyError, ValueError):
+        page = os.sysconf('SC_PAGE_SIZE')
+        return (os.sysconf('SC_AVPHYS_PAGES') * page,
+                os.sysconf('SC_PHYS_PAGES') * page)
+
+
+def reset_peak_rss():
+    """ Reset the peak resident set size of this process.
+
+    Only Linux supports it. Otherwise, peaks keep the maximum of the
+    process lifetime, which overestimates them.
+    """
+    try:
+        with open('/proc/self/clear_refs', 'w') as clear_refs:
+            clear_refs.write('5')
+    except OSError:
+        pass
+
+
+def peak_rss():
+    """ Get the peak resident set size of this process.
+
+    Returns
+    -------
+    int
+        Peak resident set size since it was last reset, in bytes.
+    """
+    try:
+        with open('/proc/self/status') as status:
+            for line in status:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) << 10
+    except OSError:
+        pass
+
+    import resource
+
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss << 10
+
+
+class Controller(object):
+    """ Controller of the number of notebooks executing concurrently.
+
+    The target concurrency starts at the minimum, and is updated every
+    CONTROL_INTERVAL within the bounds:
+
+        * Scale down by half while available memory is under MEMORY_RESERVE
+        of the total.
+        * Scale down by one while CPU utilisation is over CPU_HIGH.
+        * Scale up by one while CPU utilisation is under CPU_LOW, all the
+        target slots are busy and the memory available fits one more
+        notebook.
+
+    Notebooks are only started if their estimated peak RSS, from their
+    history or the average observed in this run, fits in the memory
+    available, so heavy notebooks run with less concurrency. The minimum
+    always runs, so the run makes progress.
+
+    Every scaling decision is logged and traced as a `scale` span.
+    """
+
+    def __init__(self, min_workers, max_workers, history=None):
+        self.min_workers = min_workers
+        self.max_workers = max_workers
+        self.target = min_workers
+        self.history = dict(history or {})
+        self.observed = 0
+        self.observed_total = 0
+
+    def estimate(self, key):
+        """ Estimate the peak RSS of some notebook.
+
+        Parameters
+        ----------
+        key: str
+            Notebook path, relative to the root testing path.
+
+        Returns
+        -------
+        int
+            Peak RSS of the notebook in history, or the average observed in
+            this run, in bytes. 0 if unknown.
+        """
+        if key in self.history:
+            return self.history[key]
+
+        return self.observed_total // self.observed if self.observed else 0
+
+    def observe(self, key, peak):
+        """ Record the peak RSS of some executed notebook.
+
+        Parameters
+        ----------
+        key: str
+            Notebook path, relative to the root testing path.
+        peak: int
+            Peak RSS of the worker executing the notebook, in bytes. None if
+            unknown.
+        """
+        if peak:
+            self.history[key] = peak
+            self.observed += 1
+            self.observed_total += peak
+
+    def admit(self, estimate, inflight, available, total):
+        """ Check if a notebook can start executing.
+
+        Parameters
+        ----------
+        estimate: int
+            Estimated peak RSS of the notebook, in bytes.
+        inflight: list(int)
+            Estimated peak RSS of the notebooks executing, in bytes.
+        available: int
+            Memory available, in bytes.
+        total: int
+            Total memory, in bytes.
+
+        Returns
+        -------
+        bool
+            True if the notebook can start.
+        """
+        if len(inflight) >= self.target:
+            return False
+        if len(inflight) < self.min_workers:
+            return True
+
+        return estimate + sum(inflight) <= available - total * MEMORY_RESERVE
+
+    def update(self, cpu, available, total, busy):
+        """ Update the target concurrency from the host utilisation.
+
+        Parameters
+        ----------
+        cpu: float
+            CPU utilisation, from 0 to 1.
+        available: int
+            Memory available, in bytes.
+        total: int
+            Total memory, in bytes.
+        busy: int
+            Number of notebooks executing.
+
+        Returns
+        -------
+        int
+            New target concurrency.
+        """
+        reserve = total * MEMORY_RESERVE
+        target, reason = self.target, None
+
+        if available < reserve and target > self.min_workers:
+            target, reason = max(self.min_workers, target // 2), 'memory'
+        elif cpu > CPU_HIGH and target > self.min_workers:
+            target, reason = target - 1, 'cpu-high'
+        elif cpu < CPU_LOW and target < self.max_workers \
+                and busy >= target \
+                and available - reserve > self.estimate(None):
+            target, reason = target + 1, 'cpu-low'
+
+        if reason:
+            with tracing.span('scale', reason=reason, previous=self.target,
+                              target=target, cpu=cpu, available=available,
+                              busy=busy):
+                logger.info('Scaling from %s to %s concurrent notebooks: %s '
+                            '(CPU %.0f%%, %s MB available)', self.target,
+                            target, reason, cpu * 100, available >> 20)
+                self.target = target
+
+        return self.target
+
+
+def run(pool, task, items, controller, key=str):
+    """ Execute tasks on a process pool, with adaptive concurrency.
+
+    The pool must have `controller.max_workers` processes. Tasks are only
+    submitted as the controller admits them, so idle processes are left
+    waiting.
+
+    Parameters
+    ----------
+    pool: multiprocessing.Pool
+        Process pool.
+    task: callable
+        Task, called with each item. It returns the item and its result
+        record, with the `peak_rss` of the worker executing it.
+    items: list
+        Items to execute, as notebook paths.
+    controller: Controller
+        Concurrency controller.
+    key: callable
+        Called with each item to get its history key.
+
+    Returns
+    -------
+    generator(object, dict)
+        Item and result record of each task, in completion order.
+    """
+    pending = list(reversed(items))
+    results = queue.Queue()
+    inflight = {}
+    sampler = CpuSampler()
+    checked = time.monotonic()
+
+    while pending or inflight:
+        available, total = memory()
+        if time.monotonic() - checked >= CONTROL_INTERVAL:
+            controller.update(sampler.utilisation(), available, total,
+                              len(inflight))
+            checked = time.monotonic()
+
+        while pending and controller.admit(
+                controller.estimate(key(pending[-1])),
+                list(inflight.values()), available, total):
+            item = pending.pop()
+            token = object()
+            inflight[token] = controller.estimate(key(item))
+            pool.apply_async(
+                task, (item,),
+                callback=lambda x, t=token: results.put((t, x)),
+                error_callback=lambda x, t=token: results.put((t, x))
+            )
+
+        try:
+            token, result = results.get(timeout=CONTROL_INTERVAL)
+        except queue.Empty:
+            continue
+
+        del inflight[token]
+        if isinstance(result, BaseException):
+            raise result
+        controller.observe(key(result[0]), result[1].get('peak_rss'))
+        yield result
@@ -0,0 +1,335 @@
+# -*- coding: utf-8 -*-
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+
+import collections
+import json
+import logging
+import os
+import queue
+import socket
+import socketserver
+import threading
+import time
+
+
+logger = logging.getLogger('nb2report')
+
+HEARTBEAT_INTERVAL = 5.0
+HEARTBEAT_TIMEOUT = 30.0
+POLL_INTERVAL = 0.5
+CONNECT_TIMEOUT = 30.0
+MAX_ATTEMPTS = 3
+LOST_RESULT = 'LOST'
+ERROR_RESULT = 'ERROR'
+DEFAULT_HOST = 'localhost'
+
+
+def parse_address(value):
+    """ Parse a coordinator address.
+
+    >>> parse_address('localhost:5000')
+    ('localhost', 5000)
+    >>> parse_address(':5000')
+    ('localhost', 5000)
+
+    The coordinator does not authenticate its workers, so any peer reaching
+    its port can pull tasks and send results. Listen on all the interfaces,
+    as '0.0.0.0:5000', only on trusted networks.
+
+    Parameters
+    ----------
+    value: str
+        Host and port, separated by a colon. An empty host is DEFAULT_HOST.
+
+    Returns
+    -------
+    str, int
+        Host and port.
+    """
+    host, _, port = value.rpartition(':')
+    return host or DEFAULT_HOST, int(port)
+
+
+class _State(object):
+    """ Task queue of a coordinator, shared by all its connections.
+
+    Tasks are handed out to workers as they pull them, so faster workers
+    take more tasks. Tasks in flight are tracked by connection: when a
+    worker disconnects or stops sending heartbeats its tasks are queued
+    again, up to MAX_ATTEMPTS times.
+    """
+
+    def __init__(self, keys, heartbeat_timeout):
+        self.lock = threading.Lock()
+        self.queue = collections.deque(keys)
+        self.attempts = collections.Counter()
+        self.inflight = {}
+        self.seen = {}
+        self.sockets = {}
+        self.done = set()
+        self.results = queue.Queue()
+        self.heartbeat_timeout = heartbeat_timeout
+        self.closed = False
+
+    def connect(self, conn, sock):
+        with self.lock:
+            self.seen[conn] = time.monotonic()
+            self.sockets[conn] = sock
+            self.inflight[conn] = set()
+
+    def beat(self, conn):
+        with self.lock:
+            if conn in self.seen:
+                self.seen[conn] = time.monotonic()
+
+    def next(self, conn):
+        """ Get the next task for some connection.
+
+        Returns
+        -------
+        dict
+            Task, wait or done message.
+        """
+        with self.lock:
+            self.seen[conn] = time.monotonic()
+            if self.closed:
+                return dict(type='done')
+            if self.queue:
+                key = self.queue.popleft()
+                self.attempts[key] += 1
+                self.inflight[conn].add(key)
+                return dict(type='task', path=key)
+            if any(self.inflight.values()):
+                return dict(type='wait')
+            return dict(type='done')
+
+    def complete(self, conn, key, outcome):
+        with self.lock:
+            self.inflight.get(conn, set()).discard(key)
+            if key in self.done:
+                return
+            self.done.add(key)
+        self.results.put((key, outcome))
+
+    def drop(self, conn):
+        """ Forget some connection, queuing its tasks in flight again. """
+        with self.lock:
+            tasks = self.inflight.pop(conn, set())
+            self.seen.pop(conn, None)
+            self.sockets.pop(conn, None)
+            for key in tasks - self.done:
+                if self.attempts[key] >= MAX_ATTEMPTS:
+                    logger.error('Task %s lost after %s attempts', key,
+                                 self.attempts[key])
+                    self.done.add(key)
+                    self.results.put((key, dict(result=LOST_RESULT,
+                                                seconds=None, asserts=[])))
+                else:
+                    logger.warning('Queuing task %s again', key)
+                    self.queue.appendleft(key)
+
+    def reap(self):
+        """ Drop the connections which stopped sending heartbeats. """
+        deadline = time.monotonic() - self.heartbeat_timeout
+        with self.lock:
+            dead = [(x, self.sockets[x]) for x, seen in self.seen.items()
+                    if seen < deadline]
+        for conn, sock in dead:
+            logger.warning('Worker %s stopped sending heartbeats', conn)
+            self.drop(conn)
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    """ Connection of a worker to the coordinator.
+
+    Workers send one JSON message per line, `hello`, `pull`, `heartbeat` or
+    `result`, and the coordinator answers every `pull` with a `task`, `wait`
+    or `done` message.
+    """
+
+    def handle(self):
+        state = self.server.state
+        conn = '{}:{}'.format(*self.client_address[:2])
+        state.connect(conn, self.request)
+
+        try:
+            for line in self.rfile:
+                message = json.loads(line.decode())
+                if message['type'] == 'hello':
+                    logger.info('Worker %s connected from %s',
+                                message.get('worker'), conn)
+                elif message['type'] == 'heartbeat':
+                    state.beat(conn)
+                elif message['type'] == 'pull':
+                    self.wfile.write(
+                        (json.dumps(state.next(conn)) + '\n').encode())
+                elif message['type'] == 'result':
+                    state.beat(conn)
+                    state.complete(conn, message['path'], message['outcome'])
+        except (OSError, ValueError) as ex:
+            logger.warning('Worker %s connection failed: %s', conn, ex)
+        finally:
+            state.drop(conn)
+
+
+class _Server(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+def serve(keys, address, heartbeat_timeout=HEARTBEAT_TIMEOUT,
+          on_listen=None):
+    """ Serve some tasks to TCP workers, as they pull them.
+
+    Closing the generator stops serving: workers get `done` on their next
+    pull.
+
+    Parameters
+    ----------
+    keys: list(str)
+        Tasks to serve, as notebook paths relative to the root testing path.
+    address: tuple(str, int)
+        Host and port to listen at. Port 0 picks a free one.
+    heartbeat_timeout: float
+        Seconds without hearing from a worker before its tasks are queued
+        again.
+    on_listen: callable
+        Called with the listening address once the coordinator is ready.
+
+    Returns
+    -------
+    generator(str, dict)
+        Task and its result, as sent by the worker, in completion order.
+        Tasks whose workers died MAX_ATTEMPTS times are LOST.
+    """
+    state = _State(keys, heartbeat_timeout)
+    server = _Server(address, _Handler)
+    server.state = state
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    logger.info('Coordinator serving %s tasks at %s:%s', len(keys),
+                *server.server_address[:2])
+    if on_listen:
+        on_listen(server.server_address[:2])
+
+    try:
+        for _ in range(len(set(keys))):
+            while True:
+                try:
+                    yield state.results.get(timeout=POLL_INTERVAL)
+                    break
+                except queue.Empty:
+                    state.reap()
+    finally:
+        with state.lock:
+            state.closed = True
+        server.shutdown()
+        server.server_close()
+
+
+def _connect(address, timeout):
+    """ Connect to a coordinator, waiting for it to be listening.
+
+    Parameters
+    ----------
+    address: tuple(str, int)
+        Coordinator host and port.
+    timeout: float
+        Seconds to keep trying.
+
+    Returns
+    -------
+    socket.socket
+        Connected socket.
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            return socket.create_connection(address)
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(POLL_INTERVAL)
+
+
+def work(address, execute, heartbeat_interval=HEARTBEAT_INTERVAL,
+         connect_timeout=CONNECT_TIMEOUT):
+    """ Pull tasks from a coordinator and execute them until it is done.
+
+    Heartbeats are sent from a background thread while tasks execute, so
+    long notebooks do not get the worker considered dead. Tasks raising an
+    exception, as notebooks without an asserts cell, are reported with an
+    ERROR result and the exception as their `error`, and the worker goes on.
+
+    Parameters
+    ----------
+    address: tuple(str, int)
+        Coordinator host and port.
+    execute: callable
+        Called with each task, a notebook path relative to the root testing
+        path. It returns the JSON serializable result record.
+    heartbeat_interval: float
+        Seconds between heartbeats.
+    connect_timeout: float
+        Seconds to wait for the coordinator to be listening.
+
+    Returns
+    -------
+    int
+        Number of executed tasks.
+    """
+    sock = _connect(address, connect_timeout)
+    replies = sock.makefile('rb')
+    lock = threading.Lock()
+    stop = threading.Event()
+    executed = 0
+
+    def _send(message):
+        with lock:
+            sock.sendall((json.dumps(message) + '\n').encode())
+
+    def _heartbeat():
+        while not stop.wait(heartbeat_interval):
+            try:
+                _send(dict(type='heartbeat'))
+            except OSError:
+                return
+
+    _send(dict(type='hello', worker='{}:{}'.format(socket.gethostname(),
+                                                   os.getpid())))
+    threading.Thread(target=_heartbeat, daemon=True).start()
+
+    try:
+        while True:
+            _send(dict(type='pull'))
+            line = replies.readline()
+            if not line:
+                logger.warning('Coordinator closed the connection')
+                break
+            reply = json.loads(line.decode())
+            if reply['type'] == 'task':
+                try:
+                    outcome = execute(reply['path'])
+                except Exception as ex:
+                    # Raising would requeue the task to kill every worker
+                    logger.exception('Error executing %s', reply['path'])
+                    outcome = dict(result=ERROR_RESULT, seconds=None,
+                                   asserts=[], error='{}: {}'.format(
+                                       type(ex).__name__, ex))
+                _send(dict(type='result', path=reply['path'],
+                           outcome=outcome))
+                executed += 1
+            elif reply['type'] == 'wait':
+                time.sleep(POLL_INTERVAL)
+            else:
+                break
+    finally:
+        stop.set()
+        replies.close()
+        sock.close()
+
+    logger.info('Worker done after executing %s tasks', executed)
+    return executed
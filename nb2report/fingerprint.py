@@ -0,0 +1,232 @@
+# -*- coding: utf-8 -*-
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+
+import builtins
+import logging
+import os
+import site
+import sys
+import sysconfig
+
+from nb2report.journal import hash_file
+
+
+logger = logging.getLogger('nb2report')
+
+RECORDER = None
+HOOK_INSTALLED = False
+HASHES = {}
+WRITE_MODES = set('wax+')
+WRITE_FLAGS = os.O_WRONLY | os.O_RDWR
+EXCLUDED_SUFFIXES = ('.pyc',)
+METADATA_SUFFIXES = ('.dist-info', '.egg-info')
+EXCLUDED_DIRS = tuple(sorted(set(
+    os.path.join(os.path.realpath(sysconfig.get_paths()[x]), '')
+    for x in ('stdlib', 'platstdlib')
+)))
+# Installed packages, as the framework under test, are often under stdlib
+INCLUDED_DIRS = tuple(sorted(set(
+    os.path.join(os.path.realpath(x), '')
+    for x in [sysconfig.get_paths()[x] for x in ('purelib', 'platlib')]
+    + (site.getsitepackages() if hasattr(site, 'getsitepackages') else [])
+    + [site.getusersitepackages()]
+)))
+
+
+def _audit(event, args):
+    """ Audit hook forwarding the files opened to the active recorder. """
+    if event == 'open' and RECORDER is not None:
+        RECORDER.opened(*args)
+
+
+def _install_hook():
+    """ Install the audit hook, once per process.
+
+    Audit hooks cannot be removed, so the hook stays installed and does
+    nothing while there is no active recorder. Python < 3.8 has no audit
+    hooks, so only imports are tracked.
+    """
+    global HOOK_INSTALLED
+    if not HOOK_INSTALLED and hasattr(sys, 'addaudithook'):
+        sys.addaudithook(_audit)
+        HOOK_INSTALLED = True
+
+
+def _is_input(path):
+    """ Check if some file can be an input of the notebooks.
+
+    Standard library files and bytecode caches are never inputs, as they
+    change only with the interpreter. Installed packages are, even if
+    site-packages is under the standard library directory, but not their
+    distribution metadata, which IPython and other libraries read lazily.
+
+    Parameters
+    ----------
+    path: str
+        Absolute, real file path.
+
+    Returns
+    -------
+    bool
+        True if the file must be fingerprinted.
+    """
+    return not path.endswith(EXCLUDED_SUFFIXES) \
+        and not os.path.dirname(path).endswith(METADATA_SUFFIXES) \
+        and (path.startswith(INCLUDED_DIRS)
+             or not path.startswith(EXCLUDED_DIRS)) and os.path.isfile(path)
+
+
+class InputRecorder(object):
+    """ Context manager recording the files opened for reading and the
+    modules imported by the code it wraps.
+
+    Files are recorded through the `open` audit event. Modules are recorded
+    wrapping `__import__`, so imports of modules loaded before, which raise
+    no event, are recorded too, as long as they are imported by notebook
+    code, whose module is __main__. The files of an imported package are
+    those of all its loaded submodules.
+
+    The recorder can be entered several times, accumulating the inputs.
+    Disabled recorders cost nothing.
+    """
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.files = set()
+        self.modules = set()
+        self.original_import = None
+
+    def __enter__(self):
+        global RECORDER
+        if self.enabled:
+            _install_hook()
+            RECORDER = self
+            self.original_import = builtins.__import__
+            builtins.__import__ = self._import
+        return self
+
+    def __exit__(self, *exc):
+        global RECORDER
+        if self.enabled:
+            builtins.__import__ = self.original_import
+            RECORDER = None
+        return False
+
+    def opened(self, path, mode, flags):
+        """ Record some opened file, if it was opened for reading.
+
+        Parameters
+        ----------
+        path: str, bytes or int
+            Opened path. File descriptors are ignored.
+        mode: str
+            Open mode. None for os.open.
+        flags: int
+            Open flags.
+        """
+        if isinstance(path, int):
+            return
+        if (mode is None and flags & WRITE_FLAGS) \
+                or (mode is not None and WRITE_MODES.intersection(mode)):
+            return
+        self.files.add(os.fsdecode(path))
+
+    def _import(self, name, globals=None, locals=None, fromlist=(),
+                level=0):
+        module = self.original_import(name, globals, locals, fromlist, level)
+        if not level and globals and globals.get('__name__') == '__main__':
+            self.modules.add(name.partition('.')[0])
+        return module
+
+    def paths(self):
+        """ Get the input files recorded.
+
+        Returns
+        -------
+        list(str)
+            Real paths of the recorded files and of the imported modules,
+            sorted.
+        """
+        paths = set(self.files)
+        for name, module in list(sys.modules.items()):
+            if name.partition('.')[0] in self.modules:
+                paths.add(getattr(module, '__file__', None) or '')
+
+        return sorted(set(x for x in map(os.path.realpath, filter(None, paths))
+                          if _is_input(x)))
+
+    def fingerprints(self):
+        """ Get the fingerprints of the input files recorded.
+
+        Returns
+        -------
+        list(list)
+            Fingerprint of every input file, as returned by `fingerprint`.
+        """
+        return [x for x in map(fingerprint, self.paths()) if x is not None]
+
+
+def fingerprint(path):
+    """ Get the fingerprint of some file.
+
+    Hashes are cached by path, size and modification time, so files shared
+    by many notebooks are hashed once per process.
+
+    Parameters
+    ----------
+    path: str
+        Path to the file.
+
+    Returns
+    -------
+    list
+        Path, size, modification time in nanoseconds, and sha256 hex digest
+        of the file content. None if the file cannot be read.
+    """
+    try:
+        stat = os.stat(path)
+        key = (path, stat.st_size, stat.st_mtime_ns)
+        if key not in HASHES:
+            HASHES[key] = hash_file(path)
+    except OSError as ex:
+        logger.debug('Cannot fingerprint %s: %s', path, ex)
+        return None
+
+    return list(key) + [HASHES[key]]
+
+
+def changed(inputs, checked=None):
+    """ Check if any of some fingerprinted input files changed.
+
+    Files keeping their size and modification time are not read. Otherwise
+    their content hash is compared, so touched files are not changed.
+
+    Parameters
+    ----------
+    inputs: list(list)
+        Fingerprints of the input files, as returned by `fingerprint`.
+    checked: dict
+        Whether each path changed, by fingerprint, shared by the checks of
+        a run so every input is checked once. None to check all of them.
+
+    Returns
+    -------
+    bool
+        True if any input file changed or disappeared.
+    """
+    checked = {} if checked is None else checked
+
+    for path, size, mtime, digest in inputs:
+        key = (path, size, mtime, digest)
+        if key not in checked:
+            try:
+                stat = os.stat(path)
+                checked[key] = (stat.st_size, stat.st_mtime_ns) != \
+                    (size, mtime) and hash_file(path) != digest
+            except OSError:
+                checked[key] = True
+        if checked[key]:
+            logger.debug('Input %s changed', path)
+            return True
+
+    return False
@@ -0,0 +1,218 @@
+# -*- coding: utf-8 -*-
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+
+import logging
+
+from nb2report import tracing
+
+
+logger = logging.getLogger('nb2report')
+
+SETUP_NAME = '_setup.ipynb'
+TEARDOWN_NAME = '_teardown.ipynb'
+FIXTURE_NAMES = (SETUP_NAME, TEARDOWN_NAME)
+SETUP_FAILED_RESULT = 'SETUP FAILED'
+
+
+def is_fixture(name):
+    """ Check if some file is a setup or teardown notebook.
+
+    Fixture notebooks are not tests, so they are never part of the
+    scaffolding to execute nor of the report.
+
+    >>> is_fixture('_setup.ipynb')
+    True
+
+    Parameters
+    ----------
+    name: str
+        File name.
+
+    Returns
+    -------
+    bool
+        True if the file is a fixture notebook.
+    """
+    return name in FIXTURE_NAMES
+
+
+def _directories(key):
+    """ Get the directories above some notebook.
+
+    >>> _directories('A/B/c.ipynb')
+    ['', 'A', 'A/B']
+
+    Parameters
+    ----------
+    key: str
+        Notebook path, relative to the root testing path.
+
+    Returns
+    -------
+    list(str)
+        Directories relative to the root testing path, from the root, which
+        is '', down to the directory of the notebook.
+    """
+    parts = key.split('/')[:-1]
+    return ['/'.join(parts[:i]) for i in range(len(parts) + 1)]
+
+
+def find(root_path, key, cache=None):
+    """ Find the fixture notebooks applying to some notebook.
+
+    Parameters
+    ----------
+    root_path: Path or Member
+        Root testing path.
+    key: str
+        Notebook path, relative to the root testing path.
+    cache: dict
+        Fixtures found by directory, shared by the calls on the same
+        scaffold so every directory is looked up once. None to look all of
+        them up.
+
+    Returns
+    -------
+    list(tuple(str, Path, Path))
+        Directory, setup and teardown notebooks, None if missing, of every
+        directory above the notebook with any of them, from the root down.
+    """
+    cache = {} if cache is None else cache
+
+    chain = []
+    for directory in _directories(key):
+        if directory not in cache:
+            base = root_path / directory if directory else root_path
+            cache[directory] = tuple(
+                x if x.is_file() else None
+                for x in (base / SETUP_NAME, base / TEARDOWN_NAME)
+            )
+        if any(cache[directory]):
+            chain.append((directory,) + cache[directory])
+
+    return chain
+
+
+class Fixtures(object):
+    """ Setups and teardowns of the directory subtrees entered by some
+    process.
+
+    The setup notebook of a directory is executed once, when the first
+    notebook of its subtree is entered, and the resulting namespace is
+    snapshotted. Every notebook below it starts from that snapshot, so it
+    inherits the setup state but not the one left by the notebooks before
+    it. Snapshots are shallow: mutable objects, as connections, are shared.
+
+    Nested setups start from the snapshot of the setup above. The teardown
+    notebook of a directory is executed from its snapshot when a notebook
+    outside the subtree is entered, or when the fixtures are closed.
+
+    Notebooks outside every subtree with fixtures run in the namespace as
+    is, as if there were no fixtures.
+    """
+    __slots__ = ('root_path', 'execute', 'namespace', 'found', 'stack',
+                 'base')
+
+    def __init__(self, root_path, execute, namespace):
+        """ Initialize the fixtures of some scaffold.
+
+        Parameters
+        ----------
+        root_path: Path or Member
+            Root testing path.
+        execute: callable
+            Called with the path of a fixture notebook to execute it. It
+            returns an error message if it failed, or None.
+        namespace: callable
+            Called to get the namespace dict the notebooks are executed in.
+        """
+        self.root_path = root_path
+        self.execute = execute
+        self.namespace = namespace
+        self.found = {}
+        self.stack = []
+        self.base = None
+
+    def _restore(self, snapshot):
+        """ Restore the namespace to some snapshot. """
+        namespace = self.namespace()
+        namespace.clear()
+        namespace.update(snapshot)
+
+    def _push(self, directory, setup, teardown):
+        """ Enter the subtree of some directory, executing its setup. """
+        if self.stack:
+            self._restore(self.stack[-1]['snapshot'])
+        else:
+            self.base = dict(self.namespace())
+        error = self.stack[-1]['error'] if self.stack else None
+
+        if setup is not None and error is None:
+            with tracing.span('setup', directory=directory) as span:
+                logger.debug('Setting up %s', setup)
+                error = self.execute(setup)
+                span.set(failed=error is not None)
+            if error is not None:
+                logger.error('Setup %s failed: %s', setup, error)
+
+        self.stack.append(dict(directory=directory,
+                               teardown=teardown,
+                               error=error,
+                               snapshot=dict(self.namespace())))
+
+    def _pop(self):
+        """ Leave the innermost subtree entered, executing its teardown. """
+        entered = self.stack.pop()
+
+        if entered['teardown'] is not None and entered['error'] is None:
+            self._restore(entered['snapshot'])
+            with tracing.span('teardown', directory=entered['directory']) \
+                    as span:
+                logger.debug('Tearing down %s', entered['teardown'])
+                error = self.execute(entered['teardown'])
+                span.set(failed=error is not None)
+            if error is not None:
+                logger.error('Teardown %s failed: %s', entered['teardown'],
+                             error)
+
+        self._restore(self.stack[-1]['snapshot'] if self.stack
+                      else self.base)
+
+    def enter(self, key):
+        """ Enter the subtrees of some notebook, before executing it.
+
+        Subtrees entered before which do not hold the notebook are torn
+        down, and the ones which were not entered yet are set up.
+
+        Parameters
+        ----------
+        key: str
+            Notebook path, relative to the root testing path.
+
+        Returns
+        -------
+        str
+            Error message of the setup which failed, if any for the
+            notebook, which must not be executed then. None otherwise.
+        """
+        chain = find(self.root_path, key, self.found)
+
+        common = 0
+        while common < min(len(chain), len(self.stack)) \
+                and self.stack[common]['directory'] == chain[common][0]:
+            common += 1
+        while len(self.stack) > common:
+            self._pop()
+        for fixture in chain[common:]:
+            self._push(*fixture)
+
+        if not self.stack:
+            return None
+
+        self._restore(self.stack[-1]['snapshot'])
+        return self.stack[-1]['error']
+
+    def close(self):
+        """ Tear down all the subtrees entered. """
+        while self.stack:
+            self._pop()
@@ -0,0 +1,228 @@
+# -*- coding: utf-8 -*-
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+
+import json
+import logging
+import os
+
+from fnmatch import fnmatchcase
+from pathlib import PurePosixPath
+from nb2report import percent
+from nb2report.archive import open_file
+
+
+logger = logging.getLogger('nb2report')
+
+INDEX_VERSION = 2
+
+
+def _read_tags(f):
+    """ Read the tags of a notebook from its metadata.
+
+    Tags are listed at the `tags` key of the notebook metadata:
+
+        "metadata": {"tags": ["tag1", "tag2"], ...}
+
+    Percent-format scripts have no metadata, so they have no tags.
+
+    Parameters
+    ----------
+    f: str or Member
+        Path to the notebook file, or archive member.
+
+    Returns
+    -------
+    list(str)
+        Notebook tags. Empty if the notebook cannot be read.
+    """
+    if str(f).endswith('.py'):
+        return []
+
+    try:
+        with open_file(f, 'r') as json_file:
+            tags = json.load(json_file).get('metadata', {}).get('tags', [])
+    except (ValueError, AttributeError) as ex:
+        logger.warning('Cannot read tags from %s: %s', f, ex)
+        return []
+
+    return [str(x) for x in tags] if isinstance(tags, list) else []
+
+
+def _scan(path, relative, suffixes):
+    """ Scan a directory tree for notebook files.
+
+    Hidden files and directories, as .ipynb_checkpoints, are skipped.
+
+    Parameters
+    ----------
+    path: str
+        Absolute path to scan.
+    relative: str
+        Path to scan, relative to the indexed root.
+    suffixes: tuple(str)
+        Notebook files suffixes.
+
+    Returns
+    -------
+    generator(str, str, os.stat_result)
+        Relative path, absolute path and stat of every notebook file.
+    """
+    with os.scandir(path) as entries:
+        for entry in entries:
+            name = relative + entry.name
+            if entry.name.startswith('.'):
+                continue
+            elif entry.is_dir():
+                yield from _scan(entry.path, name + '/', suffixes)
+            elif entry.name.endswith(suffixes):
+                yield name, entry.path, entry.stat()
+
+
+def load(f):
+    """ Load the index file.
+
+    Parameters
+    ----------
+    f: str
+        Path to the index file.
+
+    Returns
+    -------
+    dict
+        Indexed notebooks by relative path. Empty if the index does not
+        exist or has been written by another index version.
+    """
+    try:
+        with open(f, 'r') as index_file:
+            index = json.load(index_file)
+    except (OSError, ValueError):
+        return {}
+
+    if index.get('version') != INDEX_VERSION:
+        return {}
+
+    return index['notebooks']
+
+
+def save(f, notebooks):
+    """ Save the index file.
+
+    The index is written to a temporary file first, so a killed runner never
+    leaves a truncated index behind.
+
+    Parameters
+    ----------
+    f: str
+        Path to the index file.
+    notebooks: dict
+        Indexed notebooks by relative path.
+    """
+    tmp = '{}.tmp'.format(f)
+    with open(tmp, 'w') as index_file:
+        json.dump(dict(version=INDEX_VERSION, notebooks=notebooks),
+                  index_file)
+    os.replace(tmp, f)
+
+
+def update(root_path, index_path, suffixes=('.ipynb',)):
+    """ Update the index of the notebooks under the root path.
+
+    Only notebooks which are new or have been modified since the last update,
+    by their modification time and size, are read again. Python files which
+    are not percent-format scripts are indexed, so they are not read again
+    either, but they are not notebooks.
+
+    Parameters
+    ----------
+    root_path: str
+        Root testing path.
+    index_path: str
+        Path to the index file.
+    suffixes: tuple(str)
+        Notebook files suffixes.
+
+    Returns
+    -------
+    dict
+        Indexed notebooks by relative path. Each one holds its `mtime`,
+        `size`, `tags` and whether it is a `notebook`, which is always
+        true.
+    """
+    indexed = load(index_path)
+    notebooks = {}
+    changed = 0
+
+    for name, path, stat in _scan(str(root_path), '', suffixes):
+        entry = indexed.get(name)
+        if not entry or entry['mtime'] != stat.st_mtime_ns \
+                or entry['size'] != stat.st_size:
+            notebook = not name.endswith('.py') or percent.is_script(path)
+            entry = dict(mtime=stat.st_mtime_ns,
+                         size=stat.st_size,
+                         tags=_read_tags(path) if notebook else [],
+                         notebook=notebook)
+            changed += 1
+        notebooks[name] = entry
+
+    if changed or len(notebooks) != len(indexed):
+        logger.debug('Index updated: %s notebooks, %s read',
+                     len(notebooks), changed)
+        save(index_path, notebooks)
+
+    return {k: v for k, v in notebooks.items() if v['notebook']}
+
+
+def _match_path(pattern, name):
+    """ Check if a notebook matches a path expression.
+
+    Path expressions are shell-style wildcards matched against the notebook
+    path relative to the root, or against any of its parent directories.
+
+    >>> _match_path('A/*/c.ipynb', 'A/B/c.ipynb')
+    True
+    >>> _match_path('A/B', 'A/B/c.ipynb')
+    True
+
+    Parameters
+    ----------
+    pattern: str
+        Path expression.
+    name: str
+        Notebook path, relative to the root.
+
+    Returns
+    -------
+    bool
+        True if the notebook or any of its parents matches.
+    """
+    path = PurePosixPath(name)
+    return any(fnmatchcase(str(x), pattern.strip('/'))
+               for x in [path] + list(path.parents)[:-1])
+
+
+def select(notebooks, tags=None, paths=None):
+    """ Select notebooks by tags and path expressions.
+
+    A notebook is selected if it has any of the given tags and matches any
+    of the given path expressions. Missing criteria select everything.
+
+    Parameters
+    ----------
+    notebooks: dict
+        Indexed notebooks by relative path, as returned by `update`.
+    tags: list(str)
+        Tags to select.
+    paths: list(str)
+        Path expressions to select.
+
+    Returns
+    -------
+    list(str)
+        Selected notebook relative paths.
+    """
+    tags = set(tags or [])
+    return [
+        name for name, entry in notebooks.items()
+        if (not tags or tags.intersection(entry['tags']))
+        and (not paths or any(_match_path(x, name) for x in paths))
+    ]
@@ -0,0 +1,176 @@
+# -*- coding: utf-8 -*-
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+
+import hashlib
+import json
+import logging
+import os
+
+from nb2report.archive import open_file
+
+
+logger = logging.getLogger('nb2report')
+
+HASH_CHUNK_SIZE = 1 << 16
+
+
+def hash_file(f):
+    """ Get the content hash of some file.
+
+    Parameters
+    ----------
+    f: str or Member
+        Path to the file, or archive member.
+
+    Returns
+    -------
+    str
+        Hex digest of the sha256 hash of the file content.
+    """
+    digest = hashlib.sha256()
+    with open_file(f, 'rb') as content:
+        for chunk in iter(lambda: content.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+
+    return digest.hexdigest()
+
+
+def _truncate_torn_tail(f):
+    """ Truncate the last line of a journal file if it is not terminated.
+
+    The runner being killed while appending a record leaves a torn line
+    without trailing newline. Appending after it would glue the next record
+    to the fragment, and both would be skipped on load.
+
+    Parameters
+    ----------
+    f: str
+        Path to the journal file.
+    """
+    with open(f, 'rb+') as journal:
+        end = journal.seek(0, os.SEEK_END)
+        position = end
+        while position > 0:
+            start = max(0, position - HASH_CHUNK_SIZE)
+            journal.seek(start)
+            newline = journal.read(position - start).rfind(b'\n')
+            if newline != -1:
+                position = start + newline + 1
+                break
+            position = start
+        if position != end:
+            logger.warning('Truncating torn journal line of %s', f)
+            journal.truncate(position)
+
+
+def open_journal(f, resume=False):
+    """ Open the journal file for appending results.
+
+    When resuming, a torn last line, as the one being written when the
+    runner was killed, is truncated first.
+
+    Parameters
+    ----------
+    f: str
+        Path to the journal file.
+    resume: bool
+        If True, keep the already recorded results. Otherwise, the journal
+        is truncated and a new run starts.
+
+    Returns
+    -------
+    file
+        Journal file opened in text mode.
+    """
+    if resume and os.path.isfile(f):
+        _truncate_torn_tail(f)
+
+    return open(f, 'a' if resume else 'w')
+
+
+def append(journal, record):
+    """ Append a result record to the journal.
+
+    The record is flushed and synced to disk before returning, so it
+    survives the runner being killed right after.
+
+    Parameters
+    ----------
+    journal: file
+        Journal file, as returned by `open_journal`.
+    record: dict
+        Result record. It must be JSON serializable and contain, at least,
+        the `path` key.
+    """
+    journal.write(json.dumps(record) + '\n')
+    journal.flush()
+    os.fsync(journal.fileno())
+
+
+def load(f):
+    """ Load all the result records of a journal file.
+
+    Lines which cannot be decoded, as the one being written when the runner
+    was killed, are skipped. When some path has been recorded several times
+    the last record wins.
+
+    Parameters
+    ----------
+    f: str
+        Path to the journal file.
+
+    Returns
+    -------
+    dict
+        Result records by path. Empty if the journal does not exist.
+    """
+    records = {}
+    if not os.path.isfile(f):
+        return records
+
+    with open(f, 'r') as journal:
+        for line in journal:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                logger.warning('Skipping corrupted journal line: %s', line)
+                continue
+            records[record['path']] = record
+
+    return records
+
+
+def merge(f, sources):
+    """ Merge the records of several journals into another one.
+
+    Journals written by separate runs, as shards of the same tests executed
+    on different machines, are merged in the given order, so for any path
+    recorded by several of them the last one wins. Records already in the
+    target journal come first.
+
+    The merged journal is written to a temporary file first, so a killed
+    merge never leaves a truncated journal behind.
+
+    Parameters
+    ----------
+    f: str
+        Path to the target journal file.
+    sources: list(str)
+        Paths to the journal files to merge.
+
+    Returns
+    -------
+    int
+        Number of records of the merged journal.
+    """
+    records = load(f)
+    for source in sources:
+        records.update(load(source))
+
+    tmp = '{}.tmp'.format(f)
+    with open(tmp, 'w') as journal:
+        for record in records.values():
+            journal.write(json.dumps(record) + '\n')
+    os.replace(tmp, f)
+
+    return len(records)
@@ -0,0 +1,389 @@
+# -*- coding: utf-8 -*-
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+
+import logging
+import queue
+import time
+
+from nb2report.coordinator import ERROR_RESULT
+
+logger = logging.getLogger('nb2report')
+
+DEFAULT_KERNEL = 'python3'
+STARTUP_TIMEOUT = 60.0
+POLL_INTERVAL = 1.0
+CRASHED_RESULT = 'CRASHED'
+
+
+class KernelDied(RuntimeError):
+    """ The kernel executing some cell died before replying. """
+
+
+def kernel_name(notebook):
+    """ Get the name of the kernel declared by some notebook.
+
+    >>> kernel_name({'metadata': {'kernelspec': {'name': 'ir'}}})
+    'ir'
+    >>> kernel_name({'metadata': {}})
+    'python3'
+
+    Parameters
+    ----------
+    notebook: dict
+        Loaded notebook.
+
+    Returns
+    -------
+    str
+        Kernel spec name. DEFAULT_KERNEL if the notebook declares none.
+    """
+    spec = notebook.get('metadata', {}).get('kernelspec') or {}
+    return spec.get('name') or DEFAULT_KERNEL
+
+
+class _Kernel(object):
+    """ Running local kernel, with its manager and its client. """
+    __slots__ = ('name', 'manager', 'client')
+
+    def __init__(self, name, manager, client):
+        self.name = name
+        self.manager = manager
+        self.client = client
+
+    @classmethod
+    async def start(cls, name):
+        """ Start a kernel and wait for it to be ready.
+
+        Parameters
+        ----------
+        name: str
+            Kernel spec name.
+
+        Returns
+        -------
+        _Kernel
+            Started kernel.
+        """
+        from jupyter_client import AsyncKernelManager
+
+        logger.debug('Starting %s kernel', name)
+        manager = AsyncKernelManager(kernel_name=name)
+        await manager.start_kernel()
+        client = manager.client()
+        client.start_channels()
+        try:
+            await client.wait_for_ready(timeout=STARTUP_TIMEOUT)
+        except BaseException:
+            client.stop_channels()
+            await manager.shutdown_kernel(now=True)
+            raise
+
+        return cls(name, manager, client)
+
+    async def execute(self, code):
+        """ Execute some code, collecting its output messages.
+
+        Parameters
+        ----------
+        code: str
+            Code to execute.
+
+        Returns
+        -------
+        dict
+            Output of the code: the plain text of its execute `result`, its
+            `stdout` and its `error`, as 'name: value'. The result and the
+            error are None if there was none.
+
+        Raises
+        ------
+        KernelDied
+            If the kernel died while executing the code.
+        """
+        msg_id = self.client.execute(code, store_history=False)
+        output = dict(result=None, stdout='', error=None)
+
+        while True:
+            try:
+                msg = await self.client.get_iopub_msg(timeout=POLL_INTERVAL)
+            except queue.Empty:
+                if not await self.manager.is_alive():
+                    raise KernelDied('{} kernel died'.format(self.name))
+                continue
+
+            if msg['parent_header'].get('msg_id') != msg_id:
+                continue
+            msg_type, content = msg['msg_type'], msg['content']
+            if msg_type == 'execute_result':
+                output['result'] = content['data'].get('text/plain')
+            elif msg_type == 'stream' and content['name'] == 'stdout':
+                output['stdout'] += content['text']
+            elif msg_type == 'error':
+                output['error'] = '{}: {}'.format(content['ename'],
+                                                  content['evalue'])
+            elif msg_type == 'status' \
+                    and content['execution_state'] == 'idle':
+                return output
+
+    async def shutdown(self):
+        """ Shut the kernel down, even if it already died. """
+        self.client.stop_channels()
+        try:
+            await self.manager.shutdown_kernel(now=True)
+        except Exception as ex:
+            logger.warning('Cannot shut %s kernel down: %s', self.name, ex)
+
+
+class KernelPool(object):
+    """ Pool of local kernels, reused across notebooks.
+
+    At most `size` kernels run at once. Idle kernels are kept by name for
+    the next notebook declaring the same kernel, and an idle kernel of
+    another name is shut down when a new one does not fit in the pool.
+    Kernels which died are replaced by new ones.
+    """
+
+    def __init__(self, size):
+        import asyncio
+
+        self.size = size
+        self.idle = {}
+        self.running = 0
+        self.slots = asyncio.Semaphore(size)
+
+    async def acquire(self, name):
+        """ Get a kernel, starting it if there is no idle one.
+
+        Parameters
+        ----------
+        name: str
+            Kernel spec name.
+
+        Returns
+        -------
+        _Kernel
+            Kernel for the exclusive use of the caller, until released.
+        """
+        await self.slots.acquire()
+        try:
+            if self.idle.get(name):
+                return self.idle[name].pop()
+            if self.running >= self.size:
+                other = next(x for x in self.idle.values() if x).pop()
+                self.running -= 1
+                await other.shutdown()
+            kernel = await _Kernel.start(name)
+            self.running += 1
+            return kernel
+        except BaseException:
+            self.slots.release()
+            raise
+
+    async def release(self, kernel, alive=True):
+        """ Give a kernel back to the pool.
+
+        Parameters
+        ----------
+        kernel: _Kernel
+            Kernel, as returned by `acquire`.
+        alive: bool
+            False if the kernel died, to shut it down instead of reusing it.
+        """
+        try:
+            if alive:
+                self.idle.setdefault(kernel.name, []).append(kernel)
+            else:
+                self.running -= 1
+                await kernel.shutdown()
+        finally:
+            self.slots.release()
+
+    async def close(self):
+        """ Shut all the idle kernels down. """
+        for kernels in self.idle.values():
+            while kernels:
+                self.running -= 1
+                await kernels.pop().shutdown()
+
+
+def _error_record(error):
+    """ Get the test result record of a notebook failing with some error.
+
+    Parameters
+    ----------
+    error: Exception
+        Error.
+
+    Returns
+    -------
+    dict
+        ERROR test result record, without asserts, with the error message.
+    """
+    return dict(result=ERROR_RESULT, seconds=None, asserts=[],
+                error='{}: {}'.format(type(error).__name__, error))
+
+
+async def _execute_notebook(pool, name, cells, evaluate, fail_fast=False):
+    """ Execute the asserts of some notebook on a kernel of the pool.
+
+    Parameters
+    ----------
+    pool: KernelPool
+        Kernel pool.
+    name: str
+        Kernel spec name.
+    cells: list(tuple(int, str)) or Exception
+        Index and code of every assert cell, or the error raised planning
+        the notebook.
+    evaluate: callable
+        Called with the output of each assert. It returns True if the
+        assert passed.
+    fail_fast: bool
+        Stop executing asserts as soon as one of them is not true.
+
+    Returns
+    -------
+    dict
+        Test result record, as the in-process one. Its result is CRASHED if
+        the kernel died, and ERROR, with the `error` message, if the
+        notebook could not be planned, its kernel could not be started or
+        the kernel failed otherwise.
+    """
+    if isinstance(cells, Exception):
+        return _error_record(cells)
+
+    try:
+        kernel = await pool.acquire(name)
+    except Exception as ex:
+        logger.error('Cannot start kernel %s: %s', name, ex)
+        return _error_record(ex)
+
+    start = time.perf_counter()
+    alive = True
+    asserts = []
+
+    try:
+        for cell_index, code in cells:
+            cell_start = time.perf_counter()
+            output = await kernel.execute(code)
+            if output['error'] is not None:
+                text, passed = output['error'], False
+            else:
+                text = output['result'] if output['result'] is not None \
+                    else output['stdout'].strip()
+                passed = evaluate(text)
+            asserts.append(dict(cell=cell_index, passed=passed, output=text,
+                                seconds=time.perf_counter() - cell_start))
+            if fail_fast and not passed:
+                break
+    except KernelDied as ex:
+        logger.error('%s executing cell %s', ex, cell_index)
+        alive = False
+        result = CRASHED_RESULT
+    except Exception as ex:
+        logger.exception('Error executing cell %s', cell_index)
+        alive = False
+        return dict(_error_record(ex), seconds=time.perf_counter() - start,
+                    asserts=asserts)
+    else:
+        result = 'OK' if asserts and all(x['passed'] for x in asserts) \
+            else 'KO'
+    finally:
+        await pool.release(kernel, alive)
+
+    return dict(result=result, seconds=time.perf_counter() - start,
+                asserts=asserts)
+
+
+async def _run(tasks, results, size, evaluate, fail_fast):
+    """ Execute notebook tasks on a kernel pool, putting their results on
+    some queue.
+
+    `size` runners share the task iterator, so there are never more
+    notebooks in flight than kernels. A None result ends the queue.
+    """
+    import asyncio
+
+    pool = KernelPool(size)
+
+    async def _runner():
+        for key, name, cells in tasks:
+            outcome = await _execute_notebook(pool, name, cells, evaluate,
+                                              fail_fast=fail_fast)
+            await results.put((key, outcome))
+
+    runners = [asyncio.ensure_future(_runner()) for _ in range(size)]
+    try:
+        await asyncio.gather(*runners)
+    finally:
+        for runner in runners:
+            runner.cancel()
+        await asyncio.gather(*runners, return_exceptions=True)
+        await pool.close()
+        results.put_nowait(None)
+
+
+def execute(tasks, size, evaluate, fail_fast=False):
+    """ Execute notebooks concurrently on a pool of local Jupyter kernels.
+
+    All the kernels are driven from a single event loop, run by this
+    generator between results, so notebooks keep executing in their
+    kernels while results are consumed. Closing the generator cancels the
+    pending work and shuts all the kernels down.
+
+    A kernel dying, as on a segmentation fault, only fails the notebook it
+    was executing, as CRASHED. Its kernel is replaced for the next ones.
+    Notebooks which cannot be planned, or whose kernel cannot be started,
+    as one which is not installed, fail as ERROR without stopping the run.
+
+    Requires jupyter_client and the kernels declared by the notebooks.
+
+    Parameters
+    ----------
+    tasks: iterable(tuple(object, str, list(tuple(int, str))))
+        Key of each notebook, name of its kernel spec, and index and code of
+        every assert cell, or the exception raised planning it. It is
+        consumed lazily.
+    size: int
+        Maximum number of running kernels.
+    evaluate: callable
+        Called with the output of each assert: the plain text of its
+        execute result, or its stripped stdout if it had none. It returns
+        True if the assert passed. Asserts raising an error never pass.
+    fail_fast: bool
+        Stop executing each notebook at its first failing assert.
+
+    Returns
+    -------
+    generator(object, dict)
+        Key and test result record of each notebook, in completion order.
+    """
+    import asyncio
+
+    loop = asyncio.new_event_loop()
+    results = loop.run_until_complete(_new_queue())
+    runner = loop.create_task(_run(iter(tasks), results, size, evaluate,
+                                   fail_fast))
+
+    try:
+        while True:
+            item = loop.run_until_complete(results.get())
+            if item is None:
+                break
+            yield item
+        loop.run_until_complete(runner)
+    finally:
+        if not runner.done():
+            runner.cancel()
+            try:
+                loop.run_until_complete(runner)
+            except asyncio.CancelledError:
+                pass
+        loop.close()
+
+
+async def _new_queue():
+    """ Create a result queue bound to the running event loop. """
+    import asyncio
+
+    return asyncio.Queue()
@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+
+from nb2report.archive import open_file
+
+
+CELL_MARKER = '# %%'
+MARKDOWN_TAGS = ('[markdown]', '[md]')
+
+
+def _new_cell(marker):
+    """ Create the cell starting at some cell marker line.
+
+    Cells are code cells unless their marker is tagged as markdown:
+
+        # %% [markdown]
+
+    Parameters
+    ----------
+    marker: str
+        Cell marker line.
+
+    Returns
+    -------
+    dict
+        iPython notebook cell representation, with an empty source.
+    """
+    tags = marker[len(CELL_MARKER):].split()
+    is_markdown = any(x in MARKDOWN_TAGS for x in tags)
+    return dict(cell_type='markdown' if is_markdown else 'code', source=[])
+
+
+def _end_cell(cell):
+    """ Finish a cell, dropping the blank lines separating it from the next.
+
+    Parameters
+    ----------
+    cell: dict
+        iPython notebook cell representation.
+
+    Returns
+    -------
+    dict
+        The same cell.
+    """
+    while cell['source'] and not cell['source'][-1].strip():
+        cell['source'].pop()
+
+    return cell
+
+
+def _uncomment(line):
+    """ Remove the comment token of a markdown cell line.
+
+    >>> _uncomment('# # Asserts\\n')
+    '# Asserts\\n'
+    >>> _uncomment('#\\n')
+    '\\n'
+
+    Parameters
+    ----------
+    line: str
+        Markdown cell line.
+
+    Returns
+    -------
+    str
+        Markdown line.
+    """
+    if line.startswith('# '):
+        return line[2:]
+    if line.startswith('#'):
+        return line[1:]
+
+    return line
+
+
+def iter_cells(f):
+    """ Read the cells of a percent-format script, line by line.
+
+    Cells are separated by '# %%' marker lines, and markdown cells are
+    commented out:
+
+        # %%
+        some_setup()
+
+        # %% [markdown]
+        # # Asserts
+
+        # %%
+        some_test() == True
+
+    Lines before the first marker form a code cell of their own, if they are
+    not blank.
+
+    Parameters
+    ----------
+    f: str or Member
+        Path to the script file, or archive member.
+
+    Returns
+    -------
+    generator(dict)
+        iPython notebook cell representations, as they are read.
+    """
+    cell = dict(cell_type='code', source=[])
+
+    with open_file(f, 'r') as script:
+        for line in script:
+            if line.startswith(CELL_MARKER):
+                if _end_cell(cell)['source']:
+                    yield cell
+                cell = _new_cell(line)
+            elif cell['cell_type'] == 'markdown':
+                cell['source'].append(_uncomment(line))
+            else:
+                cell['source'].append(line)
+
+    if _end_cell(cell)['source']:
+        yield cell
+
+
+def is_script(f):
+    """ Check if some python file is a percent-format script.
+
+    Only scripts whose first non-blank line is a cell marker are notebooks,
+    so plain modules next to the notebooks, as helpers imported by them,
+    are not executed as tests.
+
+    Parameters
+    ----------
+    f: str or Member
+        Path to the python file, or archive member.
+
+    Returns
+    -------
+    bool
+        True if the file is a percent-format script.
+    """
+    try:
+        with open_file(f, 'r') as script:
+            for line in script:
+                if line.strip():
+                    return line.startswith(CELL_MARKER)
+    except (OSError, UnicodeDecodeError):
+        pass
+
+    return False
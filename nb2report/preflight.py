@@ -0,0 +1,180 @@
+# -*- coding: utf-8 -*-
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+
+import json
+import logging
+import multiprocessing
+import os
+
+from nb2report import archive, percent
+from nb2report.cell_utils import classify_cells
+
+
+logger = logging.getLogger('nb2report')
+
+MIN_POOL_NOTEBOOKS = 256
+CHUNK_SIZE = 64
+
+
+class PreflightError(ValueError):
+    """ Some notebooks cannot be executed.
+
+    Attributes
+    ----------
+    problems: list(dict)
+        Problems found, as returned by `check`.
+    """
+
+    def __init__(self, problems):
+        self.problems = problems
+        super(PreflightError, self).__init__(
+            '{} problems found in {} notebooks:\n{}'.format(
+                len(problems),
+                len(set(x['path'] for x in problems)),
+                format_report(problems)
+            )
+        )
+
+
+def check_notebook(f):
+    """ Check that some notebook can be executed.
+
+    A notebook can be executed if it is valid JSON, or a percent-format
+    script, with well formed cells, none of them with an empty source,
+    an "# Asserts" markdown cell and at least one code assert after it.
+
+    Parameters
+    ----------
+    f: Path or Member
+        Path to the notebook file, or archive member.
+
+    Returns
+    -------
+    list(tuple(int, str))
+        Cell index, None for the whole notebook, and description of every
+        problem found. Empty if the notebook can be executed.
+    """
+    try:
+        if str(f).endswith('.py'):
+            raw_cells = list(percent.iter_cells(f))
+        else:
+            with archive.open_file(f, 'r') as json_file:
+                raw_cells = json.load(json_file)['cells']
+        cells = list(classify_cells(raw_cells))
+    except OSError as ex:
+        return [(None, 'Cannot read notebook: {}'.format(ex))]
+    except ValueError as ex:
+        return [(None, 'Invalid JSON: {}'.format(ex))]
+    except (AssertionError, KeyError, TypeError):
+        return [(None, 'Invalid notebook structure')]
+
+    problems = [(i, 'Empty cell source')
+                for i, x in enumerate(cells) if not x.source]
+
+    assert_cell_index = next((i for i, x in enumerate(cells)
+                              if x.is_markdown and x.is_assert), None)
+    if assert_cell_index is None:
+        problems.append((None, 'Asserts cell cannot be found'))
+    elif not any(x.is_code and x.source
+                 for x in cells[assert_cell_index + 1:]):
+        problems.append((assert_cell_index, 'No code assert after the '
+                                            'asserts cell'))
+
+    return problems
+
+
+def _check_task(item):
+    """ Check some notebook as a preflight task.
+
+    Parameters
+    ----------
+    item: tuple(str, Path or Member)
+        Notebook key and path.
+
+    Returns
+    -------
+    str, list(tuple(int, str))
+        Notebook key and its problems.
+    """
+    key, f = item
+    return key, check_notebook(f)
+
+
+def check(notebooks, workers=None):
+    """ Check that all the given notebooks can be executed.
+
+    Notebooks are checked on a pool of worker processes, so thousands of
+    them take seconds. Few notebooks, or a single worker, check them in
+    this process, as starting the pool would take longer.
+
+    Parameters
+    ----------
+    notebooks: dict(str, Path or Member)
+        Path to every notebook file by its key, as its path relative to the
+        root testing path.
+    workers: int
+        Number of worker processes. None for one per CPU.
+
+    Returns
+    -------
+    list(dict)
+        Every problem found, with the `path` key of its notebook, its `cell`
+        index, None for the whole notebook, and its `problem` description,
+        sorted by notebook. Empty if all the notebooks can be executed.
+    """
+    items = list(notebooks.items())
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(items) < MIN_POOL_NOTEBOOKS:
+        problems = _collect(map(_check_task, items))
+    else:
+        with multiprocessing.Pool(workers) as pool:
+            problems = _collect(pool.imap_unordered(_check_task, items,
+                                                    chunksize=CHUNK_SIZE))
+
+    logger.info('Preflight checked %s notebooks, %s problems found',
+                len(items), len(problems))
+    return problems
+
+
+def _collect(checked):
+    """ Collect the problems of some checked notebooks.
+
+    Parameters
+    ----------
+    checked: iterable(str, list(tuple(int, str)))
+        Notebook key and its problems.
+
+    Returns
+    -------
+    list(dict)
+        Problem records, sorted by notebook and cell.
+    """
+    problems = [dict(path=key, cell=cell, problem=problem)
+                for key, found in checked for cell, problem in found]
+    return sorted(problems, key=lambda x: (x['path'].split('/'),
+                                           -1 if x['cell'] is None
+                                           else x['cell']))
+
+
+def format_report(problems):
+    """ Format some preflight problems, one per line.
+
+    >>> print(format_report([dict(path='A/b.ipynb', cell=None,
+    ...                           problem='Asserts cell cannot be found')]))
+    A/b.ipynb: Asserts cell cannot be found
+
+    Parameters
+    ----------
+    problems: list(dict)
+        Problems, as returned by `check`.
+
+    Returns
+    -------
+    str
+        Report, with the notebook and the cell of every problem.
+    """
+    return '\n'.join(
+        '{}: {}'.format(x['path'], x['problem']) if x['cell'] is None
+        else '{} (cell {}): {}'.format(x['path'], x['cell'], x['problem'])
+        for x in problems
+    )
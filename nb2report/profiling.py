@@ -0,0 +1,233 @@
+# -*- coding: utf-8 -*-
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+
+import cProfile
+import json
+import logging
+import os
+import pstats
+
+from pathlib import Path
+
+
+logger = logging.getLogger('nb2report')
+
+PROFILE_SUFFIX = '.pstats'
+COLLAPSED_FILE_NAME = 'profile.collapsed'
+SUMMARY_FILE_NAME = 'profile.json'
+CELL_FILENAME_PREFIX = '<ipython-input-'
+MIN_STACK_SECONDS = 1e-6
+
+
+def stats_path(profile_dir, key):
+    """ Get the path of the profile of some notebook.
+
+    Profiles mirror the testing tree, so the profile of 'A/B/c.ipynb' is
+    saved at 'A/B/c.ipynb.pstats' under the profile directory.
+
+    Parameters
+    ----------
+    profile_dir: Path
+        Profile directory.
+    key: str
+        Notebook path, relative to the root testing directory.
+
+    Returns
+    -------
+    Path
+        Path to the profile file.
+    """
+    return Path(profile_dir) / (key + PROFILE_SUFFIX)
+
+
+def profile_call(path, func, *args, **kwargs):
+    """ Call some function under the profiler.
+
+    The profile is saved even if the function raises.
+
+    Parameters
+    ----------
+    path: Path
+        Path to the profile file to save.
+    func: callable
+        Function to profile.
+    args, kwargs
+        Function arguments.
+
+    Returns
+    -------
+    object
+        Function result.
+    """
+    profiler = cProfile.Profile()
+    try:
+        return profiler.runcall(func, *args, **kwargs)
+    finally:
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        profiler.dump_stats(str(path))
+
+
+def _is_cell(func):
+    """ Check if some profiled function is code of a notebook cell.
+
+    Parameters
+    ----------
+    func: tuple(str, int, str)
+        Profiled function, as its file name, line number and name.
+
+    Returns
+    -------
+    bool
+        True if the function was compiled from a cell by iPython.
+    """
+    return func[0].startswith(CELL_FILENAME_PREFIX)
+
+
+def _label(func):
+    """ Get the collapsed stack frame label of some profiled function.
+
+    >>> _label(('/a/b/reporting.py', 10, '_run_cell'))
+    '_run_cell (reporting.py:10)'
+
+    Parameters
+    ----------
+    func: tuple(str, int, str)
+        Profiled function, as its file name, line number and name.
+
+    Returns
+    -------
+    str
+        Frame label. It never contains the ';' frame separator.
+    """
+    filename, line, name = func
+    if filename == '~':  # built-in functions
+        label = name
+    else:
+        label = '{} ({}:{})'.format(name, os.path.basename(filename), line)
+
+    return label.replace(';', ',')
+
+
+def iter_stacks(stats):
+    """ Rebuild the call stacks of a profile, with their own time.
+
+    Profiles only keep the time of every caller to callee edge, so stacks
+    are rebuilt walking the call graph from its roots, and the time of
+    every function is split among its stacks as its callers' time is.
+    Recursive calls are cut, and stacks below MIN_STACK_SECONDS are dropped.
+
+    Parameters
+    ----------
+    stats: pstats.Stats
+        Profile statistics.
+
+    Returns
+    -------
+    generator(tuple, float)
+        Stack, as a tuple of profiled functions from the root, and the time
+        spent in its last function itself, in seconds.
+    """
+    raw = stats.stats
+    callees = {}
+    for func, (_, _, _, _, callers) in raw.items():
+        for caller, edge in callers.items():
+            callees.setdefault(caller, []).append((func, edge[3]))
+
+    def _walk(func, stack, scale):
+        stack = stack + (func,)
+        own = raw[func][2] * scale
+        if own >= MIN_STACK_SECONDS:
+            yield stack, own
+
+        for callee, cumulative in callees.get(func, []):
+            share = cumulative * scale
+            if callee not in stack and raw[callee][3] \
+                    and share >= MIN_STACK_SECONDS:
+                yield from _walk(callee, stack, share / raw[callee][3])
+
+    for root in [x for x, v in raw.items() if not v[4]]:
+        yield from _walk(root, (), 1.0)
+
+
+def _summarize(stats, collapsed):
+    """ Collapse the stacks of a profile and split its time.
+
+    Time is split between user cells, for stacks going through some cell
+    code, and nb2report, for everything else: notebook loading, output
+    capture and cleaning, and iPython execution machinery.
+
+    Parameters
+    ----------
+    stats: pstats.Stats
+        Profile statistics.
+    collapsed: dict
+        Collapsed stacks time, in microseconds, by stack label. It is
+        updated with the stacks of this profile.
+
+    Returns
+    -------
+    dict
+        Seconds spent in `cells` and in `nb2report`.
+    """
+    split = dict(cells=0.0, nb2report=0.0)
+
+    for stack, seconds in iter_stacks(stats):
+        split['cells' if any(map(_is_cell, stack)) else 'nb2report'] += \
+            seconds
+        label = ';'.join(map(_label, stack))
+        collapsed[label] = collapsed.get(label, 0) + seconds * 1e6
+
+    return split
+
+
+def aggregate(profile_dir):
+    """ Aggregate all the profiles saved at some profile directory.
+
+    Two files are written to the profile directory:
+
+        COLLAPSED_FILE_NAME: collapsed stacks of all the profiles, one
+            'frame;frame;frame microseconds' line per stack, as flame graph
+            tools read them.
+        SUMMARY_FILE_NAME: time spent in user cells and in nb2report by
+            profile, and their totals.
+
+    Parameters
+    ----------
+    profile_dir: Path
+        Profile directory.
+
+    Returns
+    -------
+    dict
+        Profile summary.
+    """
+    profile_dir = Path(profile_dir)
+    collapsed = {}
+    profiles = {}
+
+    for f in sorted(profile_dir.rglob('*' + PROFILE_SUFFIX)):
+        try:
+            stats = pstats.Stats(str(f))
+        except (OSError, TypeError, ValueError) as ex:
+            logger.warning('Cannot read profile %s: %s', f, ex)
+            continue
+        key = f.relative_to(profile_dir).as_posix()[:-len(PROFILE_SUFFIX)]
+        profiles[key] = _summarize(stats, collapsed)
+
+    with open(str(profile_dir / COLLAPSED_FILE_NAME), 'w') as f:
+        for label in sorted(collapsed):
+            if int(collapsed[label]):
+                f.write('{} {}\n'.format(label, int(collapsed[label])))
+
+    summary = dict(
+        profiles=profiles,
+        total=dict(
+            cells=sum(x['cells'] for x in profiles.values()),
+            nb2report=sum(x['nb2report'] for x in profiles.values())
+        )
+    )
+    with open(str(profile_dir / SUMMARY_FILE_NAME), 'w') as f:
+        json.dump(summary, f, indent=2, sort_keys=True)
+
+    logger.info('Profile aggregated at %s', profile_dir)
+    return summary
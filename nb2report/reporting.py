@@ -2,27 +2,34 @@
 # vim: tabstop=4 shiftwidth=4 softtabstop=4
 
 import argparse
+import hashlib
+import multiprocessing
 import re
 import os
 import json
 import sys
 import logging
-import jinja2
+import time
 
-from pathlib import Path
-from nb2report.cell_utils import is_assert, is_markdown, is_code, get_code
+from functools import partial
+from pathlib import Path, PurePosixPath
+from nb2report import archive, budgets, concurrency, coordinator, \
+    fixtures, index, journal, kernels, percent, sampling, tracing
+from nb2report.cell_utils import classify_cells
+from nb2report.preflight import PreflightError, check as check_notebooks
+from nb2report.sinks import emit, open_sinks, parse_sink
 
-from IPython.testing.globalipapp import get_ipython
-from IPython.utils.io import capture_output
 
-
-logging.basicConfig(stream=sys.stdout, level=logging.DEBUG)  # ToDo: INFO
 logger = logging.getLogger('nb2report')
 
 IPYTHON_INTERPRETER = None
+FIXTURES = None
 BASE_DIR = Path(os.path.abspath(os.path.dirname(__file__)))
 CONFIG_DIR = BASE_DIR / '.config'
 REPORTING_FILE_NAME = "summary.html"
+JOURNAL_FILE_NAME = "journal.jsonl"
+INDEX_FILE_NAME = "index.json"
+NOTEBOOK_SUFFIXES = (".ipynb", ".py")
 REPORTING_TEMPLATE = CONFIG_DIR / "report_template.html"
 REPORTING_ITEMS = []
 REPORTING_COLORS = [
@@ -32,6 +39,19 @@ REPORTING_COLORS = [
     'DarkSeaGreen',
     'MediumAquamarine'
 ]
+REPORTING_RESULT_COLORS = {
+    'OK': 'green',
+    'KO': 'red',
+    'PENDING': 'gray',
+    'SKIPPED': 'gray',
+    'NOT RUN': 'gray',
+    'OOM': 'red',
+    coordinator.LOST_RESULT: 'red',
+    coordinator.ERROR_RESULT: 'red',
+    kernels.CRASHED_RESULT: 'red',
+    fixtures.SETUP_FAILED_RESULT: 'red',
+    budgets.OVER_BUDGET_RESULT: 'orange'
+}
 
 
 def _explore_scaffolding(path, scaffold, level=0):
@@ -39,34 +59,731 @@ def _explore_scaffolding(path, scaffold, level=0):
 
     Parameters
     ----------
-    path: str
+    path: Path
         Absolute path to explore.
-    scaffold: dict
-        Currently explored scaffold.
+    scaffold: list(dict)
+        Currently explored scaffold items.
     level: int
         Depth level of current exploration.
 
     Returns
     -------
-    dict
-        Explored scaffold.
+    list(dict)
+        Explored scaffold items, in walk order. Each item holds its `path`,
+        its depth `level` and whether it is a `notebook` or a directory.
+        Hidden files and directories, as .ipynb_checkpoints, fixture
+        notebooks and python files which are not percent-format scripts are
+        skipped.
     """
     if os.path.isdir(path):
-        if path not in scaffold['dirs']:
-            scaffold['dirs'][path] = {'dirs': {}, 'files': {}}
+        if level > 0:
+            scaffold.append(dict(path=path, level=level, notebook=False))
+
+        for x in sorted(os.listdir(path)):
+            if not x.startswith('.'):
+                _explore_scaffolding(path / x, scaffold, level + 1)
+    elif Path(path).suffix in NOTEBOOK_SUFFIXES \
+            and not fixtures.is_fixture(Path(path).name) \
+            and (Path(path).suffix != '.py' or percent.is_script(path)):
+        scaffold.append(dict(path=path, level=level, notebook=True))
+
+    return scaffold
 
-            if level > 0:
-                _add_report(path.name, '', REPORTING_COLORS[level])
 
-        [_explore_scaffolding(path / x, scaffold['dirs'][path], level + 1)
-         for x in os.listdir(path)]
-    elif Path(path).suffix == 'ipynb':
-        logger.debug('Add report %s' % path)
-        _add_report(path.name, _execute_test(path), REPORTING_COLORS[-1])
+def _build_scaffolding(root_path, notebooks):
+    """ Build the scaffolding of some notebooks.
+
+    The resulting scaffold holds the notebooks and the directories above
+    them, in the same order `_explore_scaffolding` would walk them. Fixture
+    notebooks are skipped.
+
+    Relative paths are handled as plain '/' separated strings, which are
+    much cheaper than Path objects on scaffolds with thousands of notebooks.
+
+    Parameters
+    ----------
+    root_path: Path or Member
+        Root testing path.
+    notebooks: iterable(str)
+        Notebook paths, relative to the root testing path.
+
+    Returns
+    -------
+    list(dict)
+        Scaffold items.
+    """
+    scaffold = []
+    explored = set()
+    for parts in sorted(x.split('/') for x in notebooks):
+        if fixtures.is_fixture(parts[-1]):
+            continue
+        for level in range(1, len(parts)):
+            directory = '/'.join(parts[:level])
+            if directory not in explored:
+                explored.add(directory)
+                scaffold.append(dict(path=root_path / directory,
+                                     level=level,
+                                     notebook=False))
+        scaffold.append(dict(path=root_path / '/'.join(parts),
+                             level=len(parts),
+                             notebook=True))
 
     return scaffold
 
 
+def _select_scaffolding(root_path, tags=None, paths=None):
+    """ Build the scaffolding of the selected notebooks.
+
+    Notebooks are selected through the persistent index, which is updated
+    before, so only new or modified notebooks are read.
+
+    Parameters
+    ----------
+    root_path: Path
+        Root testing path.
+    tags: list(str)
+        Select notebooks with any of these tags in their metadata.
+    paths: list(str)
+        Select notebooks matching any of these path expressions.
+
+    Returns
+    -------
+    list(dict)
+        Selected scaffold items.
+    """
+    notebooks = index.update(root_path,
+                             root_path / INDEX_FILE_NAME,
+                             NOTEBOOK_SUFFIXES)
+    return _build_scaffolding(root_path,
+                              index.select(notebooks, tags, paths))
+
+
+def _discover_scaffolding(root_path, archive_path=None, archive_prefix='',
+                          tags=None, paths=None):
+    """ Discover the scaffolding to execute.
+
+    Scaffolds are walked at the root testing path or, if some archive is
+    given, enumerated straight from the archive members, with no extraction.
+    Archives can hold the scaffold at their root or under its framework
+    name and version directories.
+
+    Parameters
+    ----------
+    root_path: Path
+        Root testing path.
+    archive_path: str
+        Path to a zip or (gzipped) tar archive holding the scaffold. None to
+        discover it at the root testing path.
+    archive_prefix: str
+        Leading directories of the scaffold in the archive, as
+        'framework/version', if it was archived from above its root.
+    tags: list(str)
+        Select notebooks with any of these tags in their metadata.
+    paths: list(str)
+        Select notebooks matching any of these path expressions.
+
+    Returns
+    -------
+    Path or Member, list(dict)
+        Scaffold root, which is an archive member for archives.
+        Scaffold items.
+    """
+    if archive_path:
+        if not archive.is_archive(archive_path):
+            raise ValueError('Unsupported scaffold archive, it must be one of '
+                             '{}: {}'.format(archive.ARCHIVE_SUFFIXES,
+                                             archive_path))
+        root = archive.find_root(str(archive_path), archive_prefix)
+        notebooks = archive.list_notebooks(root, NOTEBOOK_SUFFIXES)
+        if tags or paths:
+            notebooks = index.select(
+                {x: dict(tags=index._read_tags(root / x) if tags else [])
+                 for x in notebooks},
+                tags,
+                paths
+            )
+        return root, _build_scaffolding(root, notebooks)
+
+    if tags or paths:
+        return root_path, _select_scaffolding(root_path, tags, paths)
+
+    return root_path, _explore_scaffolding(root_path, scaffold=[])
+
+
+def _init_worker(max_memory=None, trace_path=None):
+    """ Initialize an execution worker process.
+
+    Parameters
+    ----------
+    max_memory: int
+        Address space limit of the worker, in megabytes. Allocations beyond
+        it raise MemoryError inside the executing notebook. None for no
+        limit.
+    trace_path: str
+        Path to the trace file of the run. None if tracing is disabled.
+    """
+    if trace_path != tracing.current_path():
+        tracing.start(trace_path)
+
+    from multiprocessing.util import Finalize
+
+    # Subtrees are torn down as the worker exits, unless it is terminated
+    globals()['FIXTURES'] = None
+    Finalize(None, _close_fixtures, exitpriority=10)
+
+    if max_memory:
+        import resource
+
+        _, hard = resource.getrlimit(resource.RLIMIT_AS)
+        resource.setrlimit(resource.RLIMIT_AS, (max_memory << 20, hard))
+
+
+def _execute_task(f, fail_fast=False, profile_dir=None, root_path=None,
+                  track_inputs=False, measure_rss=False):
+    """ Execute some test notebook file as an execution task.
+
+    Parameters
+    ----------
+    f: Path
+        Path to the notebook file.
+    fail_fast: bool
+        Stop executing asserts as soon as one of them is not true.
+    profile_dir: Path
+        Directory to save the profile of the notebook execution to. None to
+        execute it without profiling.
+    root_path: Path
+        Root testing path. Profiles are saved relative to it.
+    track_inputs: bool
+        Record the fingerprints of the files read and the modules imported
+        by the notebook.
+    measure_rss: bool
+        Record the peak resident set size of the worker process executing
+        the notebook, as `peak_rss`.
+
+    Returns
+    -------
+    Path, dict
+        Path to the notebook file.
+        Test result record, as returned by `_execute_notebook`. Its result
+        is OOM, without asserts, if the notebook ran out of memory, and
+        SETUP FAILED, without asserts, if the setup of any directory above
+        it failed. It is ERROR, without asserts and with the error message,
+        if the notebook cannot be executed, as when it has no asserts cell
+        or an assert output is not binary.
+    """
+    if measure_rss:
+        concurrency.reset_peak_rss()
+
+    try:
+        if _enter_fixtures(f, root_path):
+            outcome = dict(result=fixtures.SETUP_FAILED_RESULT, seconds=None,
+                           asserts=[])
+        elif profile_dir:
+            from nb2report import profiling
+
+            key = f.relative_to(root_path).as_posix()
+            outcome = profiling.profile_call(
+                profiling.stats_path(profile_dir, key),
+                _execute_notebook, f, fail_fast=fail_fast,
+                track_inputs=track_inputs
+            )
+        else:
+            outcome = _execute_notebook(f, fail_fast=fail_fast,
+                                        track_inputs=track_inputs)
+    except MemoryError:
+        logger.error('Notebook %s ran out of memory', f)
+        outcome = dict(result='OOM', seconds=None, asserts=[])
+    except Exception as ex:
+        # Raising would abort the whole run, and kill the pool with it
+        outcome = dict(result=coordinator.ERROR_RESULT, seconds=None,
+                       asserts=[], error='{}: {}'.format(type(ex).__name__,
+                                                         ex))
+
+    if measure_rss:
+        outcome['peak_rss'] = concurrency.peak_rss()
+
+    return f, outcome
+
+
+def _plan_kernel_task(f):
+    """ Get the kernel execution task of some notebook.
+
+    Parameters
+    ----------
+    f: Path or Member
+        Path to the notebook file.
+
+    Returns
+    -------
+    Path, str, list(tuple(int, str))
+        Path to the notebook file, name of its kernel spec, and index and
+        code of every assert cell. If the notebook cannot be read or has no
+        asserts cell, the error instead of the cells, so it only fails this
+        notebook.
+    """
+    try:
+        with tracing.span('load', path=str(f)) as span:
+            notebook = _load_notebook(f)
+            cells = list(classify_cells(notebook['cells']))
+            span.set(cells=len(cells))
+        assert_cell_index = _get_assert_cell_index(cells)
+    except (LookupError, OSError, ValueError) as ex:
+        logger.error('Cannot plan notebook %s: %s', f, ex)
+        return f, None, ex
+
+    return f, kernels.kernel_name(notebook), [
+        (i, x.code) for i, x in enumerate(cells)
+        if i > assert_cell_index and x.is_code
+    ]
+
+
+def _evaluate_kernel_output(output):
+    """ Evaluate the output of an assert executed on a kernel.
+
+    Parameters
+    ----------
+    output: str
+        Plain text execute result of the assert, or its stdout.
+
+    Returns
+    -------
+    bool
+        True if the output is true. Outputs which are not binary are
+        logged and do not pass, instead of aborting the run.
+    """
+    try:
+        return _evaluate_output(output) is True
+    except Exception:
+        return False
+
+
+def _execute_notebooks(notebooks, fail_fast=False, workers=None,
+                       max_memory=None, max_tasks_per_worker=None,
+                       profile_dir=None, root_path=None, serve=None,
+                       max_kernels=None, track_inputs=False, adaptive=None,
+                       history=None):
+    """ Execute the given notebooks, sequentially, on a pool of workers, on
+    a pool of Jupyter kernels or on TCP workers pulling them from a
+    coordinator.
+
+    Results are yielded in the same order as the notebooks, except for
+    kernels, TCP workers and adaptive pools, whose results are yielded as
+    they complete.
+    Closing the generator cancels all the pending work.
+
+    Notebooks executed on iPython interpreters, in this process or on
+    workers, run the setup and teardown notebooks of their directories once
+    per subtree and process. Teardowns of workers run when they exit, so
+    they are skipped if the work is cancelled.
+
+    Parameters
+    ----------
+    notebooks: list(Path)
+        Paths to the notebook files.
+    fail_fast: bool
+        Stop executing each notebook at its first failing assert.
+    workers: int
+        Number of worker processes. None to execute all the notebooks in
+        this process, unless a memory limit is set.
+    max_memory: int
+        Address space limit of each worker, in megabytes. None for no limit.
+    max_tasks_per_worker: int
+        Recycle each worker after executing this number of notebooks. None
+        to keep them for the whole run.
+    profile_dir: Path
+        Directory to save the profile of every notebook execution to. None
+        to execute them without profiling.
+    root_path: Path
+        Root testing path. Profiles are saved, and TCP worker tasks sent,
+        relative to it.
+    serve: tuple(str, int)
+        Host and port to serve the notebooks at, to TCP workers. None to
+        execute them locally.
+    max_kernels: int
+        Number of Jupyter kernels to execute the notebooks on, each one on
+        the kernel declared in its metadata. None to execute them on iPython
+        interpreters. Workers, memory limits, profiling and input tracking
+        do not apply to kernels.
+    track_inputs: bool
+        Record the fingerprints of the files read and the modules imported
+        by every notebook. TCP workers track them as they are started.
+    adaptive: tuple(int, int)
+        Minimum and maximum number of worker processes of an adaptive pool,
+        whose concurrency follows the CPU and memory available. Overrides
+        `workers`. None for a fixed pool. Kernels and TCP workers are not
+        adaptive.
+    history: dict
+        Peak RSS of previous executions by notebook path, relative to the
+        root testing path, to plan the concurrency of adaptive pools.
+
+    Returns
+    -------
+    generator(Path, dict)
+        Path and test result record of each notebook.
+    """
+    if max_kernels and not serve:
+        executions = kernels.execute(map(_plan_kernel_task, notebooks),
+                                     max_kernels, _evaluate_kernel_output,
+                                     fail_fast=fail_fast)
+        try:
+            yield from executions
+        finally:
+            executions.close()
+        return
+
+    if serve:
+        paths = {x.relative_to(root_path).as_posix(): x for x in notebooks}
+        executions = coordinator.serve(list(paths), serve)
+        try:
+            for key, outcome in executions:
+                yield paths[key], outcome
+        finally:
+            executions.close()
+        return
+
+    task = partial(_execute_task, fail_fast=fail_fast,
+                   profile_dir=profile_dir, root_path=root_path,
+                   track_inputs=track_inputs, measure_rss=bool(adaptive))
+
+    if adaptive:
+        controller = concurrency.Controller(*adaptive, history=history)
+        with multiprocessing.Pool(
+                controller.max_workers, initializer=_init_worker,
+                initargs=(max_memory, tracing.current_path()),
+                maxtasksperchild=max_tasks_per_worker) as pool:
+            yield from concurrency.run(
+                pool, task, notebooks, controller,
+                key=lambda x: x.relative_to(root_path).as_posix()
+                if root_path else str(x)
+            )
+            pool.close()
+            pool.join()
+        return
+
+    if not workers and not max_memory:
+        try:
+            yield from map(task, notebooks)
+        finally:
+            _close_fixtures()
+        return
+
+    with multiprocessing.Pool(workers or 1,
+                              initializer=_init_worker,
+                              initargs=(max_memory, tracing.current_path()),
+                              maxtasksperchild=max_tasks_per_worker) as pool:
+        yield from pool.imap(task, notebooks)
+        pool.close()
+        pool.join()
+
+
+def _hash_executable(f, kernel_name=False):
+    """ Get the normalized hash of the executable content of a notebook.
+
+    The executable content are the code asserts, with their cell index, and
+    the budgets of the notebook and its asserts. Code is normalized without
+    blank lines nor trailing whitespace, so notebooks stamped from the same
+    template hash the same even if their markdown cells differ.
+
+    Parameters
+    ----------
+    f: Path or Member
+        Path to the notebook file.
+    kernel_name: bool
+        Hash the kernel the notebook declares too.
+
+    Returns
+    -------
+    str
+        Hex digest of the sha256 hash. None if the notebook cannot be
+        executed, so it is never deduplicated.
+    """
+    try:
+        notebook = _load_notebook(f)
+        cells = list(classify_cells(notebook['cells']))
+        assert_cell_index = _get_assert_cell_index(cells)
+    except (AssertionError, LookupError, OSError, ValueError):
+        return None
+
+    digest = hashlib.sha256(json.dumps([
+        budgets.read_budget(notebook.get('metadata', {})),
+        kernels.kernel_name(notebook) if kernel_name else None
+    ]).encode())
+    for cell_index, cell in enumerate(cells):
+        if cell_index > assert_cell_index and cell.is_code:
+            code = '\n'.join(x.rstrip() for x in cell.code.splitlines()
+                             if x.strip())
+            digest.update(json.dumps([
+                cell_index, code, budgets.read_budget(cell.metadata)
+            ]).encode())
+
+    return digest.hexdigest()
+
+
+def _group_duplicates(notebooks, kernel_name=False, root_path=None):
+    """ Group the notebooks with the same executable content.
+
+    Parameters
+    ----------
+    notebooks: list(Path)
+        Paths to the notebook files.
+    kernel_name: bool
+        Group by the kernel the notebooks declare too.
+    root_path: Path
+        Root testing path. If given, only notebooks under the same setup
+        and teardown notebooks are grouped, as their state may differ.
+
+    Returns
+    -------
+    dict
+        Notebooks of every group by the first of them, which executes on
+        behalf of the whole group, in the order of the notebooks.
+    """
+    groups = {}
+    found = {}
+    for f in notebooks:
+        key = _hash_executable(f, kernel_name)
+        if key is not None and root_path is not None:
+            key = (key, tuple(x[0] for x in fixtures.find(
+                root_path, f.relative_to(root_path).as_posix(), found)))
+        groups.setdefault(f if key is None else key, []).append(f)
+
+    return {x[0]: x for x in groups.values()}
+
+
+def _execute_scaffolding(scaffold, root_path, journal_path, resume=False,
+                         fail_fast=False, maxfail=None, workers=None,
+                         max_memory=None, max_tasks_per_worker=None,
+                         profile_dir=None, sinks=(), serve=None,
+                         max_kernels=None, baseline=None,
+                         tolerance=budgets.DEFAULT_TOLERANCE,
+                         track_inputs=False, dedup=False, adaptive=None):
+    """ Execute all the notebooks of the scaffolding.
+
+    Every result is appended to the journal as soon as it is available. When
+    resuming, notebooks already recorded in the journal are not executed
+    again as long as their content, and the input files they were recorded
+    with, if any, have not changed since. The setup and teardown notebooks
+    of the directories above a notebook are recorded as its input files.
+
+    Once `maxfail` notebooks have failed, the pending ones are cancelled and
+    their result is SKIPPED. Skipped notebooks are not recorded in the
+    journal, so a resumed run executes them.
+
+    When deduplicating, notebooks with the same executable content are
+    executed once, and the result is fanned out to all of them. Their
+    journal records point to the notebook executed, as `duplicate_of`.
+
+    Parameters
+    ----------
+    scaffold: list(dict)
+        Explored scaffold items.
+    root_path: Path
+        Root testing path. Journal records are relative to it.
+    journal_path: Path
+        Path to the journal file.
+    resume: bool
+        Reuse the results already recorded in the journal.
+    fail_fast: bool
+        Stop executing each notebook at its first failing assert.
+    maxfail: int
+        Stop executing notebooks after this number of failures. None to
+        execute all of them.
+    workers: int
+        Number of worker processes. None to execute all the notebooks in
+        this process, unless a memory limit is set.
+    max_memory: int
+        Address space limit of each worker, in megabytes. None for no limit.
+    max_tasks_per_worker: int
+        Recycle each worker after executing this number of notebooks. None
+        to keep them for the whole run.
+    profile_dir: Path
+        Directory to save the profile of every notebook execution to. None
+        to execute them without profiling.
+    sinks: list
+        Opened result sinks. Every notebook result is written to them as
+        soon as it is available.
+    serve: tuple(str, int)
+        Host and port to serve the notebooks at, to TCP workers. None to
+        execute them locally.
+    max_kernels: int
+        Number of Jupyter kernels to execute the notebooks on. None to
+        execute them on iPython interpreters.
+    baseline: dict
+        Timings of a baseline run by notebook path, as loaded by
+        `budgets.load_baseline`. Passing notebooks slower than their
+        baseline are OVER-BUDGET. None to compare with no baseline.
+    tolerance: float
+        Allowed slowdown over the baseline, as a fraction of its time.
+    track_inputs: bool
+        Record the fingerprints of the input files of every notebook in the
+        journal.
+    dedup: bool
+        Execute the notebooks with the same executable content once.
+    adaptive: tuple(int, int)
+        Minimum and maximum number of worker processes of an adaptive pool.
+        The peak RSS of every notebook is recorded in the journal, so the
+        next runs plan their concurrency with it.
+
+    Returns
+    -------
+    dict, dict
+        Test result by notebook path.
+        Number of notebooks `executed`, and of notebooks `deduplicated`,
+        which reused the result of another one.
+    """
+    recorded = journal.load(journal_path) if resume or adaptive else {}
+    history = {key: x['peak_rss'] for key, x in recorded.items()
+               if x.get('peak_rss')}
+    from nb2report import fingerprint
+
+    recorded = recorded if resume else {}
+    checked = {}
+    results = {}
+    pending = {}
+    found = {}
+    fixture_inputs = {}
+
+    for item in filter(lambda x: x['notebook'], scaffold):
+        key = item['path'].relative_to(root_path).as_posix()
+        content_hash = journal.hash_file(item['path'])
+
+        record = recorded.get(key)
+        if record and record['hash'] == content_hash \
+                and not fingerprint.changed(record.get('inputs', []),
+                                            checked):
+            logger.debug('Reusing journal result for %s', key)
+            results[item['path']] = record['result']
+            emit(sinks, dict(path=key, result=record['result'],
+                             seconds=None, asserts=[]))
+        else:
+            pending[item['path']] = dict(path=key, hash=content_hash)
+            fixture_inputs[item['path']] = list(filter(None, (
+                fingerprint.fingerprint(str(x))
+                for _, setup, teardown in fixtures.find(root_path, key, found)
+                for x in (setup, teardown) if x is not None
+            )))
+
+    if dedup:
+        with tracing.span('dedup', notebooks=len(pending)) as span:
+            groups = _group_duplicates(list(pending), bool(max_kernels),
+                                       root_path)
+            span.set(groups=len(groups))
+    else:
+        groups = {x: [x] for x in pending}
+    stats = dict(executed=0, deduplicated=0)
+
+    failures = len([x for x in results.values() if x != 'OK'])
+    executions = _execute_notebooks(
+        list(groups) if maxfail is None or failures < maxfail else [],
+        fail_fast=fail_fast,
+        workers=workers,
+        max_memory=max_memory,
+        max_tasks_per_worker=max_tasks_per_worker,
+        profile_dir=profile_dir,
+        root_path=root_path,
+        serve=serve,
+        max_kernels=max_kernels,
+        track_inputs=track_inputs,
+        adaptive=adaptive,
+        history=history
+    )
+
+    with journal.open_journal(journal_path, resume) as journal_file:
+        try:
+            for executed, executed_outcome in executions:
+                stats['executed'] += 1
+                stats['deduplicated'] += len(groups[executed]) - 1
+                source = pending[executed]['path']
+                for path in groups[executed]:
+                    logger.debug('Add report %s', path)
+                    record = pending.pop(path)
+                    outcome = executed_outcome
+                    if baseline is not None:
+                        outcome = budgets.flag(outcome, budgets.compare(
+                            outcome, baseline.get(record['path']), tolerance))
+                    result = results[path] = outcome['result']
+                    entry = dict(record, result=result)
+                    for name in ('inputs', 'peak_rss'):
+                        if name in outcome:
+                            entry[name] = outcome[name]
+                    if fixture_inputs[path]:
+                        entry['inputs'] = entry.get('inputs', []) + \
+                            fixture_inputs[path]
+                    if path != executed:
+                        entry['duplicate_of'] = source
+                    journal.append(journal_file, entry)
+                    emit(sinks, dict(outcome, path=record['path']))
+                    if result != 'OK':
+                        failures += 1
+
+                if maxfail is not None and failures >= maxfail:
+                    logger.info('Stopped after %s failed notebooks', failures)
+                    break
+        finally:
+            executions.close()
+
+    for path, record in pending.items():
+        results[path] = 'SKIPPED'
+        emit(sinks, dict(path=record['path'], result='SKIPPED',
+                         seconds=None, asserts=[]))
+
+    if stats['deduplicated']:
+        logger.info('Executed %s notebooks for %s, %s deduplicated',
+                    stats['executed'],
+                    stats['executed'] + stats['deduplicated'],
+                    stats['deduplicated'])
+
+    return results, stats
+
+
+def _report_scaffolding(scaffold, results):
+    """ Add a reporting item for each scaffold item.
+
+    Parameters
+    ----------
+    scaffold: list(dict)
+        Explored scaffold items.
+    results: dict
+        Test result by notebook path. Notebooks without result are reported
+        as PENDING.
+    """
+    for item in scaffold:
+        if item['notebook']:
+            _add_report(item['path'].name,
+                        results.get(item['path'], 'PENDING'),
+                        REPORTING_COLORS[-1])
+        else:
+            level = min(item['level'], len(REPORTING_COLORS) - 1)
+            _add_report(item['path'].name, '', REPORTING_COLORS[level])
+
+
+def _render_summary(title, reporting_path):
+    """ Render the reporting items into the summary report file.
+
+    Parameters
+    ----------
+    title: str
+        Report title.
+    reporting_path: Path
+        Path to the summary report file.
+    """
+    import jinja2
+
+    with tracing.span('render', path=str(reporting_path),
+                      items=len(REPORTING_ITEMS)):
+        loader = jinja2.FileSystemLoader(str(REPORTING_TEMPLATE))
+        env = jinja2.Environment(loader=loader)
+        template = env.get_template('')
+
+        with open(reporting_path, 'w') as f:
+            f.writelines(template.render(dict(
+                title=title,
+                report=REPORTING_ITEMS
+            )))
+
+    logger.info("Summary report generated successfully at %s", reporting_path)
+
+
 def _add_report(title, result, color):
     """ Add reporting item in required format.
 
@@ -75,37 +792,39 @@ def _add_report(title, result, color):
     title: str
         Reporting title.
     result: str
-        Test result. It is OK, KO or empty (at title/subtitle items)
+        Test result. It is OK, KO, OVER-BUDGET, OOM, PENDING, SKIPPED,
+        NOT RUN or empty (at title/subtitle items)
     color: str
         Name of css color for this item.
     """
-    if result == 'OK':
-        supported_color = 'green'
-    else:
-        supported_color = 'red'
-
     REPORTING_ITEMS.append(dict(
         title=title,
         color=color,
         supported=result,
-        supported_color=supported_color
+        supported_color=REPORTING_RESULT_COLORS.get(result, 'red')
     ))
 
 
 def _load_notebook(f):
     """ Load the ipython notebook as a dict.
 
+    Percent-format scripts (.py) are read with a streaming line parser into
+    the same representation, with their cells and empty metadata.
+
     Parameters
     ----------
-    f: str
-        Path to the schema file.
+    f: str or Member
+        Path to the notebook file, or archive member.
 
     Returns
     -------
     dict
         json string representing the notebook file.
     """
-    with open(f, 'r') as json_file:
+    if str(f).endswith('.py'):
+        return dict(cells=list(percent.iter_cells(f)), metadata={})
+
+    with archive.open_file(f, 'r') as json_file:
         notebook = json.load(json_file)
 
     return notebook
@@ -119,7 +838,7 @@ def _get_assert_cell_index(cells):
 
     Parameters
     ----------
-    cells: list(dict)
+    cells: list(dict or Cell)
         List of all notebook cells.
 
     Returns
@@ -127,15 +846,13 @@ def _get_assert_cell_index(cells):
     int
         Assert cell index.
     """
-    asserts_cell = list(filter(
-        lambda x: is_markdown(x[1]) and is_assert(x[1]),
-        enumerate(cells)
-    ))
+    index = next((i for i, x in enumerate(classify_cells(cells))
+                  if x.is_markdown and x.is_assert), None)
 
-    if not asserts_cell:
+    if index is None:
         raise LookupError('Asserts cell cannot be found')
 
-    return asserts_cell[0][0]
+    return index
 
 
 def _clean_output(s):
@@ -164,6 +881,9 @@ def _get_interpreter():
 
     If it has been previously initialized, return it. Otherwise, start it.
 
+    The testing interpreter can only be started once per process, so if it
+    was already started by someone else, the running one is used.
+
     Further work: implement some mechanism to get an interpreter configured
     with some virtual environment or kernel.
 
@@ -173,11 +893,89 @@ def _get_interpreter():
         iPython interpreter.
     """
     if not globals()['IPYTHON_INTERPRETER']:
-        globals()['IPYTHON_INTERPRETER'] = get_ipython()
+        from IPython.core.interactiveshell import InteractiveShell
+        from IPython.testing.globalipapp import get_ipython
+
+        globals()['IPYTHON_INTERPRETER'] = \
+            get_ipython() or InteractiveShell.instance()
 
     return IPYTHON_INTERPRETER
 
 
+def _run_fixture(f):
+    """ Execute all the code cells of some setup or teardown notebook.
+
+    Parameters
+    ----------
+    f: Path or Member
+        Path to the fixture notebook file.
+
+    Returns
+    -------
+    str
+        Error message if the notebook cannot be read or any cell raised,
+        in which case the cells after it are not executed. None otherwise.
+
+    Raises
+    ------
+    MemoryError
+        If the code ran out of memory.
+    """
+    from IPython.utils.io import capture_output
+
+    try:
+        cells = list(classify_cells(_load_notebook(f)['cells']))
+    except (LookupError, OSError, ValueError) as ex:
+        return 'Cannot read {}: {}'.format(f, ex)
+
+    for cell in cells:
+        if cell.is_code:
+            with capture_output():
+                result = _get_interpreter().run_cell(cell.code)
+            error = result.error_before_exec or result.error_in_exec
+            if isinstance(error, MemoryError):
+                raise error
+            if error is not None:
+                return repr(error)
+
+    return None
+
+
+def _enter_fixtures(f, root_path):
+    """ Enter the directory subtrees of some notebook, before executing it
+    in this process.
+
+    Parameters
+    ----------
+    f: Path or Member
+        Path to the notebook file.
+    root_path: Path or Member
+        Root testing path. None to execute the notebook with no fixtures.
+
+    Returns
+    -------
+    str
+        Error message of the setup which failed for the notebook, if any.
+        None otherwise.
+    """
+    if root_path is None:
+        return None
+
+    if FIXTURES is None or FIXTURES.root_path != root_path:
+        _close_fixtures()
+        globals()['FIXTURES'] = fixtures.Fixtures(
+            root_path, _run_fixture, lambda: _get_interpreter().user_ns)
+
+    return FIXTURES.enter(f.relative_to(root_path).as_posix())
+
+
+def _close_fixtures():
+    """ Tear down all the directory subtrees entered by this process. """
+    if FIXTURES is not None:
+        FIXTURES.close()
+        globals()['FIXTURES'] = None
+
+
 def _run_cell(cmd):
     """ Execute some code using iPython interpreter.
 
@@ -190,9 +988,18 @@ def _run_cell(cmd):
     -------
     str
         Cleaned code execution output.
+
+    Raises
+    ------
+    MemoryError
+        If the code ran out of memory.
     """
+    from IPython.utils.io import capture_output
+
     with capture_output() as io:
-        _get_interpreter().run_cell(cmd)
+        result = _get_interpreter().run_cell(cmd)
+    if isinstance(result.error_in_exec, MemoryError):
+        raise result.error_in_exec
     res_out = io.stdout
     return _clean_output(res_out)
 
@@ -217,7 +1024,7 @@ def _evaluate_output(output):
     except Exception as ex:
         logger.error(
             'Received string %s is not a binary output. Please check all '
-            'assert cells return True or False' % output
+            'assert cells return True or False', output
         )
         raise ex
 
@@ -243,86 +1050,541 @@ def _evaluate_results(results):
         return 'KO'
 
 
-def _execute_test(f):
-    """ Execute some test notebook file.
+def _execute_notebook(f, fail_fast=False, track_inputs=False):
+    """ Execute some test notebook file, recording the result of each assert.
 
     There is a cell called "# Asserts" where tests start. All cells on are
     asserts that must be true.
 
+    Performance budgets declared in the notebook or assert cells metadata
+    are checked too: wall time, peak memory, only measured if some budget
+    limits it, and rows per second, for asserts reporting a number of rows.
+
     Parameters
     ----------
     f: str
         Path to the notebook file.
+    fail_fast: bool
+        Stop executing asserts as soon as one of them is not true.
+    track_inputs: bool
+        Record the files read and the modules imported by the asserts, and
+        add their fingerprints to the record as its `inputs`.
 
     Returns
     -------
-    str
-        Test result. 'OK' if all cells returned True, 'KO' otherwise.
+    dict
+        Test result record. It holds the notebook `result`, 'OK' if all
+        cells returned True, 'KO' otherwise and OVER-BUDGET if they did but
+        exceeded some budget, its execution `seconds`, its `asserts`: the
+        `cell` index, whether it `passed`, its `output` and its execution
+        `seconds` of every executed assert, and its budget `violations`.
     """
+    from nb2report import fingerprint
+
+    start = time.perf_counter()
     test_results = []
+    asserts = []
+    violations = []
+    inputs = fingerprint.InputRecorder(track_inputs)
 
     try:
         # load f as a dict
-        notebook = _load_notebook(f)
+        path = str(f)
+        with tracing.span('load', path=path) as span:
+            notebook = _load_notebook(f)
+            cells = list(classify_cells(notebook['cells']))
+            span.set(cells=len(cells))
         # find starting cell index
-        assert_cell_index = _get_assert_cell_index(notebook['cells'])
-        logger.debug('Assert cell found at %s' % assert_cell_index)
+        assert_cell_index = _get_assert_cell_index(cells)
+        logger.debug('Assert cell found at %s', assert_cell_index)
+        budget = budgets.read_budget(notebook.get('metadata', {}))
+
+        # The memory kept across asserts counts for the notebook budget
+        memory = budgets.MemoryTracker(budgets.MEMORY_MB in budget)
 
         # execute all tests
-        for test_cell in notebook['cells'][assert_cell_index + 1:]:
-            if is_code(test_cell):
-                code = get_code(test_cell)
-                logger.debug('Executing code:\n%s' % code)
-                test_results.append(_evaluate_output(_run_cell(code)))
+        with memory:
+            for cell_index, test_cell in enumerate(cells):
+                if cell_index <= assert_cell_index or not test_cell.is_code:
+                    continue
+
+                logger.debug('Executing cell %s of %s', cell_index, f)
+                cell_budget = budgets.read_budget(test_cell.metadata)
+                cell_memory = budgets.MemoryTracker(
+                    budgets.MEMORY_MB in cell_budget)
+                cell_start = time.perf_counter()
+                with tracing.span('execute-cell', path=path,
+                                  cell=cell_index), cell_memory, inputs:
+                    output = _run_cell(test_cell.code)
+                cell_seconds = time.perf_counter() - cell_start
+                with tracing.span('evaluate', path=path,
+                                  cell=cell_index) as span:
+                    value = _evaluate_output(output)
+                    rows = None
+                    if budgets.ROWS_PER_SECOND in cell_budget:
+                        # The assert reports the number of rows it processed
+                        is_count = isinstance(value, int) \
+                            and not isinstance(value, bool)
+                        rows = value if is_count else None
+                        value = is_count
+                    test_results.append(value)
+                    span.set(result=test_results[-1] is True)
+                asserts.append(dict(cell=cell_index,
+                                    passed=test_results[-1] is True,
+                                    output=output,
+                                    seconds=cell_seconds))
+                violations.extend(budgets.check(
+                    cell_budget, cell_seconds, peak=cell_memory.peak,
+                    rows=rows, label='cell {}'.format(cell_index)))
+                if fail_fast and test_results[-1] is not True:
+                    logger.debug('Skipping asserts after the failing one')
+                    break
 
     except Exception as ex:
-        logger.error('Error executing notebook %s' % f)
+        logger.error('Error executing notebook %s', f)
         raise ex
 
-    return _evaluate_results(test_results)
+    seconds = time.perf_counter() - start
+    violations.extend(budgets.check(budget, seconds, peak=memory.peak))
+
+    record = dict(result=_evaluate_results(test_results),
+                  seconds=seconds,
+                  asserts=asserts,
+                  violations=[])
+    if track_inputs:
+        record['inputs'] = inputs.fingerprints()
+
+    return budgets.flag(record, violations)
+
+
+def _execute_test(f, fail_fast=False):
+    """ Execute some test notebook file.
+
+    Parameters
+    ----------
+    f: str
+        Path to the notebook file.
+    fail_fast: bool
+        Stop executing asserts as soon as one of them is not true.
+
+    Returns
+    -------
+    str
+        Test result. 'OK' if all cells returned True, 'KO' otherwise.
+    """
+    return _execute_notebook(f, fail_fast=fail_fast)['result']
 
 
-def generate_summary(framework_name, framework_version):
+def generate_summary(framework_name, framework_version, resume=False,
+                     fail_fast=False, maxfail=None, sample=None, seed=0,
+                     tags=None, paths=None, workers=None, max_memory=None,
+                     max_tasks_per_worker=None, profile_dir=None,
+                     sinks=None, archive_path=None, serve=None,
+                     max_kernels=None, preflight=False, baseline=None,
+                     tolerance=budgets.DEFAULT_TOLERANCE, track_inputs=False,
+                     dedup=False, adaptive=None):
     """ Generate summary report for given framework and version.
 
     The report file will be generated at:
 
             ./framework_name/framework_version/REPORTING_FILE_NAME
 
+    Every notebook result is also recorded in the journal file at:
+
+            ./framework_name/framework_version/JOURNAL_FILE_NAME
+
+    Directories can hold a setup notebook, `fixtures.SETUP_NAME`, whose
+    code cells are executed once before the notebooks of their subtree,
+    which inherit the resulting state, and a teardown notebook,
+    `fixtures.TEARDOWN_NAME`, executed once after them. Notebooks under a
+    failed setup are reported as SETUP FAILED. Kernels do not run them.
+
     Parameters
     ----------
     framework_name: str
         Framework name.
     framework_version: str
         Framework version.
+    resume: bool
+        Resume a previous run. Notebooks already recorded in the journal are
+        not executed again, unless they have been modified since.
+    fail_fast: bool
+        Stop executing each notebook at its first failing assert.
+    maxfail: int
+        Stop executing notebooks after this number of failures. Remaining
+        notebooks are reported as SKIPPED. None to execute all of them.
+    sample: float or int
+        Execute only a stratified sample of the notebooks: a fraction or a
+        number of notebooks per leaf directory. Not sampled notebooks are
+        reported as NOT RUN. None to execute all of them.
+    seed: int
+        Seed of the sample selection.
+    tags: list(str)
+        Execute only notebooks with any of these tags in their metadata.
+    paths: list(str)
+        Execute only notebooks matching any of these path expressions, as
+        'Title/Subtitle' or 'Title/*/notebook.ipynb'. Notebooks can be
+        ipython notebooks (.ipynb) or percent-format scripts (.py).
+    workers: int
+        Number of worker processes. None to execute all the notebooks in
+        this process, unless a memory limit is set.
+    max_memory: int
+        Address space limit of each worker, in megabytes. Notebooks running
+        out of memory are reported as OOM. None for no limit.
+    max_tasks_per_worker: int
+        Recycle each worker after executing this number of notebooks. None
+        to keep them for the whole run.
+    profile_dir: Path
+        Profile every notebook execution and the summary rendering, saving
+        their pstats files to this directory, and aggregate them into a
+        collapsed stacks file. None to run without profiling.
+    sinks: list(tuple(str, str))
+        Result sinks to stream every notebook and assert result to, next to
+        the summary report, as ('junit', 'results.xml') or
+        ('jsonl', 'results.jsonl').
+    archive_path: str
+        Execute the scaffold held by this zip or (gzipped) tar archive,
+        reading its notebooks straight from the archive. The report and the
+        journal are still written to the root testing path.
+    serve: tuple(str, int)
+        Act as a coordinator: serve the notebooks at this host and port to
+        TCP workers, started with `run_worker`, which pull them as they go.
+        Workers execute them with their own `fail_fast`, so it cannot be
+        set, nor `max_memory` or `profile_dir`, with this. None to execute
+        them locally.
+    max_kernels: int
+        Execute the notebooks concurrently on up to this number of local
+        Jupyter kernels, each one on the kernel declared in its metadata,
+        instead of in-process iPython interpreters. Notebooks whose kernel
+        dies are reported as CRASHED. It requires jupyter_client. None to
+        execute them in-process.
+    preflight: bool
+        Check that all the notebooks to execute can be executed, on a pool
+        of `workers` processes, before executing any of them.
+    baseline: str
+        JSON lines results file of a baseline run, as written by a jsonl
+        sink. Passing notebooks, or asserts, slower than in the baseline
+        beyond the tolerance are reported as OVER-BUDGET. None to compare
+        with no baseline.
+    tolerance: float
+        Allowed slowdown over the baseline, as a fraction of its time.
+    track_inputs: bool
+        Record the files every notebook reads and the modules it imports,
+        with their size, modification time and hash, in the journal. Resumed
+        runs execute again the notebooks whose inputs changed, not only
+        the ones whose content did.
+    dedup: bool
+        Execute the notebooks with the same executable content, their code
+        asserts and budgets, once, reporting the result for all of them.
+        The report title shows how many notebooks were deduplicated.
+    adaptive: tuple(int, int)
+        Execute the notebooks on a pool of between the minimum and maximum
+        number of worker processes, scaling it with the CPU utilisation and
+        the memory available, and the peak RSS each notebook recorded in
+        the journal. Scaling decisions are logged and traced. Overrides
+        `workers`, but not TCP workers nor kernels. None for a fixed pool.
+
+    Raises
+    ------
+    PreflightError
+        If the preflight check found any problem, with all of them.
+    ValueError
+        If `serve` is set along with settings only local executions apply.
     """
+    if serve:
+        ignored = [name for name, value in [('fail_fast', fail_fast),
+                                            ('max_memory', max_memory),
+                                            ('profile_dir', profile_dir)]
+                   if value]
+        if ignored:
+            raise ValueError('{} cannot be set along with serve, workers '
+                             'execute the notebooks with their own '
+                             'settings'.format(', '.join(ignored)))
+
+    del REPORTING_ITEMS[:]  # items of previous summaries
     test_root_path = BASE_DIR / framework_name / framework_version
     reporting_path = test_root_path / REPORTING_FILE_NAME
+    journal_path = test_root_path / JOURNAL_FILE_NAME
+
+    with tracing.span('discovery', path=str(archive_path or test_root_path)) \
+            as span:
+        scaffold_root, scaffold = _discover_scaffolding(
+            test_root_path,
+            archive_path=archive_path,
+            archive_prefix='{}/{}'.format(framework_name, framework_version),
+            tags=tags,
+            paths=paths
+        )
+        notebooks = [x['path'] for x in scaffold if x['notebook']]
+        span.set(items=len(scaffold), notebooks=len(notebooks))
+
+    executed = scaffold
+    if sample is not None:
+        sampled = sampling.select(
+            [x.relative_to(scaffold_root) for x in notebooks],
+            sample,
+            seed
+        )
+        executed = [x for x in scaffold if not x['notebook']
+                    or x['path'].relative_to(scaffold_root) in sampled]
+
+    if preflight:
+        with tracing.span('preflight') as span:
+            problems = check_notebooks(
+                {x['path'].relative_to(scaffold_root).as_posix(): x['path']
+                 for x in executed if x['notebook']},
+                workers=workers
+            )
+            span.set(problems=len(problems))
+        if problems:
+            raise PreflightError(problems)
+
+    if archive_path:
+        test_root_path.mkdir(parents=True, exist_ok=True)
+
+    # Loaded before opening the sinks, which may overwrite the baseline
+    timings = budgets.load_baseline(baseline) if baseline else None
+    result_sinks = open_sinks(sinks)
+    try:
+        results, stats = _execute_scaffolding(
+            executed,
+            scaffold_root,
+            journal_path,
+            resume=resume,
+            fail_fast=fail_fast,
+            maxfail=maxfail,
+            workers=workers,
+            max_memory=max_memory,
+            max_tasks_per_worker=max_tasks_per_worker,
+            profile_dir=profile_dir,
+            sinks=result_sinks,
+            serve=serve,
+            max_kernels=max_kernels,
+            baseline=timings,
+            tolerance=tolerance,
+            track_inputs=track_inputs,
+            dedup=dedup,
+            adaptive=adaptive
+        )
+        for notebook in notebooks:
+            if notebook not in results:
+                results[notebook] = 'NOT RUN'
+                emit(result_sinks, dict(
+                    path=notebook.relative_to(scaffold_root).as_posix(),
+                    result='NOT RUN', seconds=None, asserts=[]))
+    finally:
+        for sink in result_sinks:
+            sink.close()
+    _report_scaffolding(scaffold, results)
+
+    title = 'Test summary for {} {}'.format(framework_name, framework_version)
+    if sample is not None:
+        title += ' (sampled {} of {} notebooks, seed {})'.format(
+            len(sampled),
+            len(notebooks),
+            seed
+        )
+    if stats['deduplicated']:
+        title += ' ({} executions for {} notebooks, {} deduplicated)'.format(
+            stats['executed'],
+            stats['executed'] + stats['deduplicated'],
+            stats['deduplicated']
+        )
+    skipped = list(results.values()).count('SKIPPED')
+    if skipped:
+        title += ' (stopped after {} failures, {} notebooks skipped)'.format(
+            maxfail,
+            skipped
+        )
+
+    if profile_dir:
+        from nb2report import profiling
+
+        profiling.profile_call(
+            profiling.stats_path(profile_dir, REPORTING_FILE_NAME),
+            _render_summary, title, reporting_path
+        )
+        profiling.aggregate(profile_dir)
+    else:
+        _render_summary(title, reporting_path)
 
-    _explore_scaffolding(
-        test_root_path,
-        scaffold={'dirs': {}, 'files': {}}
+
+def generate_partial_summary(framework_name, framework_version,
+                             archive_path=None):
+    """ Generate summary report from the results recorded in the journal.
+
+    Nothing is executed. Notebooks which are not recorded in the journal yet,
+    or which have been modified since, are reported as PENDING.
+
+    Parameters
+    ----------
+    framework_name: str
+        Framework name.
+    framework_version: str
+        Framework version.
+    archive_path: str
+        Zip or (gzipped) tar archive holding the scaffold. None if the
+        scaffold is at the root testing path.
+    """
+    del REPORTING_ITEMS[:]  # items of previous summaries
+    test_root_path = BASE_DIR / framework_name / framework_version
+    reporting_path = test_root_path / REPORTING_FILE_NAME
+    recorded = journal.load(test_root_path / JOURNAL_FILE_NAME)
+
+    with tracing.span('discovery', path=str(archive_path or test_root_path)) \
+            as span:
+        scaffold_root, scaffold = _discover_scaffolding(
+            test_root_path,
+            archive_path=archive_path,
+            archive_prefix='{}/{}'.format(framework_name, framework_version)
+        )
+        span.set(items=len(scaffold))
+    results = {}
+    for item in filter(lambda x: x['notebook'], scaffold):
+        record = recorded.get(
+            item['path'].relative_to(scaffold_root).as_posix())
+        if record and record['hash'] == journal.hash_file(item['path']):
+            results[item['path']] = record['result']
+
+    _report_scaffolding(scaffold, results)
+
+    _render_summary(
+        'Partial test summary for {} {}'.format(
+            framework_name,
+            framework_version
+        ),
+        reporting_path
     )
 
-    loader = jinja2.FileSystemLoader(str(REPORTING_TEMPLATE))
-    env = jinja2.Environment(loader=loader)
-    template = env.get_template('')
 
-    with open(reporting_path, 'w') as f:
-        f.writelines(template.render(dict(
-            title='Test summary for {} {}'.format(
-                framework_name,
-                framework_version
-            ),
-            report=REPORTING_ITEMS
-        )))
+def run_preflight(framework_name, framework_version, archive_path=None,
+                  workers=None):
+    """ Check that all the notebooks of the scaffold can be executed.
 
-    logger.info("Summary report generated successfully at %s" % reporting_path)
+    Nothing is executed, so every problem is found at once, instead of
+    aborting the run at the first notebook which cannot be executed.
 
+    Parameters
+    ----------
+    framework_name: str
+        Framework name.
+    framework_version: str
+        Framework version.
+    archive_path: str
+        Zip or (gzipped) tar archive holding the scaffold. None if the
+        scaffold is at the root testing path.
+    workers: int
+        Number of worker processes. None for one per CPU.
 
-if __name__ == "__main__":
+    Returns
+    -------
+    list(dict)
+        Problems found, as returned by `preflight.check`.
+    """
+    scaffold_root, scaffold = _discover_scaffolding(
+        BASE_DIR / framework_name / framework_version,
+        archive_path=archive_path,
+        archive_prefix='{}/{}'.format(framework_name, framework_version)
+    )
 
-    parser = argparse.ArgumentParser(prog='Execute some framework tests')
+    return check_notebooks(
+        {x['path'].relative_to(scaffold_root).as_posix(): x['path']
+         for x in scaffold if x['notebook']},
+        workers=workers
+    )
+
+
+def _task_path(root_path, key):
+    """ Get the path of a notebook pulled from a coordinator.
+
+    Coordinators do not authenticate, so their tasks are never trusted to
+    stay within the scaffold.
+
+    Parameters
+    ----------
+    root_path: Path or Member
+        Root testing path.
+    key: str
+        Notebook path, relative to the root testing path.
+
+    Returns
+    -------
+    Path or Member
+        Path to the notebook file.
+
+    Raises
+    ------
+    ValueError
+        If the notebook is not under the root testing path.
+    """
+    f = root_path / key
+    outside = PurePosixPath(key).is_absolute() \
+        or '..' in PurePosixPath(key).parts
+    if not outside and isinstance(f, Path):
+        outside = not os.path.realpath(str(f)).startswith(
+            os.path.join(os.path.realpath(str(root_path)), ''))
+    if outside:
+        raise ValueError('Task {} is outside the scaffold'.format(key))
+
+    return f
+
+
+def run_worker(framework_name, framework_version, address, fail_fast=False,
+               archive_path=None, track_inputs=False):
+    """ Execute notebooks pulled from a coordinator until it is done.
+
+    Workers can run on other hosts, as long as they find the same scaffold
+    under their own base directory or archive. Tasks outside the scaffold
+    are reported as ERROR without being executed.
+
+    Parameters
+    ----------
+    framework_name: str
+        Framework name.
+    framework_version: str
+        Framework version.
+    address: tuple(str, int)
+        Coordinator host and port.
+    fail_fast: bool
+        Stop executing each notebook at its first failing assert.
+    archive_path: str
+        Zip or (gzipped) tar archive holding the scaffold. None if the
+        scaffold is at the root testing path.
+    track_inputs: bool
+        Record the fingerprints of the input files of every notebook.
+
+    Returns
+    -------
+    int
+        Number of executed notebooks.
+    """
+    root_path = BASE_DIR / framework_name / framework_version
+    if archive_path:
+        root_path = archive.find_root(
+            str(archive_path),
+            '{}/{}'.format(framework_name, framework_version)
+        )
+
+    try:
+        return coordinator.work(
+            address,
+            lambda key: _execute_task(_task_path(root_path, key),
+                                      fail_fast=fail_fast,
+                                      root_path=root_path,
+                                      track_inputs=track_inputs)[1]
+        )
+    finally:
+        _close_fixtures()
+
+
+def _add_arguments(parser):
+    """ Add the reporting command line arguments to some parser.
+
+    Parameters
+    ----------
+    parser: argparse.ArgumentParser
+        Parser to add the arguments to.
+    """
     parser.add_argument("-n", '--name',
                         required=True,
                         help='Name of the new framework to tests.')
@@ -331,9 +1593,202 @@ if __name__ == "__main__":
                         required=True,
                         help='Version of the framework to tests.')
 
-    args = parser.parse_args(sys.argv[1:])
+    parser.add_argument('--resume',
+                        action='store_true',
+                        help='Skip notebooks already recorded in the journal.')
+
+    parser.add_argument('--partial',
+                        action='store_true',
+                        help='Generate the report from the journal without '
+                             'executing any notebook.')
+
+    parser.add_argument('--fail-fast',
+                        action='store_true',
+                        help='Stop each notebook at its first failing assert.')
+
+    parser.add_argument('--maxfail',
+                        type=int,
+                        default=None,
+                        help='Stop after this number of failed notebooks.')
+
+    parser.add_argument('--sample',
+                        type=sampling.parse_sample,
+                        default=None,
+                        help='Execute only a sample of the notebooks of each '
+                             'leaf directory: a fraction, as 0.1, or a '
+                             'number of notebooks, as 3.')
+
+    parser.add_argument('--seed',
+                        type=int,
+                        default=0,
+                        help='Seed of the sample selection.')
+
+    parser.add_argument('--tag',
+                        action='append',
+                        dest='tags',
+                        help='Execute only notebooks with this tag in their '
+                             'metadata. It can be repeated.')
+
+    parser.add_argument('--path',
+                        action='append',
+                        dest='paths',
+                        help='Execute only notebooks matching this path '
+                             'expression. It can be repeated.')
+
+    parser.add_argument('--workers',
+                        type=int,
+                        default=None,
+                        help='Execute notebooks on this number of worker '
+                             'processes.')
+
+    parser.add_argument('--max-memory',
+                        type=int,
+                        default=None,
+                        help='Address space limit of each worker, in MB. '
+                             'Notebooks exceeding it are reported as OOM.')
+
+    parser.add_argument('--max-tasks-per-worker',
+                        type=int,
+                        default=None,
+                        help='Recycle each worker after executing this '
+                             'number of notebooks.')
+
+    parser.add_argument('--profile',
+                        default=None,
+                        metavar='DIR',
+                        help='Profile every notebook execution, saving '
+                             'pstats files and a collapsed stacks file to '
+                             'this directory.')
+
+    parser.add_argument('--trace',
+                        default=None,
+                        metavar='FILE',
+                        help='Append the traced spans of the run to this '
+                             'JSON lines file.')
+
+    parser.add_argument('--archive',
+                        default=None,
+                        help='Execute the scaffold held by this zip or tar '
+                             'archive, without extracting it.')
+
+    parser.add_argument('--serve',
+                        type=coordinator.parse_address,
+                        default=None,
+                        metavar='HOST:PORT',
+                        help='Serve the notebooks to TCP workers at this '
+                             'address instead of executing them locally. '
+                             'An empty host is localhost. Workers are not '
+                             'authenticated.')
+
+    parser.add_argument('--kernels',
+                        type=int,
+                        default=None,
+                        dest='max_kernels',
+                        metavar='N',
+                        help='Execute notebooks concurrently on up to this '
+                             'number of local Jupyter kernels, as declared '
+                             'by their metadata. Requires jupyter_client.')
+
+    parser.add_argument('--preflight',
+                        action='store_true',
+                        help='Check that all the notebooks can be executed '
+                             'before executing any of them, reporting every '
+                             'problem found at once.')
+
+    parser.add_argument('--baseline',
+                        default=None,
+                        metavar='FILE',
+                        help='Report notebooks slower than in this baseline '
+                             'run, a JSON lines results file written by '
+                             '--sink jsonl:FILE, as OVER-BUDGET.')
+
+    parser.add_argument('--tolerance',
+                        type=float,
+                        default=budgets.DEFAULT_TOLERANCE,
+                        help='Allowed slowdown over the baseline, as a '
+                             'fraction of its time.')
+
+    parser.add_argument('--track-inputs',
+                        action='store_true',
+                        help='Record the files each notebook reads and the '
+                             'modules it imports in the journal, so resumed '
+                             'runs execute again notebooks whose inputs '
+                             'changed.')
+
+    parser.add_argument('--dedup',
+                        action='store_true',
+                        help='Execute notebooks with the same code asserts '
+                             'once, reporting the result for all of them.')
+
+    parser.add_argument('--adaptive',
+                        type=concurrency.parse_bounds,
+                        default=None,
+                        metavar='MIN:MAX',
+                        help='Execute on an adaptive pool of between MIN and '
+                             'MAX worker processes, scaled with the CPU and '
+                             'memory available.')
+
+    parser.add_argument('--sink',
+                        action='append',
+                        type=parse_sink,
+                        dest='sinks',
+                        help='Stream every notebook and assert result to a '
+                             'JUnit XML (junit:FILE) or JSON lines '
+                             '(jsonl:FILE) file. It can be repeated.')
+
+    parser.add_argument('--log-level',
+                        default='INFO',
+                        choices=['DEBUG', 'INFO', 'WARNING', 'ERROR'],
+                        help='Logging level.')
+
+
+def _main(args):
+    """ Execute the tests from parsed command line arguments.
+
+    Parameters
+    ----------
+    args: argparse.Namespace
+        Parsed command line arguments.
+    """
+    tracing.start(args.trace)
 
     f_name = args.name
     f_version = args.version
 
-    generate_summary(f_name, f_version)
+    if args.partial:
+        generate_partial_summary(f_name, f_version, archive_path=args.archive)
+    else:
+        generate_summary(f_name,
+                         f_version,
+                         resume=args.resume,
+                         fail_fast=args.fail_fast,
+                         maxfail=args.maxfail,
+                         sample=args.sample,
+                         seed=args.seed,
+                         tags=args.tags,
+                         paths=args.paths,
+                         workers=args.workers,
+                         max_memory=args.max_memory,
+                         max_tasks_per_worker=args.max_tasks_per_worker,
+                         profile_dir=args.profile,
+                         sinks=args.sinks,
+                         archive_path=args.archive,
+                         serve=args.serve,
+                         max_kernels=args.max_kernels,
+                         preflight=args.preflight,
+                         baseline=args.baseline,
+                         tolerance=args.tolerance,
+                         track_inputs=args.track_inputs,
+                         dedup=args.dedup,
+                         adaptive=args.adaptive)
+
+    tracing.stop()
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(prog='Execute some framework tests')
+    _add_arguments(parser)
+    args = parser.parse_args(sys.argv[1:])
+    logging.basicConfig(stream=sys.stdout, level=args.log_level)
+    _main(args)
@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+
+import random
+
+
+def parse_sample(value):
+    """ Parse a sample size.
+
+    The sample can be given as a fraction of the notebooks of each leaf
+    directory, as 0.1, or as a number of notebooks per leaf directory, as 3.
+
+    >>> parse_sample('0.25')
+    0.25
+    >>> parse_sample('3')
+    3
+
+    Parameters
+    ----------
+    value: str
+        Sample size.
+
+    Returns
+    -------
+    float or int
+        Fraction, as a float in (0, 1], or number of notebooks per leaf
+        directory, as a positive int.
+    """
+    try:
+        sample = int(value)
+    except ValueError:
+        sample = float(value)
+        if not 0 < sample <= 1:
+            raise ValueError('Sample fraction must be in (0, 1]: %s' % value)
+    else:
+        if sample < 1:
+            raise ValueError('Sample size must be positive: %s' % value)
+
+    return sample
+
+
+def _sample_size(sample, population):
+    """ Get how many notebooks to select from a leaf directory.
+
+    At least one notebook is selected from every leaf directory.
+
+    Parameters
+    ----------
+    sample: float or int
+        Sample fraction or number of notebooks per leaf directory.
+    population: int
+        Number of notebooks at the leaf directory.
+
+    Returns
+    -------
+    int
+        Number of notebooks to select.
+    """
+    if isinstance(sample, float):
+        size = int(round(sample * population))
+    else:
+        size = sample
+
+    return min(max(size, 1), population)
+
+
+def select(notebooks, sample, seed=0):
+    """ Select a stratified sample of notebooks.
+
+    Notebooks are grouped by their directory, that is, by the title and
+    subtitle hierarchy they belong to, and each group is sampled on its own.
+    Every group is seeded from the given seed and its directory, so the
+    selection of some directory does not change when others do.
+
+    Parameters
+    ----------
+    notebooks: list(PurePath)
+        Notebook paths, relative to the testing root directory.
+    sample: float or int
+        Sample fraction or number of notebooks per leaf directory.
+    seed: int
+        Seed of the selection.
+
+    Returns
+    -------
+    set(PurePath)
+        Selected notebook paths.
+    """
+    groups = {}
+    for notebook in notebooks:
+        groups.setdefault(notebook.parent.as_posix(), []).append(notebook)
+
+    selected = set()
+    for directory, group in groups.items():
+        rng = random.Random('{}:{}'.format(seed, directory))
+        selected.update(rng.sample(
+            sorted(group),
+            _sample_size(sample, len(group))
+        ))
+
+    return selected
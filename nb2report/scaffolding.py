@@ -8,20 +8,43 @@ import sys
 import json
 import re
 
-from shutil import copyfile
-from IPython.paths import get_ipython_dir
-from pathlib import Path
-from nb2report.cell_utils import is_list, is_title, get_first_line
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from pathlib import Path, PurePath
+from nb2report.cell_utils import Cell, classify_cells
+from nb2report.fixtures import is_fixture
+from nb2report.percent import is_script
+
+try:
+    import fcntl
+except ImportError:  # not available on Windows
+    fcntl = None
 
 
-logging.basicConfig(stream=sys.stdout, level=logging.DEBUG)  # ToDo: INFO
 logger = logging.getLogger('nb2report')
 
 BASE_DIR = os.path.abspath(os.path.dirname(__file__))
-IPYTHON_DIR = Path(get_ipython_dir())
 TEMPLATE_NOTEBOOK_PATH = Path(BASE_DIR)\
                          / ".config"\
                          / "empty_notebook_template.ipynb"
+TEMPLATE_SCRIPT_PATH = Path(BASE_DIR)\
+                       / ".config"\
+                       / "empty_notebook_template.py"
+NOTEBOOK_TEMPLATES = {
+    'ipynb': TEMPLATE_NOTEBOOK_PATH,
+    'py': TEMPLATE_SCRIPT_PATH
+}
+TEMPLATE_NOTEBOOK_CACHE = {}
+TEMPLATE_MASTER_NAME = ".template"
+NOTEBOOK_SUFFIXES = ('.ipynb', '.py')
+MANIFEST_FILE_NAME = "manifest.json"
+MATERIALIZE_STRATEGIES = ('write', 'copy', 'hardlink')
+READ_ONLY_MODE = 0o444
+FICLONE = 0x40049409  # linux/fs.h ioctl cloning a whole file
+COPY_SUPPORT = {
+    'reflink': fcntl is not None,
+    'copy_file_range': hasattr(os, 'copy_file_range')
+}
 
 
 def _load_schema(f):
@@ -43,6 +66,59 @@ def _load_schema(f):
     return notebook
 
 
+def _iter_markdown_schema(f):
+    """ Read a plain markdown file describing the tests schema, line by line.
+
+    Every title (#) and list item (*) line becomes a schema cell of its own,
+    so it drives the scaffolding just like the ipynb schema cells do. Any
+    other line, and every line inside fenced code blocks, is skipped.
+
+    Cells are built as cell records right away, as they are known to be
+    well formed.
+
+    Parameters
+    ----------
+    f: str
+        Path to the schema file.
+
+    Returns
+    -------
+    generator(Cell)
+        Schema cells, as they are read.
+    """
+    fenced = False
+
+    with open(f, 'r') as markdown_file:
+        for line in markdown_file:
+            token = line.lstrip()[:3]
+            if token == '```':
+                fenced = not fenced
+            elif not fenced and token[:1] in ('#', '*'):
+                yield Cell('markdown', [line])
+
+
+def _get_schema_cells(f):
+    """ Get the cells of the tests schema.
+
+    Plain markdown schemas (.md) are streamed line by line. Otherwise, the
+    schema is an ipynb markdown notebook.
+
+    Parameters
+    ----------
+    f: str
+        Path to the schema file.
+
+    Returns
+    -------
+    iterable(dict)
+        Schema cells.
+    """
+    if Path(f).suffix == '.md':
+        return _iter_markdown_schema(f)
+
+    return _load_schema(f)['cells']
+
+
 def _setup_base_dir(framework, version):
     """ Create the root testing directory.
 
@@ -72,49 +148,6 @@ def _setup_base_dir(framework, version):
     return current_path
 
 
-def _walk_path(current_path, current_level, new_level, title):
-    """ Explore the directory tree
-
-    Parameters
-    ----------
-    current_path: str
-        Path currently exploted.
-    current_level: int
-        Current depth level.
-    new_level: int
-        Next depth level. Level of the next iteration.
-    title: str
-        Title of the current path title.
-
-    Returns
-    -------
-    str, str
-        Path currently exploted
-        Current depth level.
-    """
-    for i in range(abs(current_level - new_level) + 1):
-
-        logger.debug(
-            'Current path : {} - Current level: {} - New level: {} - i: {}'
-            .format(current_path.name, current_level, new_level, i))
-
-        if new_level > current_level:
-            current_path = _level_in(current_path, title)
-            current_level += 1
-            logger.debug('Level IN: {}'.format(current_path.name))
-        elif new_level < current_level:
-            current_path = _level_out(current_path)
-            current_level -= 1
-            logger.debug('Level OUT: {}'.format(current_path.name))
-        else:
-            current_path = _level_out(current_path)
-            current_path = _level_in(current_path, title)
-            logger.debug('Level SAME: {}'.format(current_path.name))
-            # current_level = same
-
-    return current_path, current_level
-
-
 def _get_new_level(first_line, current_level):
     """ Decide what is the next level based on current cell source.
 
@@ -155,108 +188,608 @@ def _get_new_level(first_line, current_level):
     return new_level, new_title
 
 
-def _generate_notebooks(enum_source, current_path):
-    """ Generate a notebook for each item of the list.
-
-    The new notebook is just a copy of the template _TEMPLATE_NOTEBOOK_PATH_
+def _get_notebook_names(enum_source, notebook_format='ipynb'):
+    """ Get the notebook file name of each item of the list.
 
     Parameters
     ----------
     enum_source: list(str)
         List containing all notebook names to generate.
-    current_path: str
-        Complete current path.
+    notebook_format: str
+        Notebook format: ipynb for ipython notebooks or py for percent-format
+        scripts.
+
+    Returns
+    -------
+    list(str)
+        Notebook file names. Lines which are not list items are skipped.
     """
+    names = []
     for item in enum_source:
         splitted = re.split(r'^ *\*+ +', item)  # remove list markdown token: *
         if len(splitted) > 1:  # if regex matched
-            title = splitted[1].strip() + '.ipynb'
-            copyfile(TEMPLATE_NOTEBOOK_PATH, current_path / title)
+            names.append(splitted[1].strip() + '.' + notebook_format)
 
+    return names
 
-def _create_scaffolding(framework, version, cells):
-    """ Create the testing scaffolding.
+
+def _plan_scaffolding(cells, notebook_format='ipynb'):
+    """ Compile the schema cells into a scaffolding plan.
+
+    The schema is compiled in a single pass, keeping a stack with the titles
+    of the current path: a title at level N replaces the stack from its N-th
+    item on, and a list adds its notebooks at the current path.
+
+    Plan paths are plain '/' separated strings, which are much cheaper to
+    build and compare than Path objects on schemas with thousands of items.
 
     Parameters
     ----------
-    framework: str
+    cells: iterable(dict or Cell)
+        All schema cells. They are consumed once, so they can be streamed.
+    notebook_format: str
+        Format of the notebooks: ipynb or py.
+
+    Returns
+    -------
+    dict
+        Scaffolding plan. It holds the `dirs` and `notebooks` to create, as
+        paths relative to the root testing directory, in schema order.
+    """
+    stack = []
+    dirs = {}
+    notebooks = {}
+
+    for cell in classify_cells(cells):
+        if cell.is_title:
+            new_level, title = _get_new_level(cell.first_line, len(stack))
+            del stack[new_level - 1:]
+            stack.append(title)
+            dirs['/'.join(stack)] = None
+
+        elif cell.is_list:
+            for name in _get_notebook_names(cell.source, notebook_format):
+                notebooks['/'.join(stack + [name])] = None
+
+    return dict(dirs=list(dirs), notebooks=list(notebooks))
+
+
+def _get_template(template_path):
+    """ Get the template notebook content.
+
+    The template is read once and kept in memory for further calls.
+
+    Parameters
+    ----------
+    template_path: Path
+        Path to the template notebook.
+
+    Returns
+    -------
+    bytes
+        Template notebook content.
+    """
+    path = str(template_path)
+    if path not in TEMPLATE_NOTEBOOK_CACHE:
+        with open(path, 'rb') as f:
+            TEMPLATE_NOTEBOOK_CACHE[path] = f.read()
+
+    return TEMPLATE_NOTEBOOK_CACHE[path]
+
+
+def _open_notebook(path, overwrite):
+    """ Open a new notebook file for writing.
+
+    Parameters
+    ----------
+    path: str
+        Path to the notebook file.
+    overwrite: bool
+        Truncate the notebook if it already exists. Otherwise, fail.
+
+    Returns
+    -------
+    int
+        File descriptor.
+
+    Raises
+    ------
+    FileExistsError
+        If the notebook exists and it must not be overwritten.
+    """
+    flags = os.O_WRONLY | os.O_CREAT | (os.O_TRUNC if overwrite else os.O_EXCL)
+    return os.open(path, flags, 0o666)
+
+
+def _write_notebook(path, overwrite, template):
+    """ Create a notebook with a buffered write of the cached template.
+
+    Parameters
+    ----------
+    path: str
+        Path to the notebook file.
+    overwrite: bool
+        Overwrite the notebook if it already exists.
+    template: bytes
+        Template notebook content.
+    """
+    with open(path, 'wb' if overwrite else 'xb') as f:
+        f.write(template)
+
+
+def _copy_notebook(path, overwrite, template, source):
+    """ Create a notebook copying the template inside the kernel.
+
+    The template is cloned (reflink) when the file system supports it,
+    otherwise copied with copy_file_range. If none of them is available, it
+    falls back to writing the cached template.
+
+    Parameters
+    ----------
+    path: str
+        Path to the notebook file.
+    overwrite: bool
+        Overwrite the notebook if it already exists.
+    template: bytes
+        Template notebook content.
+    source: int
+        File descriptor of the template notebook file.
+    """
+    fd = _open_notebook(path, overwrite)
+    try:
+        if COPY_SUPPORT['reflink']:
+            try:
+                fcntl.ioctl(fd, FICLONE, source)
+                return
+            except OSError:
+                COPY_SUPPORT['reflink'] = False
+
+        if COPY_SUPPORT['copy_file_range']:
+            try:
+                offset = 0
+                while offset < len(template):
+                    copied = os.copy_file_range(source, fd,
+                                                len(template) - offset,
+                                                offset)
+                    if not copied:
+                        raise OSError('Template file shorter than expected')
+                    offset += copied
+                return
+            except OSError:
+                COPY_SUPPORT['copy_file_range'] = False
+                os.ftruncate(fd, 0)
+                os.lseek(fd, 0, os.SEEK_SET)
+
+        os.write(fd, template)
+    finally:
+        os.close(fd)
+
+
+def _link_notebook(path, overwrite, master):
+    """ Create a notebook as a hard link of the master template copy.
+
+    Linked notebooks share their inode, so writing any of them in place, as
+    Jupyter does when saving, would change all of them. The master is
+    read-only, and so are its links, until they are given a private copy
+    with `materialize_links` before editing them. The superuser ignores the
+    permissions, so it must always materialize them first.
+
+    Parameters
+    ----------
+    path: str
+        Path to the notebook file.
+    overwrite: bool
+        Overwrite the notebook if it already exists.
+    master: str
+        Path to the master template copy.
+    """
+    try:
+        os.link(master, path)
+    except FileExistsError:
+        if not overwrite:
+            raise
+        os.unlink(path)
+        os.link(master, path)
+
+
+def _read_master(master):
+    """ Read the master template copy.
+
+    Parameters
+    ----------
+    master: str
+        Path to the master template copy.
+
+    Returns
+    -------
+    bytes
+        Master content, or None if it does not exist.
+    """
+    try:
+        with open(master, 'rb') as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
+
+
+def _retire_master(master):
+    """ Keep an outdated master template copy aside, under a hidden name, so
+    the notebooks still linked to it are materialized as links.
+
+    Parameters
+    ----------
+    master: str
+        Path to the master template copy.
+    """
+    try:
+        inode = os.stat(master).st_ino
+    except FileNotFoundError:
+        return
+    root, name = os.path.split(master)
+    stem, suffix = os.path.splitext(name)
+    os.replace(master, os.path.join(root, '{}.{}{}'.format(stem, inode,
+                                                           suffix)))
+
+
+def _get_masters(current_path):
+    """ Get the inodes of the master template copies, current and retired.
+
+    Parameters
+    ----------
+    current_path: Path
+        Root testing path.
+
+    Returns
+    -------
+    set(tuple(int, int))
+        Device and inode of every master.
+    """
+    masters = set()
+    for name in os.listdir(str(current_path)):
+        if name.startswith(TEMPLATE_MASTER_NAME + '.'):
+            stat = os.stat(os.path.join(str(current_path), name))
+            masters.add((stat.st_dev, stat.st_ino))
+    return masters
+
+
+def _generate_notebooks(current_path, notebooks, overwrite=True,
+                        strategy='write', threads=None,
+                        notebook_format='ipynb'):
+    """ Generate the given notebooks.
+
+    Each new notebook is just a copy of the template of its format, at
+    _NOTEBOOK_TEMPLATES_, and they are created on a thread pool using one of
+    these strategies:
+
+        * write: buffered write of the template, cached in memory.
+        * copy: reflink or copy_file_range of the template file.
+        * hardlink: hard link of a read-only master copy of the template,
+        kept at the root testing path. Links must be materialized, with
+        `materialize_links`, before they are edited. A master outdated by a
+        new template is kept aside, hidden, along with its links.
+
+    Parameters
+    ----------
+    current_path: Path
+        Root testing path.
+    notebooks: list(str)
+        Notebook paths, relative to the root testing path.
+    overwrite: bool
+        Overwrite the notebooks which already exist. Otherwise, they are
+        left untouched, without reading them.
+    strategy: str
+        Creation strategy: write, copy or hardlink.
+    threads: int
+        Number of threads creating notebooks. None to let the pool decide.
+    notebook_format: str
+        Format of the notebooks: ipynb or py.
+    """
+    if strategy not in MATERIALIZE_STRATEGIES:
+        raise ValueError('Unknown materialize strategy %s' % strategy)
+
+    template_path = NOTEBOOK_TEMPLATES[notebook_format]
+    template = _get_template(template_path)
+    source = None
+
+    if strategy == 'write':
+        create_notebook = partial(_write_notebook, template=template)
+    elif strategy == 'copy':
+        source = os.open(str(template_path), os.O_RDONLY)
+        create_notebook = partial(_copy_notebook,
+                                  template=template,
+                                  source=source)
+    else:
+        master = os.path.join(
+            str(current_path),
+            '{}.{}'.format(TEMPLATE_MASTER_NAME, notebook_format)
+        )
+        if _read_master(master) != template:
+            _retire_master(master)
+            with open(master + '.tmp', 'wb') as f:
+                f.write(template)
+            os.chmod(master + '.tmp', READ_ONLY_MODE)
+            os.replace(master + '.tmp', master)
+        create_notebook = partial(_link_notebook, master=master)
+
+    def generate(notebook):
+        try:
+            create_notebook(os.path.join(str(current_path), notebook),
+                            overwrite)
+        except FileExistsError:
+            logger.debug('Keeping existing notebook %s', notebook)
+
+    try:
+        if threads == 1:
+            for notebook in notebooks:
+                generate(notebook)
+        else:
+            with ThreadPoolExecutor(max_workers=threads) as pool:
+                list(pool.map(generate, notebooks))
+    finally:
+        if source is not None:
+            os.close(source)
+
+
+def _materialize_links(current_path):
+    """ Give a private, writable copy to the notebooks still hard linked to
+    a template master. Other files, even read-only ones, are left untouched.
+
+    Parameters
+    ----------
+    current_path: Path
+        Root testing path.
+
+    Returns
+    -------
+    list(str)
+        Materialized notebooks, relative to the root testing path.
+    """
+    masters = _get_masters(current_path)
+    materialized = []
+    for root, dirs, files in os.walk(str(current_path)):
+        dirs[:] = sorted(x for x in dirs if not x.startswith('.'))
+        for name in sorted(files):
+            path = os.path.join(root, name)
+            if name.startswith('.') or not name.endswith(NOTEBOOK_SUFFIXES):
+                continue
+            stat = os.stat(path)
+            if stat.st_nlink < 2 and \
+                    (stat.st_dev, stat.st_ino) not in masters:
+                continue
+            with open(path, 'rb') as f:
+                content = f.read()
+            with open(path + '.tmp', 'wb') as f:
+                f.write(content)
+            os.replace(path + '.tmp', path)
+            materialized.append(
+                PurePath(path).relative_to(current_path).as_posix())
+
+    logger.debug('Materialized %s linked notebooks', len(materialized))
+    return materialized
+
+
+def materialize_links(framework_name, framework_version):
+    """ Give a private, writable copy to every notebook of the scaffolding
+    created with the hardlink strategy, so it can be edited.
+
+    Parameters
+    ----------
+    framework_name: str
         Framework name.
-    version: str
+    framework_version: str
         Framework version.
-    cells: list(dict)
-        List of all notebook cells.
+
+    Returns
+    -------
+    list(str)
+        Materialized notebooks, relative to the root testing path.
     """
-    current_level = 0
-    current_path = _setup_base_dir(framework, version)
+    return _materialize_links(
+        Path(BASE_DIR) / framework_name / framework_version)
 
-    for cell in cells:
-        first_line = get_first_line(cell)
 
-        if is_title(cell):
-            new_level, title = _get_new_level(first_line, current_level)
-            current_path, current_level = _walk_path(
-                current_path,
-                current_level,
-                new_level,
-                title
-            )
+def _materialize(plan, current_path, overwrite=True, strategy='write',
+                 threads=None, notebook_format='ipynb'):
+    """ Create all the directories and notebooks of a scaffolding plan.
 
-        elif is_list(cell):
-            _generate_notebooks(cell['source'], current_path)
+    Only the deepest directories are created, with their parents at once.
 
+    Parameters
+    ----------
+    plan: dict
+        Scaffolding plan.
+    current_path: Path
+        Root testing path.
+    overwrite: bool
+        Overwrite the notebooks which already exist.
+    strategy: str
+        Notebook creation strategy: write, copy or hardlink.
+    threads: int
+        Number of threads creating notebooks. None to let the pool decide.
+    notebook_format: str
+        Format of the notebooks: ipynb or py.
+    """
+    parents = {x.rsplit('/', 1)[0] for x in plan['dirs'] if '/' in x}
+    for directory in plan['dirs']:
+        if directory not in parents:
+            logger.debug('Creating path %s', directory)
+            os.makedirs(os.path.join(str(current_path), directory),
+                        exist_ok=True)
+
+    _generate_notebooks(current_path, plan['notebooks'], overwrite, strategy,
+                        threads, notebook_format)
 
-def _level_in(current_path, new_title):
-    """ Dive a level in.
 
-    The actions to perform when diving a new level are:
-        * Get the new path. It is composed by the current path + the new
-        (sub)title.
-        * Create the new path if it doesn't exist yet.
-        * Return the new path.
+def _load_manifest(current_path):
+    """ Load the manifest of the generated scaffolding.
 
     Parameters
     ----------
-    current_path: str
-        Current absolute path.
-    new_title: str
-        Title of the new path.
+    current_path: Path
+        Root testing path.
 
     Returns
     -------
-    str
-        Next absolute path.
+    dict
+        Generated `dirs` and `notebooks`, as paths relative to the root
+        testing path. Empty if there is no manifest.
     """
-    next_path = current_path / new_title
-    logger.debug('Que cojones pasa')
-    if not next_path.exists():
-        logger.debug('Creating path %s' % next_path)
-        next_path.mkdir()  # create new level
+    try:
+        with open(str(current_path / MANIFEST_FILE_NAME), 'r') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return dict(dirs=[], notebooks=[])
 
-    return next_path
 
+def _update_manifest(current_path, plan, previous):
+    """ Record the generated scaffolding in its manifest.
 
-def _level_out(current_path):
-    """ Get a level out.
+    Items of the previous manifest which left the schema are orphans. They
+    are kept in the manifest while they still exist on disk, so they are
+    listed again until they are removed.
 
     Parameters
     ----------
-    current_path: str
-        Current absolute path.
+    current_path: Path
+        Root testing path.
+    plan: dict
+        Generated scaffolding plan.
+    previous: dict
+        Previous manifest.
 
     Returns
     -------
-    str
-        Next absolute path.
+    list(str)
+        Orphaned items, relative to the root testing path.
+    """
+    manifest = {}
+    orphans = []
+
+    for key in ['dirs', 'notebooks']:
+        planned = set(plan[key])
+        orphaned = [x for x in previous[key] if x not in planned
+                    and os.path.exists(os.path.join(str(current_path), x))]
+        manifest[key] = plan[key] + orphaned
+        orphans.extend(orphaned)
+
+    tmp = current_path / (MANIFEST_FILE_NAME + '.tmp')
+    with open(str(tmp), 'w') as f:
+        json.dump(manifest, f)
+    os.replace(str(tmp), str(current_path / MANIFEST_FILE_NAME))
+
+    for orphan in orphans:
+        logger.warning('Orphaned item, no longer in the schema: %s', orphan)
+
+    return sorted(orphans, key=lambda x: x.split('/'))
+
+
+def _diff_scaffolding(plan, current_path):
+    """ Compare a scaffolding plan with what already exists on disk.
+
+    Parameters
+    ----------
+    plan: dict
+        Scaffolding plan.
+    current_path: Path
+        Root testing path.
+
+    Returns
+    -------
+    list(str, str)
+        Status and relative path of every directory and notebook. The status
+        is '+' if it would be created, '=' if it already exists and '-' if
+        it exists but it is not in the plan. Hidden files and directories,
+        as the hardlink master or .ipynb_checkpoints, setup and teardown
+        notebooks and python files which are not percent-format scripts are
+        not generated, so they are left out.
     """
-    return current_path / '..'  # level back
+    existing = set()
+    for root, dirs, files in os.walk(str(current_path)):
+        dirs[:] = [x for x in dirs if not x.startswith('.')]
+        relative = PurePath(root).relative_to(current_path)
+        existing.update((relative / x).as_posix() for x in dirs)
+        existing.update((relative / x).as_posix() for x in files
+                        if x.endswith(NOTEBOOK_SUFFIXES)
+                        and not x.startswith('.') and not is_fixture(x)
+                        and (not x.endswith('.py')
+                             or is_script(os.path.join(root, x))))
+
+    planned = plan['dirs'] + plan['notebooks']
+    diff = [('=' if x in existing else '+', x) for x in planned]
+    diff.extend(('-', x) for x in sorted(existing.difference(planned),
+                                         key=lambda x: x.split('/')))
+
+    return diff
+
+
+def _create_scaffolding(framework, version, cells, sync=False,
+                        strategy='write', threads=None,
+                        notebook_format='ipynb'):
+    """ Create the testing scaffolding.
+
+    When syncing, the manifest tells which items were already generated.
+    Those are neither created nor checked again, so syncing costs as many
+    file system calls as new items there are in the schema.
 
+    Parameters
+    ----------
+    framework: str
+        Framework name.
+    version: str
+        Framework version.
+    cells: list(dict)
+        List of all notebook cells.
+    sync: bool
+        Only create the missing directories and notebooks, leaving the
+        existing ones untouched.
+    strategy: str
+        Notebook creation strategy: write, copy or hardlink.
+    threads: int
+        Number of threads creating notebooks. None to let the pool decide.
+    notebook_format: str
+        Format of the notebooks: ipynb or py.
 
-def create(framework_name, framework_version, test_schema):
+    Returns
+    -------
+    list(str)
+        Orphaned items, which were generated before but are no longer in
+        the schema.
+    """
+    plan = _plan_scaffolding(cells, notebook_format)
+    current_path = _setup_base_dir(framework, version)
+    previous = _load_manifest(current_path)
+
+    if sync:
+        generated = set(previous['dirs'] + previous['notebooks'])
+        missing = {k: [x for x in v if x not in generated]
+                   for k, v in plan.items()}
+        logger.debug('Syncing %s new directories and %s new notebooks',
+                     len(missing['dirs']), len(missing['notebooks']))
+        _materialize(missing, current_path, overwrite=False,
+                     strategy=strategy, threads=threads,
+                     notebook_format=notebook_format)
+    else:
+        _materialize(plan, current_path, strategy=strategy, threads=threads,
+                     notebook_format=notebook_format)
+
+    return _update_manifest(current_path, plan, previous)
+
+
+def create(framework_name, framework_version, test_schema, dry_run=False,
+           sync=False, strategy='write', threads=None,
+           notebook_format='ipynb'):
     """ Create the complete scaffolding.
 
     Given a framework name and version create the scaffolding following
     the test schema.
 
+    When syncing an existing scaffolding with an updated schema, only the
+    missing directories and notebooks are created and the work already
+    written into the existing notebooks is kept.
+
+    On a dry run nothing is created. The plan is printed instead, compared
+    with the scaffolding which already exists.
+
     Parameters
     ----------
     framework_name: str
@@ -264,21 +797,57 @@ def create(framework_name, framework_version, test_schema):
     framework_version: str
         Framework version.
     test_schema: str
-        Path to the test schema markdown notebook.
+        Path to the test schema markdown notebook, or plain markdown (.md)
+        file.
+    dry_run: bool
+        Print the plan instead of creating it.
+    sync: bool
+        Only create the missing directories and notebooks.
+    strategy: str
+        Notebook creation strategy: write, copy or hardlink.
+    threads: int
+        Number of threads creating notebooks. None to let the pool decide.
+    notebook_format: str
+        Format of the notebooks: ipynb for ipython notebooks or py for
+        percent-format scripts, where '# %%' lines separate cells.
+
+    Returns
+    -------
+    list(str)
+        Orphaned items, which were generated before but are no longer in
+        the schema. Empty on a dry run.
     """
-    logger.debug('HOLAAAAA')
     if not (os.path.exists(test_schema) and os.path.isfile(test_schema)):
         m = 'Input schema file "{}" does not exist'.format(test_schema)
         logger.error(m)
         raise FileNotFoundError(m)
 
-    schema = _load_schema(test_schema)
-    _create_scaffolding(framework_name, framework_version, schema['cells'])
+    cells = _get_schema_cells(test_schema)
 
+    if dry_run:
+        plan = _plan_scaffolding(cells, notebook_format)
+        current_path = Path(BASE_DIR) / framework_name / framework_version
+        for status, path in _diff_scaffolding(plan, current_path):
+            print(status, path)
+        return []
 
-if __name__ == "__main__":
+    return _create_scaffolding(framework_name,
+                               framework_version,
+                               cells,
+                               sync=sync,
+                               strategy=strategy,
+                               threads=threads,
+                               notebook_format=notebook_format)
 
-    parser = argparse.ArgumentParser(prog='Create new testing scaffolding')
+
+def _add_arguments(parser):
+    """ Add the scaffolding command line arguments to some parser.
+
+    Parameters
+    ----------
+    parser: argparse.ArgumentParser
+        Parser to add the arguments to.
+    """
     parser.add_argument("-n", '--name',
                         required=True,
                         help='Name of the new framework to tests.')
@@ -290,12 +859,76 @@ if __name__ == "__main__":
     parser.add_argument("-i", '--input',
                         default='HOW_TO.ipynb',
                         required=False,
-                        help='Directory where test schema is placed')
+                        help='Test schema: an ipynb markdown notebook or a '
+                             'plain markdown (.md) file.')
 
-    args = parser.parse_args(sys.argv[1:])
+    parser.add_argument('--dry-run',
+                        action='store_true',
+                        help='Print the scaffolding plan and its differences '
+                             'with the existing one, without creating it.')
+
+    parser.add_argument('--sync',
+                        action='store_true',
+                        help='Only create the missing directories and '
+                             'notebooks, keeping the existing ones.')
+
+    parser.add_argument('--strategy',
+                        choices=MATERIALIZE_STRATEGIES,
+                        default='write',
+                        help='How notebooks are created from the template.')
+
+    parser.add_argument('--materialize-links',
+                        action='store_true',
+                        help='Give a writable copy to the notebooks created '
+                             'with the hardlink strategy, instead of '
+                             'creating the scaffolding.')
+
+    parser.add_argument('--threads',
+                        type=int,
+                        default=None,
+                        help='Number of threads creating notebooks.')
+
+    parser.add_argument('--format',
+                        choices=sorted(NOTEBOOK_TEMPLATES),
+                        default='ipynb',
+                        help='Format of the generated notebooks.')
 
+    parser.add_argument('--log-level',
+                        default='INFO',
+                        choices=['DEBUG', 'INFO', 'WARNING', 'ERROR'],
+                        help='Logging level.')
+
+
+def _main(args):
+    """ Create the scaffolding from parsed command line arguments.
+
+    Parameters
+    ----------
+    args: argparse.Namespace
+        Parsed command line arguments.
+    """
     test_schema = os.path.abspath(args.input)
     framework_version = args.version
     framework_name = args.name
 
-    create(framework_name, framework_version, test_schema)
+    if args.materialize_links:
+        materialize_links(framework_name, framework_version)
+        return
+
+    create(framework_name,
+           framework_version,
+           test_schema,
+           dry_run=args.dry_run,
+           sync=args.sync,
+           strategy=args.strategy,
+           threads=args.threads,
+           notebook_format=args.format)
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(prog='Create new testing scaffolding')
+    _add_arguments(parser)
+    args = parser.parse_args(sys.argv[1:])
+    logging.basicConfig(stream=sys.stdout, level=args.log_level)
+    _main(args)
@@ -0,0 +1,224 @@
+# -*- coding: utf-8 -*-
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+
+import json
+
+
+SKIPPED_RESULTS = ('PENDING', 'SKIPPED', 'NOT RUN')
+
+
+class JsonLinesSink(object):
+    """ Result sink writing newline-delimited JSON.
+
+    Every assert of a notebook is written as an `assert` line, followed by
+    the `notebook` line with its result and budget violations, as soon as
+    the notebook completes. A final `summary` line holds the number of
+    notebooks by result.
+    """
+
+    def __init__(self, path):
+        self.file = open(str(path), 'w')
+        self.counts = {}
+
+    def _write_line(self, line):
+        self.file.write(json.dumps(line, sort_keys=True) + '\n')
+
+    def write(self, record):
+        """ Write the result of a notebook.
+
+        Parameters
+        ----------
+        record: dict
+            Notebook result record, with its `path`, `result`, `seconds` and
+            `asserts`.
+        """
+        for item in record['asserts']:
+            self._write_line(dict(type='assert', path=record['path'],
+                                  cell=item['cell'], passed=item['passed'],
+                                  output=item['output'],
+                                  seconds=item['seconds']))
+        self._write_line(dict(
+            type='notebook',
+            path=record['path'],
+            result=record['result'],
+            seconds=record['seconds'],
+            asserts=len(record['asserts']),
+            failures=len([x for x in record['asserts'] if not x['passed']]),
+            violations=record.get('violations', [])
+        ))
+        self.file.flush()
+        self.counts[record['result']] = \
+            self.counts.get(record['result'], 0) + 1
+
+    def close(self):
+        """ Write the summary line and close the file. """
+        self._write_line(dict(type='summary', results=self.counts))
+        self.file.close()
+
+
+class JUnitSink(object):
+    """ Result sink writing JUnit XML.
+
+    Every notebook is written as a <testsuite> as soon as it completes, with
+    a <testcase> for each of its asserts. Notebooks without assert results,
+    as reused, skipped or out of memory ones, get a single <testcase> named
+    after the notebook. Budget violations are failures of an extra `budget`
+    <testcase>.
+    """
+
+    def __init__(self, path):
+        self.file = open(str(path), 'w')
+        self.file.write('<?xml version="1.0" encoding="utf-8"?>\n'
+                        '<testsuites>\n')
+
+    @staticmethod
+    def _testcase(classname, name, seconds, outcome=''):
+        """ Format a <testcase> element.
+
+        Parameters
+        ----------
+        classname: str
+            Test class name, the notebook path.
+        name: str
+            Test name.
+        seconds: float
+            Test duration. None if unknown.
+        outcome: str
+            Failure, error or skipped element. Empty for passed tests.
+
+        Returns
+        -------
+        str
+            Testcase element.
+        """
+        # xml.sax imports urllib, too slow for every command line startup
+        from xml.sax.saxutils import quoteattr
+
+        time_attr = '' if seconds is None else ' time="{:.6f}"'.format(seconds)
+        return '    <testcase classname={} name={}{}>{}</testcase>\n'.format(
+            quoteattr(classname), quoteattr(name), time_attr, outcome)
+
+    def write(self, record):
+        """ Write the result of a notebook.
+
+        Parameters
+        ----------
+        record: dict
+            Notebook result record, with its `path`, `result`, `seconds` and
+            `asserts`.
+        """
+        from xml.sax.saxutils import quoteattr
+
+        classname = record['path'].rsplit('.', 1)[0].replace('/', '.')
+        cases = []
+        counts = dict(failures=0, errors=0, skipped=0)
+
+        for item in record['asserts']:
+            outcome = ''
+            if not item['passed']:
+                counts['failures'] += 1
+                outcome = '<failure message={} />'.format(
+                    quoteattr('Assert returned {}'.format(item['output'])))
+            cases.append(self._testcase(classname, 'cell {}'.format(
+                item['cell']), item['seconds'], outcome))
+
+        if not record['asserts']:
+            result = record['result']
+            outcome = ''
+            if result in SKIPPED_RESULTS:
+                counts['skipped'] += 1
+                outcome = '<skipped message={} />'.format(quoteattr(result))
+            elif result == 'KO':
+                counts['failures'] += 1
+                outcome = '<failure message="No assert is true" />'
+            elif result != 'OK':
+                counts['errors'] += 1
+                outcome = '<error message={} />'.format(quoteattr(result))
+            cases.append(self._testcase(
+                classname, record['path'].rsplit('/', 1)[-1],
+                record['seconds'], outcome))
+
+        if record.get('violations'):
+            counts['failures'] += 1
+            cases.append(self._testcase(
+                classname, 'budget', None, '<failure message={} />'.format(
+                    quoteattr('; '.join(record['violations'])))))
+
+        time_attr = '' if record['seconds'] is None \
+            else ' time="{:.6f}"'.format(record['seconds'])
+        self.file.write(
+            '  <testsuite name={} tests="{}" failures="{failures}" '
+            'errors="{errors}" skipped="{skipped}"{}>\n'.format(
+                quoteattr(record['path']), len(cases), time_attr, **counts)
+        )
+        self.file.writelines(cases)
+        self.file.write('  </testsuite>\n')
+        self.file.flush()
+
+    def close(self):
+        """ Close the document and the file. """
+        self.file.write('</testsuites>\n')
+        self.file.close()
+
+
+SINK_TYPES = {
+    'jsonl': JsonLinesSink,
+    'junit': JUnitSink
+}
+
+
+def parse_sink(value):
+    """ Parse a result sink specification.
+
+    >>> parse_sink('junit:results.xml')
+    ('junit', 'results.xml')
+
+    Parameters
+    ----------
+    value: str
+        Sink type and output path, separated by a colon.
+
+    Returns
+    -------
+    str, str
+        Sink type and output path.
+    """
+    kind, _, path = value.partition(':')
+    if kind not in SINK_TYPES or not path:
+        raise ValueError('Sink must be one of {} followed by :path, as '
+                         'junit:results.xml: {}'.format(sorted(SINK_TYPES),
+                                                        value))
+
+    return kind, path
+
+
+def open_sinks(specs):
+    """ Open the result sinks of some specifications.
+
+    Parameters
+    ----------
+    specs: list(tuple(str, str))
+        Sink type and output path of each sink, as returned by
+        `parse_sink`.
+
+    Returns
+    -------
+    list
+        Opened sinks. They must be closed once the run ends.
+    """
+    return [SINK_TYPES[kind](path) for kind, path in specs or []]
+
+
+def emit(sinks, record):
+    """ Write the result of a notebook to all the sinks.
+
+    Parameters
+    ----------
+    sinks: list
+        Opened sinks.
+    record: dict
+        Notebook result record, with its `path`, `result`, `seconds` and
+        `asserts`.
+    """
+    for sink in sinks:
+        sink.write(record)
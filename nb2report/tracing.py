@@ -0,0 +1,193 @@
+# -*- coding: utf-8 -*-
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+
+import json
+import os
+import time
+
+
+TRACER = None
+
+
+class _NullSpan(object):
+    """ Span doing nothing, used while tracing is disabled.
+
+    A single instance is shared by all the disabled spans, so a disabled
+    span costs a function call and nothing else.
+    """
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **attrs):
+        """ Ignore the given attributes. """
+
+
+NULL_SPAN = _NullSpan()
+
+
+class Span(object):
+    """ Traced span of work, used as a context manager.
+
+    On exit, the span is written to the trace with its name, attributes,
+    start time, duration and the id of its parent span, if any.
+    """
+    __slots__ = ('tracer', 'name', 'attrs', 'id', 'parent', 'start')
+
+    def __init__(self, tracer, name, attrs):
+        self.tracer = tracer
+        self.name = name
+        self.attrs = attrs
+
+    def __enter__(self):
+        self.id, self.parent = self.tracer.push()
+        self.start = time.time()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        duration = time.time() - self.start
+        self.tracer.pop()
+        if exc_type is not None:
+            self.attrs['error'] = exc_type.__name__
+        self.tracer.write(dict(
+            name=self.name,
+            id=self.id,
+            parent=self.parent,
+            pid=os.getpid(),
+            start=self.start,
+            duration=duration,
+            attrs=self.attrs
+        ))
+        return False
+
+    def set(self, **attrs):
+        """ Add some attributes to the span.
+
+        Parameters
+        ----------
+        attrs
+            Attributes. They must be JSON serializable.
+        """
+        self.attrs.update(attrs)
+
+
+class Tracer(object):
+    """ Writer of spans to a JSON lines trace file.
+
+    Every process opens its own handle to the trace file, so workers forked
+    from a tracing process trace into the same file.
+    """
+
+    def __init__(self, path):
+        self.path = str(path)
+        self.pid = None
+        self.file = None
+        self.stack = []
+        self.count = 0
+
+    def _open(self):
+        """ Open the trace file for appending, if this process has not. """
+        if self.pid != os.getpid():
+            self.pid = os.getpid()
+            self.file = open(self.path, 'a', buffering=1)
+            self.stack = []
+
+    def push(self):
+        """ Start a new span.
+
+        Returns
+        -------
+        str, str
+            Id of the new span, and id of its parent span or None.
+        """
+        self._open()
+        self.count += 1
+        span_id = '{}.{}'.format(self.pid, self.count)
+        parent = self.stack[-1] if self.stack else None
+        self.stack.append(span_id)
+        return span_id, parent
+
+    def pop(self):
+        """ Finish the current span. """
+        self.stack.pop()
+
+    def write(self, record):
+        """ Write a finished span record to the trace file.
+
+        Parameters
+        ----------
+        record: dict
+            Span record.
+        """
+        self.file.write(json.dumps(record) + '\n')
+
+    def close(self):
+        """ Close the trace file of this process. """
+        if self.file is not None and self.pid == os.getpid():
+            self.file.close()
+        self.file = None
+        self.pid = None
+
+
+def start(path):
+    """ Start tracing into some file.
+
+    Spans are appended to the file, so several runs can share it.
+
+    Parameters
+    ----------
+    path: str
+        Path to the JSON lines trace file. None to keep tracing disabled.
+    """
+    global TRACER
+    stop()
+    if path:
+        TRACER = Tracer(path)
+
+
+def stop():
+    """ Stop tracing, closing the trace file. """
+    global TRACER
+    if TRACER is not None:
+        TRACER.close()
+        TRACER = None
+
+
+def current_path():
+    """ Get the trace file path.
+
+    Returns
+    -------
+    str
+        Path to the trace file. None if tracing is disabled.
+    """
+    return TRACER.path if TRACER is not None else None
+
+
+def span(name, **attrs):
+    """ Trace a span of work.
+
+        with tracing.span('load', path=str(f)) as s:
+            notebook = _load_notebook(f)
+            s.set(cells=len(notebook['cells']))
+
+    Parameters
+    ----------
+    name: str
+        Span name, as discovery, load, execute-cell, evaluate or render.
+    attrs
+        Span attributes. They must be JSON serializable.
+
+    Returns
+    -------
+    Span
+        Span context manager. The shared null span if tracing is disabled.
+    """
+    if TRACER is None:
+        return NULL_SPAN
+
+    return Span(TRACER, name, attrs)
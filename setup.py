@@ -26,6 +26,9 @@ setuptools.setup(
     long_description_content_type="text/markdown",
     url="https://github.com/pypa/sampleproject",
     packages=setuptools.find_packages(exclude=("tests",)),
+    entry_points={
+        "console_scripts": ["nb2report = nb2report.cli:main"],
+    },
     classifiers=[
         "Programming Language :: Python :: 3",
         "License :: OSI Approved :: MIT License",
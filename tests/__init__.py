@@ -0,0 +1,25 @@
+import json
+
+
+def write_notebook(f, cells, asserts=True, metadata=None):
+    """ Write a notebook, creating its directory.
+
+    Parameters
+    ----------
+    f: Path
+        Notebook path.
+    cells: list(str or dict)
+        Code cell sources, or cells.
+    asserts: bool
+        True to write the asserts cell before the given cells.
+    metadata: dict
+        Notebook metadata.
+    """
+    notebook_cells = [dict(cell_type='markdown', source=['# Asserts'])] \
+        if asserts else []
+    notebook_cells.extend(x if isinstance(x, dict)
+                          else dict(cell_type='code', source=[x])
+                          for x in cells)
+    f.parent.mkdir(parents=True, exist_ok=True)
+    f.write_text(json.dumps(dict(metadata=metadata or {},
+                                 cells=notebook_cells)))
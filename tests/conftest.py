@@ -0,0 +1,11 @@
+import logging
+
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def root_logging():
+    """ Restore the root logger handlers, which the CLI configures. """
+    handlers = list(logging.getLogger().handlers)
+    yield
+    logging.getLogger().handlers = handlers
@@ -0,0 +1,20 @@
+# %%
+"""
+
+Enter your code here =)
+
+"""
+
+# %% [markdown]
+# # Asserts
+#
+# Note: automatic tests will check all asserts to be true
+
+# %%
+True == True
+
+# %%
+True == False
+
+# %%
+True == True
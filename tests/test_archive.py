@@ -0,0 +1,114 @@
+import os
+import json
+import tarfile
+import zipfile
+
+import pytest
+
+from pathlib import Path, PurePosixPath
+from nb2report import archive, journal, reporting
+
+
+TMP_DIR = Path(os.environ['TMP_DIR'])
+RESOURCES_DIR = Path(os.environ['RESOURCES_DIR'])
+DUMMY_ASSERT_TRUE = Path(os.environ['DUMMY_ASSERT_TRUE'])
+DUMMY_ASSERT_FALSE = Path(os.environ['DUMMY_ASSERT_FALSE'])
+
+MEMBERS = {
+    'A/B/true.ipynb': DUMMY_ASSERT_TRUE,
+    'A/false.ipynb': DUMMY_ASSERT_FALSE,
+    'A/.ipynb_checkpoints/false.ipynb': DUMMY_ASSERT_FALSE,
+    'script.py': RESOURCES_DIR / 'dummy_assert_false.py',
+    'A/helpers.py': Path(__file__),  # plain module, not a notebook
+}
+
+
+def _make_zip(path, prefix=''):
+    with zipfile.ZipFile(str(path), 'w') as f:
+        for name, source in MEMBERS.items():
+            f.write(str(source), prefix + name)
+    return path
+
+
+def _make_tar(path, prefix=''):
+    with tarfile.open(str(path), 'w:gz') as f:
+        for name, source in MEMBERS.items():
+            f.add(str(source), './' + prefix + name)
+    return path
+
+
+def test_is_archive():
+    assert archive.is_archive('a.zip') and archive.is_archive('a.tgz')
+    assert not archive.is_archive('a.ipynb')
+
+
+def test_member():
+    root = archive.Member('a.zip')
+    member = root / 'A' / 'b.ipynb'
+
+    assert member == archive.Member('a.zip', 'A/b.ipynb')
+    assert (member.name, member.suffix) == ('b.ipynb', '.ipynb')
+    assert member.relative_to(root) == PurePosixPath('A/b.ipynb')
+    assert member.relative_to(root / 'A') == PurePosixPath('b.ipynb')
+    assert str(member) == os.path.join('a.zip', 'A', 'b.ipynb')
+
+
+def test_list_notebooks():
+    for path in (_make_zip(TMP_DIR / 'list.zip'),
+                 _make_tar(TMP_DIR / 'list.tar.gz')):
+        root = archive.find_root(str(path))
+        assert sorted(archive.list_notebooks(root, ('.ipynb', '.py'))) == \
+            ['A/B/true.ipynb', 'A/false.ipynb', 'script.py']
+        assert (root / 'A' / 'false.ipynb').is_file()
+        assert not (root / 'A').is_file()
+
+
+def test_find_root():
+    path = str(_make_zip(TMP_DIR / 'root.zip', 'fw/1.0/'))
+
+    assert archive.find_root(path, 'fw/1.0') == archive.Member(path, 'fw/1.0')
+    assert archive.find_root(path, 'fw/2.0') == archive.Member(path)
+
+
+def test_open_file():
+    path = str(_make_tar(TMP_DIR / 'open.tar.gz'))
+    member = archive.Member(path, 'A/B/true.ipynb')
+
+    with archive.open_file(member) as f:
+        assert json.load(f) == json.loads(DUMMY_ASSERT_TRUE.read_text())
+    assert journal.hash_file(member) == journal.hash_file(DUMMY_ASSERT_TRUE)
+
+
+def test_generate_summary_archive(monkeypatch):
+    monkeypatch.setattr(reporting, 'BASE_DIR', TMP_DIR.parent)
+    path = _make_zip(TMP_DIR / 'archived.zip', 'tmp/archived/')
+    root = TMP_DIR / 'archived'
+
+    reporting.generate_summary(TMP_DIR.name, 'archived', archive_path=path,
+                               workers=2)
+    results = {x['title']: x['supported'] for x in reporting.REPORTING_ITEMS}
+
+    assert results == {'A': '', 'B': '', 'true.ipynb': 'OK',
+                       'false.ipynb': 'KO', 'script.py': 'KO'}
+    assert sorted(journal.load(root / reporting.JOURNAL_FILE_NAME)) == \
+        ['A/B/true.ipynb', 'A/false.ipynb', 'script.py']
+    assert not (root / 'A').exists()  # nothing extracted
+
+
+def test_generate_summary_archive_paths(monkeypatch):
+    monkeypatch.setattr(reporting, 'BASE_DIR', TMP_DIR.parent)
+    path = _make_tar(TMP_DIR / 'archived_paths.tgz')
+
+    reporting.generate_summary(TMP_DIR.name, 'archived_paths',
+                               archive_path=path, paths=['A/B'])
+    titles = [x['title'] for x in reporting.REPORTING_ITEMS]
+
+    assert titles == ['A', 'B', 'true.ipynb']
+
+
+def test_generate_summary_archive_unsupported(monkeypatch):
+    monkeypatch.setattr(reporting, 'BASE_DIR', TMP_DIR.parent)
+
+    with pytest.raises(ValueError):
+        reporting.generate_summary(TMP_DIR.name, 'unsupported',
+                                   archive_path=TMP_DIR / 'archive.rar')
@@ -0,0 +1,50 @@
+from nb2report import benchmark, scaffolding
+
+
+def test_bench_materialize():
+    results = benchmark.bench_materialize(notebooks=20, dirs=3, repeat=1)
+
+    assert [x['strategy'] for x in results] == \
+        ['copyfile'] + list(scaffolding.MATERIALIZE_STRATEGIES)
+    assert all(x['seconds'] > 0 and x['notebooks'] == 20 for x in results)
+
+
+def test_synthesize_schema():
+    plan = scaffolding._plan_scaffolding(
+        scaffolding.Cell('markdown', [x])
+        for x in benchmark.synthesize_schema(depth=2, fanout=3,
+                                             notebooks_per_leaf=2)
+    )
+
+    assert len(plan['dirs']) == 3 + 3 * 3
+    assert len(plan['notebooks']) == 3 * 3 * 2
+    assert 'Section 1/Section 1.2/Notebook 0.ipynb' in plan['notebooks']
+
+
+def test_synthesize_notebook():
+    notebook = benchmark.synthesize_notebook(asserts=3, output_size=5)
+    asserts = notebook['cells'][-3:]
+
+    assert all(x['source'] == ['True'] for x in asserts)
+    assert all(x['outputs'][0]['text'] == ['xxxxx'] for x in asserts)
+
+
+def test_bench_pipeline():
+    base_dir = scaffolding.BASE_DIR
+    results = benchmark.bench_pipeline(depth=2, fanout=2,
+                                       notebooks_per_leaf=2, asserts=2,
+                                       output_size=10, repeat=1)
+
+    assert [x['phase'] for x in results] == list(benchmark.PIPELINE_PHASES)
+    assert all(x['format'] == benchmark.BENCHMARK_FORMAT for x in results)
+    assert {x['phase']: x['items'] for x in results} == dict(
+        scaffold=8, discovery=8, load=8, run_cell=2, render=14)
+    assert scaffolding.BASE_DIR == base_dir
+
+
+def test_bench_startup():
+    results = benchmark.bench_startup(repeat=1)
+
+    assert [x['command'] for x in results] == \
+        [' '.join(x) for x in benchmark.STARTUP_COMMANDS]
+    assert all(x['seconds'] > 0 for x in results)
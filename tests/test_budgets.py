@@ -0,0 +1,125 @@
+import json
+import pytest
+
+from nb2report import budgets, reporting
+from tests import write_notebook
+
+
+def _write_notebook(f, asserts, budget=None):
+    write_notebook(f, [dict(cell_type='code', source=[code],
+                            metadata=dict(budget=cell_budget) if cell_budget
+                            else {})
+                       for code, cell_budget in asserts],
+                   metadata=dict(budget=budget) if budget else None)
+
+
+def test_read_budget():
+    assert budgets.read_budget({}) == {}
+    assert budgets.read_budget(dict(budget=dict(
+        seconds='1.5', memory_mb=10, rows_per_second='x', other=1))) == \
+        dict(seconds=1.5, memory_mb=10.0)
+    assert budgets.read_budget(dict(budget=[1])) == {}
+
+
+def test_check():
+    budget = dict(seconds=1.0, memory_mb=1.0, rows_per_second=100.0)
+
+    assert budgets.check(budget, 0.5, peak=1000, rows=100) == []
+    assert len(budgets.check(budget, 2.0, peak=2 << 20, rows=100,
+                             label='cell 3')) == 3
+    assert budgets.check(dict(memory_mb=1.0), 1.0) == []
+
+
+def test_memory_tracker():
+    with budgets.MemoryTracker() as memory:
+        data = bytearray(4 << 20)
+    del data
+
+    assert memory.peak >= 4 << 20
+    with budgets.MemoryTracker(enabled=False) as memory:
+        pass
+    assert memory.peak is None
+
+
+def test_memory_tracker_nested():
+    with budgets.MemoryTracker() as memory:
+        with budgets.MemoryTracker():
+            data = bytearray(16 << 20)
+            del data
+        with budgets.MemoryTracker() as cell_memory:
+            pass
+
+    assert cell_memory.peak < 1 << 20
+    assert memory.peak >= 16 << 20
+
+
+def test_compare_and_flag(tmp_path):
+    baseline_file = tmp_path / 'baseline.jsonl'
+    baseline_file.write_text('\n'.join(json.dumps(x) for x in [
+        dict(type='assert', path='a.ipynb', cell=2, seconds=0.1),
+        dict(type='assert', path='a.ipynb', cell=3, seconds=0.001),
+        dict(type='notebook', path='a.ipynb', seconds=1.0),
+        dict(type='notebook', path='b.ipynb', seconds=None),
+        dict(type='summary', results={})
+    ]) + '\n')
+    outcome = dict(result='OK', seconds=1.1, asserts=[
+        dict(cell=2, seconds=0.2), dict(cell=3, seconds=0.01)])
+
+    baseline = budgets.load_baseline(baseline_file)
+    slowdowns = budgets.compare(outcome, baseline['a.ipynb'], 0.2)
+
+    assert sorted(baseline) == ['a.ipynb']
+    assert slowdowns == ['cell 2 took 0.20s, 100% slower than the 0.10s '
+                         'baseline']
+    assert budgets.compare(outcome, baseline.get('c.ipynb')) == []
+    assert budgets.flag(outcome, slowdowns)['result'] == \
+        budgets.OVER_BUDGET_RESULT
+    assert budgets.flag(dict(outcome, result='KO'), slowdowns)['result'] == \
+        'KO'
+    assert budgets.flag(outcome, []) is outcome
+
+
+@pytest.mark.parametrize('asserts,budget,result,violations', [
+    ([('True', None)], dict(seconds=60), 'OK', 0),
+    ([('True', dict(seconds=0.0))], None, budgets.OVER_BUDGET_RESULT, 1),
+    ([('x = bytearray(8 << 20); True', dict(memory_mb=1))], None,
+     budgets.OVER_BUDGET_RESULT, 1),
+    ([('x = bytearray(8 << 20); True', None)], dict(memory_mb=64), 'OK', 0),
+    ([('x{} = bytearray(8 << 20); True'.format(i), dict(memory_mb=64))
+      for i in range(4)], dict(memory_mb=24), budgets.OVER_BUDGET_RESULT, 1),
+    ([('1000', dict(rows_per_second=1))], None, 'OK', 0),
+    ([('1000', dict(rows_per_second=1e12))], None,
+     budgets.OVER_BUDGET_RESULT, 1),
+    ([('True', dict(rows_per_second=1))], None, 'KO', 0),
+    ([('False', None)], dict(seconds=0.0), 'KO', 1)
+])
+def test__execute_notebook_budget(tmp_path, asserts, budget, result,
+                                  violations):
+    f = tmp_path / 'budget.ipynb'
+    _write_notebook(f, asserts, budget)
+
+    record = reporting._execute_notebook(f)
+
+    assert record['result'] == result
+    assert len(record['violations']) == violations
+
+
+def test_generate_summary_baseline(tmp_path, monkeypatch):
+    monkeypatch.setattr(reporting, 'BASE_DIR', tmp_path)
+    root = tmp_path / 'framework' / 'version'
+    _write_notebook(root / 'slow.ipynb', [('import time; time.sleep(0.2); '
+                                           'True', None)])
+    _write_notebook(root / 'fast.ipynb', [('True', None)])
+    baseline = tmp_path / 'baseline.jsonl'
+    baseline.write_text(json.dumps(dict(type='notebook', path='slow.ipynb',
+                                        seconds=0.1)) + '\n')
+
+    reporting.generate_summary('framework', 'version', baseline=baseline,
+                               sinks=[('jsonl', str(baseline))])
+    results = {x['title']: x['supported'] for x in reporting.REPORTING_ITEMS}
+
+    assert results == {'fast.ipynb': 'OK',
+                       'slow.ipynb': budgets.OVER_BUDGET_RESULT}
+    notebooks = [json.loads(x) for x in baseline.read_text().splitlines()
+                 if json.loads(x)['type'] == 'notebook']
+    assert [len(x['violations']) for x in notebooks] == [0, 1]
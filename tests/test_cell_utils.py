@@ -108,3 +108,57 @@ def test_get_code():
     cell = {'cell_type': 'code', 'source': ['whatever', 'no']}
 
     assert get_code(cell) == 'whateverno'
+
+
+def test_cell():
+    cell = Cell('markdown', ['  # Asserts\n', 'whatever'])
+
+    assert cell.first_line == '# Asserts'
+    assert cell.is_title is True
+    assert cell.is_list is False
+    assert cell.is_assert is True
+    assert cell.is_markdown is True
+    assert cell.is_code is False
+    assert cell.code is None
+
+    cell = Cell('code', [' * a', 'b'])
+
+    assert cell.is_list is True
+    assert cell.is_title is False
+    assert cell.code == ' * ab'
+
+    cell = Cell('code', [])
+
+    assert cell.first_line == ''
+    assert not (cell.is_title or cell.is_list or cell.is_assert)
+
+
+def test_cell_slots():
+    with pytest.raises(AttributeError):
+        Cell('code', []).whatever = 1
+
+
+def test_cell_from_dict():
+    cell = Cell.from_dict({'cell_type': 'code', 'source': ['whatever', 'no']})
+
+    assert cell.kind == 'code'
+    assert cell.source == ['whatever', 'no']
+
+
+@pytest.mark.xfail(raises=AssertionError)
+def test_cell_from_dict_wrong():
+    Cell.from_dict({'cell_type': 'code', 'source': 'whatever'})
+
+
+def test_classify_cells():
+    record = Cell('code', ['a'])
+    cells = list(classify_cells([record, {'cell_type': 'markdown',
+                                          'source': ['# A']}]))
+
+    assert cells[0] is record
+    assert cells[1].is_title is True
+
+
+@pytest.mark.xfail(raises=IndexError)
+def test_get_first_line_empty():
+    get_first_line({'cell_type': 'code', 'source': []})
@@ -0,0 +1,64 @@
+import os
+import sys
+import json
+import subprocess
+
+import pytest
+
+from pathlib import Path
+from shutil import copyfile
+from nb2report import cli, reporting
+
+
+BASE_DIR = Path(os.environ['BASE_DIR'])
+TMP_DIR = Path(os.environ['TMP_DIR'])
+DUMMY_ASSERT_TRUE = Path(os.environ['DUMMY_ASSERT_TRUE'])
+
+
+def test_import_is_lazy():
+    code = ('import sys, nb2report.cli; '
+            'print(sorted({"IPython", "jinja2"} & set(sys.modules)))')
+    output = subprocess.run([sys.executable, '-c', code],
+                             stdout=subprocess.PIPE, check=True).stdout
+
+    assert output.decode().strip() == '[]'
+
+
+def test_main_requires_command():
+    with pytest.raises(SystemExit):
+        cli.main([])
+
+
+def test_main_run_and_render(monkeypatch):
+    monkeypatch.setattr(reporting, 'BASE_DIR', BASE_DIR)
+    root = TMP_DIR / 'cli'
+    root.mkdir()
+    copyfile(DUMMY_ASSERT_TRUE, root / 'a.ipynb')
+
+    cli.main(['run', '-n', 'tmp', '-v', 'cli', '--log-level', 'WARNING'])
+    (root / reporting.REPORTING_FILE_NAME).unlink()
+    cli.main(['render', '-n', 'tmp', '-v', 'cli'])
+
+    assert (root / reporting.REPORTING_FILE_NAME).is_file()
+
+
+def test_main_merge(monkeypatch):
+    monkeypatch.setattr(reporting, 'BASE_DIR', BASE_DIR)
+    root = TMP_DIR / 'cli_merge'
+    root.mkdir()
+    shard = TMP_DIR / 'cli_merge_shard.jsonl'
+    shard.write_text(json.dumps(dict(path='a.ipynb', result='OK')) + '\n')
+
+    cli.main(['merge', '-n', 'tmp', '-v', 'cli_merge', str(shard)])
+
+    assert (root / reporting.JOURNAL_FILE_NAME).read_text() == \
+        shard.read_text()
+
+
+def test_main_scaffold_dry_run(capsys):
+    schema = Path(os.environ['RESOURCES_DIR']) / 'HOW_TO.md'
+
+    cli.main(['scaffold', '-n', 'tmp', '-v', 'cli_scaffold', '-i',
+              str(schema), '--dry-run'])
+
+    assert capsys.readouterr().out.startswith('+ ')
@@ -0,0 +1,106 @@
+import json
+import multiprocessing
+
+import pytest
+
+from nb2report import concurrency, reporting, tracing
+from tests import write_notebook
+
+
+GB = 1 << 30
+
+
+def _double(x):
+    return x, dict(result='OK', peak_rss=x << 20)
+
+
+def _fail(x):
+    raise ValueError(x)
+
+
+def test_parse_bounds():
+    assert concurrency.parse_bounds('2:8') == (2, 8)
+    assert concurrency.parse_bounds('4') == (4, 4)
+
+    with pytest.raises(ValueError):
+        concurrency.parse_bounds('8:2')
+    with pytest.raises(ValueError):
+        concurrency.parse_bounds('0:2')
+
+
+def test_controller_update(tmp_path):
+    trace = tmp_path / 'trace.json'
+    controller = concurrency.Controller(1, 4)
+
+    tracing.start(trace)
+    try:
+        assert controller.update(0.5, 8 * GB, 16 * GB, 0) == 1  # idle slots
+        assert controller.update(0.5, 8 * GB, 16 * GB, 1) == 2
+        assert controller.update(0.5, 8 * GB, 16 * GB, 2) == 3
+        assert controller.update(0.99, 8 * GB, 16 * GB, 3) == 2
+        assert controller.update(0.8, 8 * GB, 16 * GB, 2) == 2
+        controller.target = 4
+        assert controller.update(0.5, GB, 16 * GB, 4) == 2  # memory
+        assert controller.update(0.5, GB, 16 * GB, 2) == 1
+        assert controller.update(0.99, GB, 16 * GB, 1) == 1  # minimum
+    finally:
+        tracing.stop()
+
+    spans = [x for x in map(json.loads, trace.read_text().splitlines())
+             if x['name'] == 'scale']
+    assert [(x['attrs']['previous'], x['attrs']['target'],
+             x['attrs']['reason']) for x in spans] == \
+        [(1, 2, 'cpu-low'), (2, 3, 'cpu-low'), (3, 2, 'cpu-high'),
+         (4, 2, 'memory'), (2, 1, 'memory')]
+
+
+def test_controller_admit():
+    controller = concurrency.Controller(1, 4, history={'a': 4 * GB})
+    controller.target = 3
+    controller.observe('b', GB)
+    controller.observe('c', 3 * GB)
+
+    assert controller.estimate('a') == 4 * GB
+    assert controller.estimate('d') == 2 * GB
+    assert controller.admit(8 * GB, [], GB, 16 * GB)  # minimum
+    assert controller.admit(4 * GB, [GB], 8 * GB, 16 * GB)
+    assert not controller.admit(6 * GB, [GB], 8 * GB, 16 * GB)
+    assert not controller.admit(0, [0, 0, 0], 8 * GB, 16 * GB)
+
+
+def test_peak_rss():
+    concurrency.reset_peak_rss()
+    data = bytearray(64 << 20)
+    data[::4096] = b'x' * len(data[::4096])
+
+    assert concurrency.peak_rss() >= 64 << 20
+    available, total = concurrency.memory()
+    assert 0 < available <= total
+    assert 0 <= concurrency.CpuSampler().utilisation() <= 1
+
+
+def test_run():
+    controller = concurrency.Controller(1, 2)
+    with multiprocessing.Pool(2) as pool:
+        results = list(concurrency.run(pool, _double, [1, 2, 3],
+                                       controller))
+
+        assert sorted(x[0] for x in results) == [1, 2, 3]
+        assert controller.history == {'1': 1 << 20, '2': 2 << 20,
+                                      '3': 3 << 20}
+        with pytest.raises(ValueError):
+            list(concurrency.run(pool, _fail, [1], controller))
+
+
+def test_generate_summary_adaptive(tmp_path, monkeypatch):
+    monkeypatch.setattr(reporting, 'BASE_DIR', tmp_path)
+    root = tmp_path / 'framework' / 'version'
+    write_notebook(root / 'a.ipynb', ['1 == 1'])
+    write_notebook(root / 'b.ipynb', ['1 == 2'])
+
+    reporting.generate_summary('framework', 'version', adaptive=(1, 2))
+    results = {x['title']: x['supported'] for x in reporting.REPORTING_ITEMS}
+
+    assert results == {'a.ipynb': 'OK', 'b.ipynb': 'KO'}
+    records = reporting.journal.load(root / reporting.JOURNAL_FILE_NAME)
+    assert all(x['peak_rss'] > 0 for x in records.values())
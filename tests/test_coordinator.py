@@ -0,0 +1,196 @@
+import os
+import sys
+import json
+import time
+import socket
+import threading
+import subprocess
+
+import pytest
+
+from pathlib import Path
+from shutil import copyfile
+from nb2report import archive, coordinator, reporting
+
+
+BASE_DIR = Path(os.environ['BASE_DIR'])
+TMP_DIR = Path(os.environ['TMP_DIR'])
+DUMMY_ASSERT_TRUE = Path(os.environ['DUMMY_ASSERT_TRUE'])
+DUMMY_ASSERT_FALSE = Path(os.environ['DUMMY_ASSERT_FALSE'])
+
+KEYS = ['a.ipynb', 'b.ipynb', 'c.ipynb', 'd.ipynb']
+
+
+def _start_worker(address, executed):
+    def _execute(key):
+        executed.append(key)
+        return dict(result='OK', seconds=0.0, asserts=[])
+
+    thread = threading.Thread(target=coordinator.work,
+                              args=(address, _execute),
+                              kwargs=dict(heartbeat_interval=0.1))
+    thread.start()
+    return thread
+
+
+def _pull_task(address):
+    """ Connect as a worker and pull a task without ever completing it. """
+    sock = socket.create_connection(address)
+    replies = sock.makefile('rb')
+    while True:
+        sock.sendall(b'{"type": "pull"}\n')
+        reply = json.loads(replies.readline().decode())
+        if reply['type'] == 'task':
+            return sock, reply['path']
+        time.sleep(0.05)
+
+
+def test_parse_address():
+    assert coordinator.parse_address('10.0.0.1:80') == ('10.0.0.1', 80)
+    assert coordinator.parse_address(':80') == ('localhost', 80)
+    assert coordinator.parse_address('0.0.0.0:80') == ('0.0.0.0', 80)
+
+
+def test__task_path(tmp_path):
+    root = tmp_path / 'root'
+    (root / 'A').mkdir(parents=True)
+    (tmp_path / 'outside.ipynb').touch()
+    (root / 'A' / 'link.ipynb').symlink_to(tmp_path / 'outside.ipynb')
+
+    assert reporting._task_path(root, 'A/a.ipynb') == root / 'A' / 'a.ipynb'
+    assert reporting._task_path(archive.Member('s.zip', 'root'), 'a.ipynb') \
+        == archive.Member('s.zip', 'root/a.ipynb')
+    for key in ['../outside.ipynb', 'A/../../outside.ipynb',
+                str(tmp_path / 'outside.ipynb'), 'A/link.ipynb']:
+        with pytest.raises(ValueError):
+            reporting._task_path(root, key)
+    with pytest.raises(ValueError):
+        reporting._task_path(archive.Member('s.zip', 'root'), '../a.ipynb')
+
+
+def test_serve():
+    executed = []
+    threads = []
+    results = list(coordinator.serve(
+        KEYS, ('127.0.0.1', 0),
+        on_listen=lambda x: threads.extend(
+            _start_worker(x, executed) for _ in range(2))
+    ))
+    for thread in threads:
+        thread.join(5)
+
+    assert sorted(x[0] for x in results) == KEYS
+    assert sorted(executed) == KEYS
+    assert not any(x.is_alive() for x in threads)
+
+
+def test_serve_requeues_disconnected_worker():
+    executed = []
+    dead = []
+
+    def _on_listen(address):
+        sock, key = _pull_task(address)
+        sock.close()
+        dead.append(key)
+        _start_worker(address, executed)
+
+    results = list(coordinator.serve(KEYS, ('127.0.0.1', 0),
+                                     on_listen=_on_listen))
+
+    assert sorted(x[0] for x in results) == KEYS
+    assert dead[0] in executed
+
+
+def test_serve_requeues_silent_worker():
+    executed = []
+    silent = []
+
+    def _on_listen(address):
+        silent.append(_pull_task(address))
+        _start_worker(address, executed)
+
+    results = list(coordinator.serve(KEYS, ('127.0.0.1', 0),
+                                     heartbeat_timeout=0.5,
+                                     on_listen=_on_listen))
+    silent[0][0].close()
+
+    assert sorted(x[0] for x in results) == KEYS
+    assert silent[0][1] in executed
+
+
+def test_serve_task_error():
+    threads = []
+
+    def _execute(key):
+        if key == 'b.ipynb':
+            raise LookupError('Asserts cell cannot be found')
+        return dict(result='OK', seconds=0.0, asserts=[])
+
+    results = dict(coordinator.serve(
+        KEYS, ('127.0.0.1', 0),
+        on_listen=lambda x: threads.append(threading.Thread(
+            target=coordinator.work, args=(x, _execute),
+            kwargs=dict(heartbeat_interval=0.1)
+        )) or threads[-1].start()
+    ))
+    threads[0].join(5)
+
+    assert sorted(results) == KEYS
+    assert results['b.ipynb']['result'] == coordinator.ERROR_RESULT
+    assert 'Asserts cell' in results['b.ipynb']['error']
+    assert [results[x]['result'] for x in KEYS if x != 'b.ipynb'] == \
+        ['OK'] * 3
+    assert not threads[0].is_alive()
+
+
+def test_serve_lost_task():
+    def _on_listen(address):
+        for _ in range(coordinator.MAX_ATTEMPTS):
+            sock, _ = _pull_task(address)
+            sock.close()
+
+    results = list(coordinator.serve(['a.ipynb'], ('127.0.0.1', 0),
+                                     on_listen=_on_listen))
+
+    assert results[0][0] == 'a.ipynb'
+    assert results[0][1]['result'] == coordinator.LOST_RESULT
+
+
+def test_generate_summary_serve(monkeypatch):
+    monkeypatch.setattr(reporting, 'BASE_DIR', BASE_DIR)
+    root = TMP_DIR / 'served'
+    (root / 'A').mkdir(parents=True)
+    copyfile(DUMMY_ASSERT_TRUE, root / 'A' / 'true.ipynb')
+    copyfile(DUMMY_ASSERT_FALSE, root / 'A' / 'false.ipynb')
+    copyfile(DUMMY_ASSERT_TRUE, root / 'true.ipynb')
+
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        port = sock.getsockname()[1]
+    code = ('import sys; from pathlib import Path; '
+            'from nb2report import reporting; '
+            'reporting.BASE_DIR = Path(sys.argv[1]); '
+            'reporting.run_worker("tmp", "served", ("127.0.0.1", {}))'
+            ).format(port)
+    workers = [subprocess.Popen([sys.executable, '-c', code, str(BASE_DIR)],
+                                cwd=str(BASE_DIR.parent))
+               for _ in range(2)]
+
+    reporting.generate_summary('tmp', 'served', serve=('127.0.0.1', port))
+    results = {x['title']: x['supported'] for x in reporting.REPORTING_ITEMS}
+
+    assert [x.wait(30) for x in workers] == [0, 0]
+    assert results == {'A': '', 'false.ipynb': 'KO', 'true.ipynb': 'OK'}
+    records = [json.loads(x) for x in
+               (root / reporting.JOURNAL_FILE_NAME).read_text().splitlines()]
+    assert sorted(x['path'] for x in records) == \
+        ['A/false.ipynb', 'A/true.ipynb', 'true.ipynb']
+
+
+@pytest.mark.parametrize('settings', [dict(fail_fast=True),
+                                      dict(max_memory=2048),
+                                      dict(profile_dir='profiles')])
+def test_generate_summary_serve_local_settings(settings):
+    with pytest.raises(ValueError, match=next(iter(settings))):
+        reporting.generate_summary('tmp', 'served', serve=('127.0.0.1', 0),
+                                   **settings)
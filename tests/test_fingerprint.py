@@ -0,0 +1,95 @@
+import os
+import sys
+import builtins
+import importlib.metadata
+
+import pytest
+
+from nb2report import fingerprint, reporting
+from tests import write_notebook
+
+
+def test_input_recorder(tmp_path, monkeypatch):
+    data = tmp_path / 'data.csv'
+    data.write_text('a,b\n')
+    (tmp_path / 'fp_module.py').write_text('VALUE = 1\n')
+    monkeypatch.syspath_prepend(str(tmp_path))
+    import_ = builtins.__import__
+
+    with fingerprint.InputRecorder() as recorder:
+        exec('import fp_module, json\nopen({!r}).read()\n'
+             'open({!r}, "w").close()'.format(str(data),
+                                               str(tmp_path / 'out.txt')),
+             dict(__name__='__main__'))
+    sys.modules.pop('fp_module')
+
+    assert builtins.__import__ is import_
+    assert recorder.modules == {'fp_module', 'json'}
+    assert recorder.paths() == [os.path.realpath(str(data)),
+                                os.path.realpath(str(tmp_path /
+                                                     'fp_module.py'))]
+    with fingerprint.InputRecorder(enabled=False) as recorder:
+        open(str(data)).close()
+    assert recorder.files == set()
+
+
+def test_input_recorder_installed_package():
+    jinja2 = pytest.importorskip('jinja2')
+
+    with fingerprint.InputRecorder() as recorder:
+        exec('import jinja2, json', dict(__name__='__main__'))
+        importlib.metadata.version('jinja2')
+
+    assert recorder.modules == {'jinja2', 'json'}
+    assert os.path.realpath(jinja2.__file__) in recorder.paths()
+    assert not [x for x in recorder.paths()
+                if x.startswith(fingerprint.EXCLUDED_DIRS)
+                and not x.startswith(fingerprint.INCLUDED_DIRS)]
+    assert not [x for x in recorder.paths() if '.dist-info' in x]
+
+
+def test_changed(tmp_path):
+    data = tmp_path / 'data.csv'
+    data.write_text('a,b\n')
+    inputs = [fingerprint.fingerprint(str(data))]
+
+    assert not fingerprint.changed(inputs)
+    os.utime(str(data), ns=(0, 0))
+    assert not fingerprint.changed(inputs)  # touched only
+    data.write_text('a,c\n')
+    assert fingerprint.changed(inputs)
+    data.unlink()
+    assert fingerprint.changed(inputs)
+    assert fingerprint.fingerprint(str(data)) is None
+
+
+def test_generate_summary_track_inputs(tmp_path, monkeypatch):
+    monkeypatch.setattr(reporting, 'BASE_DIR', tmp_path)
+    data = tmp_path / 'data.csv'
+    data.write_text('a,b\n')
+    root = tmp_path / 'framework' / 'version'
+    write_notebook(root / 'reads.ipynb',
+                   ['open({!r}).read() == "a,b\\n"'.format(str(data))])
+    write_notebook(root / 'pure.ipynb', ['1 == 1'])
+    executed = []
+    run_cell = reporting._run_cell
+    monkeypatch.setattr(reporting, '_run_cell',
+                        lambda x: executed.append(x) or run_cell(x))
+
+    def _run(resume):
+        del executed[:]
+        reporting.generate_summary('framework', 'version', resume=resume,
+                                   track_inputs=True)
+        results = {x['title']: x['supported']
+                   for x in reporting.REPORTING_ITEMS}
+        return results, len(executed)
+
+    assert _run(False) == ({'pure.ipynb': 'OK', 'reads.ipynb': 'OK'}, 2)
+    records = reporting.journal.load(root / reporting.JOURNAL_FILE_NAME)
+    assert [x[0] for x in records['reads.ipynb']['inputs']] == \
+        [os.path.realpath(str(data))]
+    assert records['pure.ipynb']['inputs'] == []
+
+    assert _run(True) == ({'pure.ipynb': 'OK', 'reads.ipynb': 'OK'}, 0)
+    data.write_text('a,c\n')
+    assert _run(True) == ({'pure.ipynb': 'OK', 'reads.ipynb': 'KO'}, 1)
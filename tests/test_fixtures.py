@@ -0,0 +1,90 @@
+import pytest
+
+from nb2report import fixtures, reporting
+from tests import write_notebook
+
+
+def test_find(tmp_path):
+    (tmp_path / 'A' / 'B').mkdir(parents=True)
+    (tmp_path / fixtures.SETUP_NAME).touch()
+    (tmp_path / 'A' / 'B' / fixtures.TEARDOWN_NAME).touch()
+    found = {}
+
+    assert fixtures.find(tmp_path, 'A/B/c.ipynb', found) == [
+        ('', tmp_path / fixtures.SETUP_NAME, None),
+        ('A/B', None, tmp_path / 'A' / 'B' / fixtures.TEARDOWN_NAME)
+    ]
+    assert sorted(found) == ['', 'A', 'A/B']
+    assert fixtures.find(tmp_path, 'c.ipynb', found) == \
+        fixtures.find(tmp_path, 'c.ipynb')[:1]
+
+
+def test_fixtures(tmp_path):
+    for directory in ['', 'A', 'A/B', 'C']:
+        (tmp_path / directory).mkdir(parents=True, exist_ok=True)
+    for name in ['_setup.ipynb', 'A/_setup.ipynb', 'A/_teardown.ipynb',
+                 'A/B/_teardown.ipynb', 'C/_setup.ipynb']:
+        (tmp_path / name).touch()
+    namespace = dict(builtin=True)
+    executed = []
+
+    def _execute(f):
+        key = f.relative_to(tmp_path).as_posix()
+        executed.append(key)
+        namespace[key] = True
+        return 'C failed' if key == 'C/_setup.ipynb' else None
+
+    fixtures_ = fixtures.Fixtures(tmp_path, _execute, lambda: namespace)
+
+    assert fixtures_.enter('A/a.ipynb') is None
+    namespace['leaked'] = True
+    assert fixtures_.enter('A/B/b.ipynb') is None
+    assert sorted(namespace) == ['A/_setup.ipynb', '_setup.ipynb', 'builtin']
+    assert fixtures_.enter('A/B/c.ipynb') is None
+    assert fixtures_.enter('C/d.ipynb') == 'C failed'
+    assert fixtures_.enter('C/D/e.ipynb') == 'C failed'
+    fixtures_.close()
+
+    assert executed == ['_setup.ipynb', 'A/_setup.ipynb',
+                        'A/B/_teardown.ipynb', 'A/_teardown.ipynb',
+                        'C/_setup.ipynb']
+    assert namespace == dict(builtin=True)
+
+
+@pytest.mark.parametrize('workers', [None, 2])
+def test_generate_summary_fixtures(tmp_path, monkeypatch, workers):
+    monkeypatch.setattr(reporting, 'BASE_DIR', tmp_path)
+    root = tmp_path / 'framework' / 'version'
+    log = tmp_path / 'fixtures.log'
+    write_notebook(root / fixtures.SETUP_NAME, [
+        'log = open({!r}, "a")'.format(str(log)),
+        'log.write("setup\\n"); log.flush()'
+    ], asserts=False)
+    write_notebook(root / fixtures.TEARDOWN_NAME, [
+        'log.write("teardown\\n"); log.close()'
+    ], asserts=False)
+    write_notebook(root / 'A' / fixtures.SETUP_NAME, ['rows = 3'],
+                   asserts=False)
+    write_notebook(root / 'A' / 'a.ipynb', ['leaked = rows; rows == 3'])
+    write_notebook(root / 'A' / 'b.ipynb',
+                   ['"leaked" not in globals() and rows == 3'])
+    write_notebook(root / 'B' / 'c.ipynb',
+                   ['"rows" not in globals() and not log.closed'])
+    write_notebook(root / 'F' / fixtures.SETUP_NAME, ['1 / 0'],
+                   asserts=False)
+    write_notebook(root / 'F' / 'f.ipynb', ['True'])
+
+    reporting.generate_summary('framework', 'version', workers=workers)
+    results = {x['title']: x['supported'] for x in reporting.REPORTING_ITEMS
+               if x['title'].endswith('.ipynb')}
+
+    assert results == {'a.ipynb': 'OK', 'b.ipynb': 'OK', 'c.ipynb': 'OK',
+                       'f.ipynb': fixtures.SETUP_FAILED_RESULT}
+    lines = log.read_text().splitlines()
+    assert lines.count('setup') == lines.count('teardown') >= 1
+    if workers is None:
+        assert lines == ['setup', 'teardown']
+    records = reporting.journal.load(root / reporting.JOURNAL_FILE_NAME)
+    assert [x[0] for x in records['A/a.ipynb']['inputs']] == \
+        [str(root / x) for x in (fixtures.SETUP_NAME, fixtures.TEARDOWN_NAME,
+                                 'A/' + fixtures.SETUP_NAME)]
@@ -0,0 +1,101 @@
+import json
+import os
+
+from pathlib import Path
+from nb2report import index
+from tests import write_notebook
+
+
+# Setup and environment asserts
+TMP_DIR = Path(os.environ['TMP_DIR'])
+DUMMY_ASSERT_TRUE = Path(os.environ['DUMMY_ASSERT_TRUE'])
+
+if not TMP_DIR.exists() or not TMP_DIR.is_dir():
+    raise FileNotFoundError('TMP_DIR has not been correctly initialized. '
+                            'Current value: %s' % TMP_DIR)
+#################################
+
+
+def _write_notebook(path, tags):
+    write_notebook(path, ['True'], metadata=dict(tags=tags))
+
+
+def test__read_tags():
+    path = TMP_DIR / 'index_tags' / 'nb.ipynb'
+    _write_notebook(path, ['a', 'b'])
+    broken = TMP_DIR / 'index_tags' / 'broken.json'
+    broken.write_text('{')
+
+    assert index._read_tags(path) == ['a', 'b']
+    assert index._read_tags(DUMMY_ASSERT_TRUE) == []
+    assert index._read_tags(broken) == []
+
+
+def test_update():
+    root = TMP_DIR / 'index'
+    index_path = root / 'index.json'
+    _write_notebook(root / 'A' / 'a.ipynb', ['fast'])
+    _write_notebook(root / 'A' / 'B' / 'b.ipynb', ['slow'])
+    (root / 'A' / 'notes.txt').touch()
+    (root / 'A' / 'script.py').write_text(
+        '\n# %% [markdown]\n# # Asserts\n\n# %%\n1 == 1\n')
+    (root / 'A' / 'helpers.py').write_text('VALUE = 1\n')
+
+    notebooks = index.update(root, index_path, ('.ipynb', '.py'))
+
+    assert sorted(notebooks) == ['A/B/b.ipynb', 'A/a.ipynb', 'A/script.py']
+    assert notebooks['A/a.ipynb']['tags'] == ['fast']
+    assert sorted(index.load(index_path)) == \
+        ['A/B/b.ipynb', 'A/a.ipynb', 'A/helpers.py', 'A/script.py']
+
+    # unchanged notebooks are not read again
+    read = []
+    read_tags = index._read_tags
+    index._read_tags = lambda x: read.append(x) or read_tags(x)
+    try:
+        _write_notebook(root / 'A' / 'a.ipynb', ['fast', 'smoke'])
+        os.utime(root / 'A' / 'a.ipynb', ns=(1, 1))
+        (root / 'A' / 'B' / 'b.ipynb').unlink()
+
+        notebooks = index.update(root, index_path, ('.ipynb', '.py'))
+    finally:
+        index._read_tags = read_tags
+
+    assert read == [str(root / 'A' / 'a.ipynb')]
+    assert notebooks['A/a.ipynb'] == dict(
+        mtime=1, size=notebooks['A/a.ipynb']['size'], tags=['fast', 'smoke'],
+        notebook=True)
+    assert sorted(notebooks) == ['A/a.ipynb', 'A/script.py']
+
+
+def test_load_wrong_version():
+    index_path = TMP_DIR / 'index_version.json'
+    index_path.write_text(json.dumps(dict(version=0, notebooks={'a': {}})))
+
+    assert index.load(index_path) == {}
+    assert index.load(TMP_DIR / 'missing.json') == {}
+
+
+def test__match_path():
+    assert index._match_path('A/B/c.ipynb', 'A/B/c.ipynb')
+    assert index._match_path('A/*/c.ipynb', 'A/B/c.ipynb')
+    assert index._match_path('A', 'A/B/c.ipynb')
+    assert index._match_path('A/B/', 'A/B/c.ipynb')
+    assert index._match_path('*/c.ipynb', 'A/B/c.ipynb')
+    assert not index._match_path('B', 'A/B/c.ipynb')
+    assert not index._match_path('A/C', 'A/B/c.ipynb')
+
+
+def test_select():
+    notebooks = {
+        'A/a.ipynb': dict(tags=['fast']),
+        'A/B/b.ipynb': dict(tags=['slow', 'db']),
+        'C/c.ipynb': dict(tags=[]),
+    }
+
+    assert sorted(index.select(notebooks)) == sorted(notebooks)
+    assert index.select(notebooks, tags=['db']) == ['A/B/b.ipynb']
+    assert sorted(index.select(notebooks, tags=['fast', 'db'])) == \
+        ['A/B/b.ipynb', 'A/a.ipynb']
+    assert index.select(notebooks, paths=['C']) == ['C/c.ipynb']
+    assert index.select(notebooks, tags=['fast'], paths=['A/B']) == []
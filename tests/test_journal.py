@@ -0,0 +1,89 @@
+import os
+
+from pathlib import Path
+from nb2report import journal
+
+
+# Setup and environment asserts
+TMP_DIR = Path(os.environ['TMP_DIR'])
+DUMMY_ASSERT_TRUE = Path(os.environ['DUMMY_ASSERT_TRUE'])
+DUMMY_ASSERT_FALSE = Path(os.environ['DUMMY_ASSERT_FALSE'])
+
+if not TMP_DIR.exists() or not TMP_DIR.is_dir():
+    raise FileNotFoundError('TMP_DIR has not been correctly initialized. '
+                            'Current value: %s' % TMP_DIR)
+#################################
+
+
+def test_hash_file():
+    assert journal.hash_file(DUMMY_ASSERT_TRUE) == \
+        journal.hash_file(DUMMY_ASSERT_TRUE)
+    assert journal.hash_file(DUMMY_ASSERT_TRUE) != \
+        journal.hash_file(DUMMY_ASSERT_FALSE)
+
+
+def test_append():
+    journal_path = TMP_DIR / 'test_append.jsonl'
+
+    with journal.open_journal(journal_path) as f:
+        journal.append(f, {'path': 'a.ipynb', 'result': 'OK'})
+
+    with journal.open_journal(journal_path, resume=True) as f:
+        journal.append(f, {'path': 'b.ipynb', 'result': 'KO'})
+
+    assert len(journal_path.read_text().splitlines()) == 2
+
+    with journal.open_journal(journal_path) as f:  # new run truncates
+        journal.append(f, {'path': 'c.ipynb', 'result': 'OK'})
+
+    assert list(journal.load(journal_path)) == ['c.ipynb']
+
+
+def test_append_after_killed_write():
+    journal_path = TMP_DIR / 'test_append_killed.jsonl'
+    journal_path.write_text('{"path": "a", "result": "OK"}\n'
+                            '{"path":"b","res')  # killed while writing
+
+    with journal.open_journal(journal_path, resume=True) as f:
+        journal.append(f, {'path': 'c', 'result': 'OK'})
+
+    assert sorted(journal.load(journal_path)) == ['a', 'c']
+
+    journal_path.write_text('{"path":"b","res')
+    with journal.open_journal(journal_path, resume=True) as f:
+        journal.append(f, {'path': 'c', 'result': 'OK'})
+
+    assert sorted(journal.load(journal_path)) == ['c']
+
+
+def test_load():
+    journal_path = TMP_DIR / 'test_load.jsonl'
+    journal_path.write_text(
+        '{"path": "a.ipynb", "result": "KO"}\n'
+        '{"path": "b.ipynb", "result": "OK"}\n'
+        '{"path": "a.ipynb", "result": "OK"}\n'
+        '{"path": "c.ipy'  # interrupted while writing
+    )
+
+    records = journal.load(journal_path)
+
+    assert sorted(records) == ['a.ipynb', 'b.ipynb']
+    assert records['a.ipynb']['result'] == 'OK'
+
+
+def test_load_missing():
+    assert journal.load(TMP_DIR / 'missing.jsonl') == {}
+
+
+def test_merge():
+    target = TMP_DIR / 'test_merge.jsonl'
+    shard1 = TMP_DIR / 'test_merge_1.jsonl'
+    shard2 = TMP_DIR / 'test_merge_2.jsonl'
+    target.write_text('{"path": "a.ipynb", "result": "KO"}\n')
+    shard1.write_text('{"path": "a.ipynb", "result": "OK"}\n'
+                      '{"path": "b.ipynb", "result": "KO"}\n')
+    shard2.write_text('{"path": "b.ipynb", "result": "OK"}\n')
+
+    assert journal.merge(target, [shard1, shard2]) == 2
+    assert {k: v['result'] for k, v in journal.load(target).items()} == \
+        {'a.ipynb': 'OK', 'b.ipynb': 'OK'}
@@ -0,0 +1,93 @@
+import os
+import json
+import pytest
+
+from pathlib import Path
+from shutil import copyfile
+from nb2report import kernels, reporting
+
+
+pytest.importorskip('jupyter_client')
+
+TMP_DIR = Path(os.environ['TMP_DIR'])
+DUMMY_ASSERT_TRUE = Path(os.environ['DUMMY_ASSERT_TRUE'])
+DUMMY_ASSERT_FALSE = Path(os.environ['DUMMY_ASSERT_FALSE'])
+
+
+def test_kernel_name():
+    notebook = json.loads(DUMMY_ASSERT_TRUE.read_text())
+
+    assert kernels.kernel_name(notebook) == 'python3'
+    assert kernels.kernel_name(dict(cells=[], metadata={})) == \
+        kernels.DEFAULT_KERNEL
+
+
+def test_execute():
+    tasks = [
+        ('structured', 'python3', [(2, 'print("noise"); 1 == 1')]),
+        ('false', 'python3', [(2, '1 == 2'), (3, '1 == 1')]),
+        ('error', 'python3', [(2, '1 / 0')]),
+        ('crash', 'python3', [(2, 'import ctypes; ctypes.string_at(0)')]),
+        ('after-crash', 'python3', [(2, 'True')]),
+        ('missing-kernel', 'no-such-kernel', [(2, 'True')]),
+        ('unplanned', None, LookupError('Asserts cell cannot be found'))
+    ]
+
+    results = dict(kernels.execute(tasks, 2, reporting._evaluate_kernel_output,
+                                   fail_fast=True))
+
+    assert sorted(results) == sorted(x[0] for x in tasks)
+    assert results['structured']['result'] == 'OK'
+    assert results['structured']['asserts'][0]['output'] == 'True'
+    assert results['false']['result'] == 'KO'
+    assert len(results['false']['asserts']) == 1
+    assert results['error']['asserts'][0]['output'].startswith(
+        'ZeroDivisionError')
+    assert results['crash']['result'] == kernels.CRASHED_RESULT
+    assert results['after-crash']['result'] == 'OK'
+    assert results['missing-kernel']['result'] == kernels.ERROR_RESULT
+    assert results['missing-kernel']['error'].startswith('NoSuchKernel')
+    assert results['unplanned'] == dict(
+        result=kernels.ERROR_RESULT, seconds=None, asserts=[],
+        error='LookupError: Asserts cell cannot be found')
+
+
+def test_execute_close():
+    tasks = [(x, 'python3', [(0, 'True')]) for x in range(4)]
+    executions = kernels.execute(tasks, 2, reporting._evaluate_kernel_output)
+
+    assert next(executions)[1]['result'] == 'OK'
+    executions.close()
+
+
+def test_generate_summary_kernels(monkeypatch):
+    monkeypatch.setattr(reporting, 'BASE_DIR', TMP_DIR.parent)
+    root = TMP_DIR / 'kernels'
+    root.mkdir()
+    copyfile(DUMMY_ASSERT_TRUE, root / 'true.ipynb')
+    copyfile(DUMMY_ASSERT_FALSE, root / 'false.ipynb')
+
+    reporting.generate_summary(TMP_DIR.name, 'kernels', max_kernels=2)
+    results = {x['title']: x['supported'] for x in reporting.REPORTING_ITEMS}
+
+    assert results == {'false.ipynb': 'KO', 'true.ipynb': 'OK'}
+    assert (root / reporting.REPORTING_FILE_NAME).exists()
+
+
+def test_generate_summary_kernels_errors(tmp_path, monkeypatch):
+    monkeypatch.setattr(reporting, 'BASE_DIR', tmp_path)
+    root = tmp_path / 'framework' / 'version'
+    root.mkdir(parents=True)
+    copyfile(DUMMY_ASSERT_TRUE, root / 'true.ipynb')
+    (root / 'no_asserts.ipynb').write_text(json.dumps(dict(
+        metadata={}, cells=[dict(cell_type='code', source=['True'])])))
+    (root / 'no_kernel.ipynb').write_text(json.dumps(dict(
+        metadata=dict(kernelspec=dict(name='no-such-kernel')),
+        cells=json.loads(DUMMY_ASSERT_TRUE.read_text())['cells'])))
+
+    reporting.generate_summary('framework', 'version', max_kernels=2)
+    results = {x['title']: x['supported'] for x in reporting.REPORTING_ITEMS}
+
+    assert results == {'no_asserts.ipynb': kernels.ERROR_RESULT,
+                       'no_kernel.ipynb': kernels.ERROR_RESULT,
+                       'true.ipynb': 'OK'}
@@ -0,0 +1,58 @@
+import os
+
+from pathlib import Path
+from nb2report import percent
+
+
+# Setup and environment asserts
+TMP_DIR = Path(os.environ['TMP_DIR'])
+RESOURCES_DIR = Path(os.environ['RESOURCES_DIR'])
+
+if not TMP_DIR.exists() or not TMP_DIR.is_dir():
+    raise FileNotFoundError('TMP_DIR has not been correctly initialized. '
+                            'Current value: %s' % TMP_DIR)
+#################################
+
+
+def test__new_cell():
+    assert percent._new_cell('# %%\n')['cell_type'] == 'code'
+    assert percent._new_cell('# %% Setup\n')['cell_type'] == 'code'
+    assert percent._new_cell('# %% [markdown]\n')['cell_type'] == 'markdown'
+    assert percent._new_cell('# %% Title [md]\n')['cell_type'] == 'markdown'
+
+
+def test__uncomment():
+    assert percent._uncomment('# # Asserts\n') == '# Asserts\n'
+    assert percent._uncomment('#\n') == '\n'
+    assert percent._uncomment('text\n') == 'text\n'
+
+
+def test_iter_cells():
+    cells = list(percent.iter_cells(RESOURCES_DIR / 'dummy_assert_false.py'))
+
+    assert [x['cell_type'] for x in cells] == \
+        ['code', 'markdown', 'code', 'code', 'code']
+    assert cells[1]['source'][0] == '# Asserts\n'
+    assert cells[3]['source'] == ['True == False\n']
+
+
+def test_iter_cells_header():
+    script = TMP_DIR / 'header.txt'
+    script.write_text('import os\n\n# %%\n\n# %%\nx = 1\n')
+
+    assert list(percent.iter_cells(script)) == [
+        dict(cell_type='code', source=['import os\n']),
+        dict(cell_type='code', source=['x = 1\n'])
+    ]
+
+
+def test_is_script(tmp_path):
+    helper = tmp_path / 'helpers.py'
+    helper.write_text('# Helpers\nVALUE = 1\n')
+    empty = tmp_path / 'empty.py'
+    empty.write_text('\n\n')
+
+    assert percent.is_script(RESOURCES_DIR / 'dummy_assert_false.py')
+    assert not percent.is_script(helper)
+    assert not percent.is_script(empty)
+    assert not percent.is_script(tmp_path / 'missing.py')
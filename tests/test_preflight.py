@@ -0,0 +1,88 @@
+import os
+import pytest
+
+from pathlib import Path
+from shutil import copyfile
+from nb2report import cli, preflight, reporting
+from tests import write_notebook
+
+
+DUMMY_ASSERT_TRUE = Path(os.environ['DUMMY_ASSERT_TRUE'])
+DUMMY_ASSERT_FALSE_PY = Path(os.environ['RESOURCES_DIR']) / \
+    'dummy_assert_false.py'
+
+
+def _cell(kind, *source):
+    return dict(cell_type=kind, source=list(source))
+
+
+@pytest.fixture
+def scaffold(tmp_path):
+    root = tmp_path / 'framework' / 'version'
+    root.mkdir(parents=True)
+    copyfile(DUMMY_ASSERT_TRUE, root / 'ok.ipynb')
+    copyfile(DUMMY_ASSERT_FALSE_PY, root / 'ok.py')
+    (root / 'A').mkdir()
+    (root / 'A' / 'broken.ipynb').write_text('{"cells": [')
+    write_notebook(root / 'A' / 'no_marker.ipynb',
+                   [_cell('code', 'True')], asserts=False)
+    write_notebook(root / 'B' / 'no_asserts.ipynb',
+                   [_cell('markdown', 'x')])
+    write_notebook(root / 'B' / 'empty.ipynb',
+                   [_cell('code'), _cell('code', 'True')])
+    return root
+
+
+def test_check_notebook(scaffold):
+    assert preflight.check_notebook(scaffold / 'ok.ipynb') == []
+    assert preflight.check_notebook(scaffold / 'ok.py') == []
+    assert preflight.check_notebook(scaffold / 'A' / 'broken.ipynb')[0][1] \
+        .startswith('Invalid JSON')
+    assert preflight.check_notebook(scaffold / 'A' / 'no_marker.ipynb') == \
+        [(None, 'Asserts cell cannot be found')]
+    assert preflight.check_notebook(scaffold / 'B' / 'no_asserts.ipynb') == \
+        [(0, 'No code assert after the asserts cell')]
+    assert preflight.check_notebook(scaffold / 'B' / 'empty.ipynb') == \
+        [(1, 'Empty cell source')]
+    assert preflight.check_notebook(scaffold / 'missing.ipynb')[0][1] \
+        .startswith('Cannot read notebook')
+
+
+@pytest.mark.parametrize('min_pool_notebooks', [0, 1000])
+def test_check(scaffold, monkeypatch, min_pool_notebooks):
+    monkeypatch.setattr(preflight, 'MIN_POOL_NOTEBOOKS', min_pool_notebooks)
+    notebooks = {x.relative_to(scaffold).as_posix(): x
+                 for x in scaffold.rglob('*') if x.is_file()}
+
+    problems = preflight.check(notebooks, workers=2)
+
+    assert [(x['path'], x['cell']) for x in problems] == [
+        ('A/broken.ipynb', None),
+        ('A/no_marker.ipynb', None),
+        ('B/empty.ipynb', 1),
+        ('B/no_asserts.ipynb', 0)
+    ]
+    assert preflight.format_report(problems[2:3]) == \
+        'B/empty.ipynb (cell 1): Empty cell source'
+
+
+def test_generate_summary_preflight(scaffold, monkeypatch):
+    monkeypatch.setattr(reporting, 'BASE_DIR', scaffold.parent.parent)
+
+    with pytest.raises(preflight.PreflightError) as error:
+        reporting.generate_summary('framework', 'version', preflight=True)
+
+    assert len(error.value.problems) == 4
+    assert 'A/no_marker.ipynb: Asserts cell cannot be found' in \
+        str(error.value)
+    assert not (scaffold / reporting.JOURNAL_FILE_NAME).exists()
+
+
+def test_main_preflight(scaffold, monkeypatch, capsys):
+    monkeypatch.setattr(reporting, 'BASE_DIR', scaffold.parent.parent)
+
+    status = cli.main(['preflight', '-n', 'framework', '-v', 'version',
+                       '--log-level', 'WARNING'])
+
+    assert status == 1
+    assert len(capsys.readouterr().out.splitlines()) == 4
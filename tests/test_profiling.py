@@ -0,0 +1,73 @@
+import os
+import json
+import pstats
+
+from pathlib import Path
+from shutil import copyfile
+from nb2report import profiling, reporting
+
+
+TMP_DIR = Path(os.environ['TMP_DIR'])
+DUMMY_ASSERT_TRUE = Path(os.environ['DUMMY_ASSERT_TRUE'])
+
+
+def _work(n):
+    return sum(range(n))
+
+
+def test_stats_path():
+    assert profiling.stats_path(Path('out'), 'A/b.ipynb') == \
+        Path('out') / 'A' / 'b.ipynb.pstats'
+
+
+def test_profile_call():
+    path = TMP_DIR / 'profile_call' / 'work.pstats'
+
+    assert profiling.profile_call(path, _work, 10) == 45
+    assert any(x[2] == '_work' for x in pstats.Stats(str(path)).stats)
+
+
+def test__label():
+    assert profiling._label(('/a/b.py', 3, 'f;g')) == 'f,g (b.py:3)'
+    assert profiling._label(('~', 0, '<built-in method len>')) == \
+        '<built-in method len>'
+
+
+def test_iter_stacks():
+    path = TMP_DIR / 'iter_stacks' / 'work.pstats'
+    profiling.profile_call(path, _work, 10 ** 6)
+
+    stacks = list(profiling.iter_stacks(pstats.Stats(str(path))))
+    work = [x for x in stacks if x[0][-1][2] == '_work']
+    assert len(work) == 1 and work[0][1] > 0
+
+
+def test_generate_summary_profile(monkeypatch):
+    monkeypatch.setattr(reporting, 'BASE_DIR', TMP_DIR.parent)
+    root = TMP_DIR / 'profiled' / 'root'
+    profile_dir = TMP_DIR / 'profiled' / 'out'
+    (root / 'A').mkdir(parents=True)
+    notebook = json.loads(DUMMY_ASSERT_TRUE.read_text())
+    notebook['cells'].append(dict(cell_type='code', metadata={},
+                                  source=['sum(range(10 ** 6)) > 0']))
+    (root / 'A' / 'a.ipynb').write_text(json.dumps(notebook))
+    copyfile(DUMMY_ASSERT_TRUE, root / 'b.ipynb')
+
+    reporting.generate_summary(TMP_DIR.name, 'profiled/root',
+                               profile_dir=profile_dir)
+
+    assert (profile_dir / 'A' / 'a.ipynb.pstats').is_file()
+    assert (profile_dir / 'b.ipynb.pstats').is_file()
+    assert (profile_dir / 'summary.html.pstats').is_file()
+
+    summary = json.loads(
+        (profile_dir / profiling.SUMMARY_FILE_NAME).read_text())
+    assert set(summary['profiles']) == \
+        {'A/a.ipynb', 'b.ipynb', 'summary.html'}
+    assert summary['profiles']['A/a.ipynb']['cells'] > 0
+    assert summary['profiles']['summary.html']['cells'] == 0
+    assert summary['profiles']['summary.html']['nb2report'] > 0
+
+    collapsed = (profile_dir / profiling.COLLAPSED_FILE_NAME).read_text()
+    assert all(x.rsplit(' ', 1)[1].isdigit() for x in collapsed.splitlines())
+    assert '<module> (<ipython-input-' in collapsed
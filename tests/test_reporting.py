@@ -1,8 +1,11 @@
 import pytest
 import os
+import json
 
 from pathlib import Path
+from shutil import copyfile
 from nb2report import reporting
+from tests import write_notebook
 
 
 # Setup and environment asserts
@@ -31,10 +34,22 @@ if not EMPTY_NOTEBOOK.exists() or not EMPTY_NOTEBOOK.is_file():
 
 
 def test__explore_scaffolding():
-    pass
+    root = TMP_DIR / 'explore'
+    (root / 'A' / 'B').mkdir(parents=True)
+    copyfile(DUMMY_ASSERT_TRUE, root / 'A' / 'B' / 'nb.ipynb')
+    copyfile(RESOURCES_DIR / 'dummy_assert_false.py', root / 'A' / 'nb.py')
+    (root / 'A' / 'notes.txt').touch()
+    (root / 'A' / 'helpers.py').write_text('VALUE = 1\n')
 
+    scaffold = reporting._explore_scaffolding(root, scaffold=[])
 
-def test__add_report():
+    assert [(x['path'].name, x['level'], x['notebook']) for x in scaffold] \
+        == [('A', 1, False), ('B', 2, False), ('nb.ipynb', 3, True),
+            ('nb.py', 2, True)]
+
+
+def test__add_report(monkeypatch):
+    monkeypatch.setattr(reporting, 'REPORTING_ITEMS', [])
     reporting._add_report('test1', 'OK', 'color1')
     reporting._add_report('test2', 'KO', 'color2')
 
@@ -57,6 +72,13 @@ def test__load_notebook():
     assert isinstance(reporting._load_notebook(EMPTY_NOTEBOOK), dict)
 
 
+def test__load_notebook_py():
+    notebook = reporting._load_notebook(RESOURCES_DIR / 'dummy_assert_false.py')
+
+    assert len(notebook['cells']) == 5
+    assert reporting._get_assert_cell_index(notebook['cells']) == 1
+
+
 def test__get_assert_cell_index():
     cells = [
         {
@@ -153,10 +175,31 @@ def test__evaluate_results():
 def test__execute_test():
     assert reporting._execute_test(DUMMY_ASSERT_TRUE) == 'OK'
     assert reporting._execute_test(DUMMY_ASSERT_FALSE) == 'KO'
+    assert reporting._execute_test(RESOURCES_DIR / 'dummy_assert_false.py') \
+        == 'KO'
+
+
+def test__execute_notebook():
+    record = reporting._execute_notebook(DUMMY_ASSERT_FALSE)
+
+    assert record['result'] == 'KO'
+    assert record['seconds'] >= sum(x['seconds'] for x in record['asserts'])
+    assert [x['passed'] for x in record['asserts']][:2] == [True, False]
+    assert record['asserts'][1]['output'] == 'False'
+
+
+def test__execute_test_fail_fast(monkeypatch):
+    executed = []
+    run_cell = reporting._run_cell
+    monkeypatch.setattr(reporting, '_run_cell',
+                        lambda x: executed.append(x) or run_cell(x))
 
+    assert reporting._execute_test(DUMMY_ASSERT_FALSE, fail_fast=True) == 'KO'
+    assert executed == ['True == True', 'True == False']
 
-def test_generate_summary():
-    reporting.BASE_DIR = BASE_DIR
+
+def test_generate_summary(monkeypatch):
+    monkeypatch.setattr(reporting, 'BASE_DIR', BASE_DIR)
     framework_fake_name = 'tmp'
     framework_fake_version = '.'
 
@@ -165,3 +208,246 @@ def test_generate_summary():
     reporting.generate_summary(framework_fake_name, framework_fake_version)
 
     assert summary_path.exists() and summary_path.is_file()
+
+
+def _make_resume_tree():
+    root = TMP_DIR / 'resume'
+    (root / 'A').mkdir(parents=True, exist_ok=True)
+    copyfile(DUMMY_ASSERT_TRUE, root / 'A' / 'true.ipynb')
+    copyfile(DUMMY_ASSERT_FALSE, root / 'A' / 'false.ipynb')
+    return root
+
+
+def _reported(title):
+    return next(x['supported'] for x in reporting.REPORTING_ITEMS
+                if x['title'] == title)
+
+
+def test_generate_summary_resume(monkeypatch):
+    monkeypatch.setattr(reporting, 'BASE_DIR', BASE_DIR)
+    root = _make_resume_tree()
+    journal_path = root / reporting.JOURNAL_FILE_NAME
+
+    reporting.generate_summary('tmp', 'resume')
+
+    records = [json.loads(x) for x in journal_path.read_text().splitlines()]
+    assert {x['path']: x['result'] for x in records} == \
+        {'A/false.ipynb': 'KO', 'A/true.ipynb': 'OK'}
+
+    # tamper the journal to prove recorded notebooks are not executed again
+    records[1]['result'] = 'KO'
+    journal_path.write_text(''.join(json.dumps(x) + '\n' for x in records))
+
+    reporting.generate_summary('tmp', 'resume', resume=True)
+    assert _reported('true.ipynb') == 'KO'
+    assert sorted(x['title'] for x in reporting.REPORTING_ITEMS) == \
+        ['A', 'false.ipynb', 'true.ipynb']
+
+    # modified notebooks are executed again
+    with open(root / 'A' / 'true.ipynb', 'a') as f:
+        f.write('\n')
+
+    reporting.generate_summary('tmp', 'resume', resume=True)
+    assert _reported('true.ipynb') == 'OK'
+
+
+def test_generate_partial_summary(monkeypatch):
+    monkeypatch.setattr(reporting, 'BASE_DIR', BASE_DIR)
+    root = _make_resume_tree()
+    (root / reporting.JOURNAL_FILE_NAME).write_text(
+        '{"path": "A/false.ipynb", "hash": "%s", "result": "KO"}\n'
+        % reporting.journal.hash_file(root / 'A' / 'false.ipynb')
+    )
+
+    reporting.generate_partial_summary('tmp', 'resume')
+
+    assert _reported('false.ipynb') == 'KO'
+    assert _reported('true.ipynb') == 'PENDING'
+    assert (root / reporting.REPORTING_FILE_NAME).exists()
+
+
+def test_generate_summary_maxfail(monkeypatch):
+    monkeypatch.setattr(reporting, 'BASE_DIR', BASE_DIR)
+    root = TMP_DIR / 'maxfail'
+    root.mkdir()
+    copyfile(DUMMY_ASSERT_FALSE, root / 'a.ipynb')
+    copyfile(DUMMY_ASSERT_FALSE, root / 'b.ipynb')
+    copyfile(DUMMY_ASSERT_TRUE, root / 'c.ipynb')
+
+    reporting.generate_summary('tmp', 'maxfail', maxfail=1)
+
+    assert _reported('a.ipynb') == 'KO'
+    assert _reported('b.ipynb') == 'SKIPPED'
+    assert _reported('c.ipynb') == 'SKIPPED'
+    assert 'skipped' in (root / reporting.REPORTING_FILE_NAME).read_text()
+
+    # skipped notebooks are executed when resuming
+    reporting.generate_summary('tmp', 'maxfail', resume=True)
+
+    assert _reported('b.ipynb') == 'KO'
+    assert _reported('c.ipynb') == 'OK'
+
+
+def test_generate_summary_sample(monkeypatch):
+    monkeypatch.setattr(reporting, 'BASE_DIR', BASE_DIR)
+    root = TMP_DIR / 'sample'
+    for leaf in ['A', 'B']:
+        (root / leaf).mkdir(parents=True)
+        for i in range(3):
+            copyfile(DUMMY_ASSERT_TRUE, root / leaf / '{}{}.ipynb'.format(leaf, i))
+
+    reporting.generate_summary('tmp', 'sample', sample=1, seed=0)
+
+    results = [_reported('{}{}.ipynb'.format(leaf, i))
+               for leaf in ['A', 'B'] for i in range(3)]
+    assert results[:3].count('OK') == 1 and results[:3].count('NOT RUN') == 2
+    assert results[3:].count('OK') == 1 and results[3:].count('NOT RUN') == 2
+    assert 'sampled 2 of 6' in (root / reporting.REPORTING_FILE_NAME).read_text()
+
+
+def test__select_scaffolding():
+    root = TMP_DIR / 'select'
+    for name in ['A/B/b.ipynb', 'A/a.ipynb', 'A/C/c.ipynb', 'D/d.ipynb']:
+        (root / name).parent.mkdir(parents=True, exist_ok=True)
+        copyfile(DUMMY_ASSERT_TRUE, root / name)
+
+    explored = reporting._explore_scaffolding(root, scaffold=[])
+    selected = reporting._select_scaffolding(root, paths=['A'])
+
+    assert selected == explored[:-2]
+    assert [x['path'].name for x in selected] == \
+        ['A', 'B', 'b.ipynb', 'C', 'c.ipynb', 'a.ipynb']
+    assert reporting._select_scaffolding(root, tags=['missing']) == []
+
+
+def test_generate_summary_workers(monkeypatch):
+    monkeypatch.setattr(reporting, 'BASE_DIR', BASE_DIR)
+    root = TMP_DIR / 'workers'
+    root.mkdir()
+    notebook = json.loads(DUMMY_ASSERT_TRUE.read_text())
+    notebook['cells'].append(dict(cell_type='code', metadata={},
+                                  source=['len(bytearray(64 << 30)) > 0']))
+    (root / 'a.ipynb').write_text(json.dumps(notebook))
+    copyfile(DUMMY_ASSERT_TRUE, root / 'b.ipynb')
+    copyfile(DUMMY_ASSERT_FALSE, root / 'c.ipynb')
+
+    reporting.generate_summary('tmp', 'workers', workers=2, max_memory=2048,
+                               max_tasks_per_worker=1)
+
+    assert _reported('a.ipynb') == 'OOM'
+    assert _reported('b.ipynb') == 'OK'
+    assert _reported('c.ipynb') == 'KO'
+
+
+@pytest.mark.parametrize('workers', [None, 2])
+def test_generate_summary_errors(tmp_path, monkeypatch, workers):
+    monkeypatch.setattr(reporting, 'BASE_DIR', tmp_path)
+    root = tmp_path / 'framework' / 'version'
+    write_notebook(root / 'no_asserts.ipynb', ['True'], asserts=False)
+    write_notebook(root / 'not_binary.ipynb', ['print("not binary")'])
+    copyfile(DUMMY_ASSERT_TRUE, root / 'ok.ipynb')
+
+    reporting.generate_summary('framework', 'version', workers=workers)
+
+    assert _reported('no_asserts.ipynb') == 'ERROR'
+    assert _reported('not_binary.ipynb') == 'ERROR'
+    assert _reported('ok.ipynb') == 'OK'
+    assert reporting._execute_task(root / 'no_asserts.ipynb')[1] == dict(
+        result='ERROR', seconds=None, asserts=[],
+        error='LookupError: Asserts cell cannot be found')
+    assert reporting._execute_task(root / 'not_binary.ipynb')[1]['error'] \
+        .startswith('SyntaxError')
+
+
+def test__execute_notebooks_cancel():
+    executions = reporting._execute_notebooks(
+        [DUMMY_ASSERT_FALSE] * 20,
+        workers=2
+    )
+
+    path, outcome = next(executions)
+    assert (path, outcome['result']) == (DUMMY_ASSERT_FALSE, 'KO')
+    executions.close()  # terminates the pool
+
+
+def test_generate_summary_mixed_formats(monkeypatch):
+    monkeypatch.setattr(reporting, 'BASE_DIR', BASE_DIR)
+    root = TMP_DIR / 'mixed'
+    (root / '.ipynb_checkpoints').mkdir(parents=True)
+    copyfile(DUMMY_ASSERT_TRUE, root / 'a.ipynb')
+    copyfile(RESOURCES_DIR / 'dummy_assert_false.py', root / 'b.py')
+    copyfile(DUMMY_ASSERT_FALSE, root / '.ipynb_checkpoints' / 'a.ipynb')
+
+    reporting.generate_summary('tmp', 'mixed')
+
+    assert _reported('a.ipynb') == 'OK'
+    assert _reported('b.py') == 'KO'
+    assert [x['path'] for x in reporting.journal.load(
+        root / reporting.JOURNAL_FILE_NAME).values()] == ['a.ipynb', 'b.py']
+
+
+def test__hash_executable(tmp_path):
+    notebook = json.loads(DUMMY_ASSERT_TRUE.read_text())
+    variants = [
+        notebook,
+        dict(notebook, cells=[dict(notebook['cells'][0],
+                                   source=['other setup'])]
+             + notebook['cells'][1:3]
+             + [dict(notebook['cells'][3],
+                     source=[notebook['cells'][3]['source'][0] + '  \n',
+                             '\n'])]),
+        dict(notebook, cells=notebook['cells'][:3]
+             + [dict(notebook['cells'][3], source=['False'])]),
+        dict(notebook, cells=notebook['cells'][:1])
+    ]
+    for i, variant in enumerate(variants):
+        (tmp_path / '{}.ipynb'.format(i)).write_text(json.dumps(variant))
+
+    hashes = [reporting._hash_executable(tmp_path / '{}.ipynb'.format(i))
+              for i in range(len(variants))]
+
+    assert hashes[0] == hashes[1] != hashes[2]
+    assert hashes[3] is None
+
+
+def test_generate_summary_dedup(monkeypatch):
+    monkeypatch.setattr(reporting, 'BASE_DIR', BASE_DIR)
+    root = TMP_DIR / 'dedup'
+    (root / 'A').mkdir(parents=True)
+    copyfile(DUMMY_ASSERT_TRUE, root / 'A' / 'a.ipynb')
+    copyfile(DUMMY_ASSERT_TRUE, root / 'A' / 'b.ipynb')
+    copyfile(DUMMY_ASSERT_TRUE, root / 'c.ipynb')
+    copyfile(DUMMY_ASSERT_FALSE, root / 'd.ipynb')
+    executed = []
+    run_cell = reporting._run_cell
+    monkeypatch.setattr(reporting, '_run_cell',
+                        lambda x: executed.append(x) or run_cell(x))
+
+    reporting.generate_summary('tmp', 'dedup', dedup=True)
+
+    assert [_reported(x) for x in ['a.ipynb', 'b.ipynb', 'c.ipynb',
+                                   'd.ipynb']] == ['OK', 'OK', 'OK', 'KO']
+    assert len(executed) == 5  # 2 asserts of a.ipynb, 3 of d.ipynb
+    records = reporting.journal.load(root / reporting.JOURNAL_FILE_NAME)
+    assert [x.get('duplicate_of') for x in records.values()] == \
+        [None, 'A/a.ipynb', 'A/a.ipynb', None]
+    assert '2 executions for 4 notebooks, 2 deduplicated' in \
+        (root / reporting.REPORTING_FILE_NAME).read_text()
+
+
+def test_generate_summary_helper_module(tmp_path, monkeypatch):
+    monkeypatch.setattr(reporting, 'BASE_DIR', tmp_path)
+    root = tmp_path / 'framework' / 'version'
+    root.mkdir(parents=True)
+    (root / 'nb_helpers.py').write_text('VALUE = 1\n')
+    (root / 'nb.ipynb').write_text(json.dumps(dict(metadata={}, cells=[
+        dict(cell_type='markdown', source=['# Asserts']),
+        dict(cell_type='code', source=['import nb_helpers\n',
+                                       'nb_helpers.VALUE == 1'])
+    ])))
+    monkeypatch.syspath_prepend(str(root))
+
+    reporting.generate_summary('framework', 'version')
+    results = {x['title']: x['supported'] for x in reporting.REPORTING_ITEMS}
+
+    assert results == {'nb.ipynb': 'OK'}
@@ -0,0 +1,57 @@
+import pytest
+
+from pathlib import PurePath
+from nb2report import sampling
+
+
+NOTEBOOKS = [PurePath('A/B/nb{}.ipynb'.format(i)) for i in range(10)] + \
+    [PurePath('A/C/nb{}.ipynb'.format(i)) for i in range(3)] + \
+    [PurePath('D/nb0.ipynb')]
+
+
+def test_parse_sample():
+    assert sampling.parse_sample('0.25') == 0.25
+    assert sampling.parse_sample('1.0') == 1.0
+    assert sampling.parse_sample('3') == 3
+    assert isinstance(sampling.parse_sample('1'), int)
+
+
+@pytest.mark.parametrize('value', ['0', '-1', '0.0', '1.5', 'a'])
+def test_parse_sample_wrong(value):
+    with pytest.raises(ValueError):
+        sampling.parse_sample(value)
+
+
+def test__sample_size():
+    assert sampling._sample_size(0.5, 10) == 5
+    assert sampling._sample_size(0.01, 10) == 1
+    assert sampling._sample_size(2, 10) == 2
+    assert sampling._sample_size(20, 10) == 10
+
+
+def test_select():
+    selected = sampling.select(NOTEBOOKS, 2, seed=1)
+
+    assert len(selected) == 5
+    assert len([x for x in selected if x.parent == PurePath('A/B')]) == 2
+    assert len([x for x in selected if x.parent == PurePath('A/C')]) == 2
+    assert PurePath('D/nb0.ipynb') in selected
+
+
+def test_select_fraction():
+    selected = sampling.select(NOTEBOOKS, 0.1, seed=1)
+
+    # every leaf directory gets at least one notebook
+    assert sorted(x.parent.as_posix() for x in selected) == ['A/B', 'A/C', 'D']
+
+
+def test_select_deterministic():
+    assert sampling.select(NOTEBOOKS, 0.5, seed=3) == \
+        sampling.select(list(reversed(NOTEBOOKS)), 0.5, seed=3)
+    assert sampling.select(NOTEBOOKS, 0.5, seed=3) != \
+        sampling.select(NOTEBOOKS, 0.5, seed=4)
+
+    # other directories do not change the selection of a directory
+    selected = sampling.select(NOTEBOOKS[:10], 0.5, seed=3)
+    assert selected == {x for x in sampling.select(NOTEBOOKS, 0.5, seed=3)
+                        if x.parent == PurePath('A/B')}
@@ -33,8 +33,35 @@ def test__load_schema():
     assert notebook is not None
 
 
-def test__setup_base_dir():
-    scaffolding.BASE_DIR = BASE_DIR
+def test__iter_markdown_schema():
+    schema = TMP_DIR / 'schema.md'
+    schema.write_text(
+        '# A\n'
+        'Some text\n'
+        '\n'
+        '  * a1\n'
+        '```\n'
+        '# not a title\n'
+        '```\n'
+        '## B\n'
+    )
+
+    assert [x.source for x in scaffolding._iter_markdown_schema(schema)] \
+        == [['# A\n'], ['  * a1\n'], ['## B\n']]
+
+
+def test__get_schema_cells():
+    md_plan = scaffolding._plan_scaffolding(
+        scaffolding._get_schema_cells(RESOURCES_DIR / 'HOW_TO.md'))
+    ipynb_plan = scaffolding._plan_scaffolding(
+        scaffolding._get_schema_cells(SCHEMA_FILE))
+
+    assert md_plan == ipynb_plan
+    assert len(md_plan['notebooks']) > 0
+
+
+def test__setup_base_dir(monkeypatch):
+    monkeypatch.setattr(scaffolding, 'BASE_DIR', BASE_DIR)
     framework_fake_name = 'tmp'
     framework_fake_version = 'test'
 
@@ -46,10 +73,6 @@ def test__setup_base_dir():
         .exists()
 
 
-def test__walk_path_test():
-    pass
-
-
 def test__get_new_level():
     no_level, no_title = scaffolding._get_new_level('', 0)
     level1, title = scaffolding._get_new_level('# A', 0)
@@ -73,23 +96,239 @@ def test__get_new_level():
     assert list_title == 'F'
 
 
-def test__generate_notebooks():
+def test__get_notebook_names():
     sources = [
-        '* NB1',
-        '* NB2'
+        '* NB1\n',
+        '  ** NB2',
+        'nada',
+        '*NB3'
     ]
 
-    empty_sources = []
+    assert scaffolding._get_notebook_names(sources) == ['NB1.ipynb', 'NB2.ipynb']
+    assert scaffolding._get_notebook_names(sources, 'py') == ['NB1.py', 'NB2.py']
+    assert scaffolding._get_notebook_names([]) == []
 
-    scaffolding._generate_notebooks(sources, TMP_DIR)
-    scaffolding._generate_notebooks(empty_sources, TMP_DIR)  # test no error
+
+def test__plan_scaffolding():
+    cells = [
+        {"cell_type": "markdown", "source": ["* root"]},
+        {"cell_type": "markdown", "source": ["# A"]},
+        {"cell_type": "markdown", "source": ["## B"]},
+        {"cell_type": "markdown", "source": ["* b1\n", "* b2"]},
+        {"cell_type": "markdown", "source": ["### C"]},
+        {"cell_type": "markdown", "source": ["## D"]},
+        {"cell_type": "markdown", "source": ["* d1"]},
+        {"cell_type": "markdown", "source": ["# E"]},
+        {"cell_type": "markdown", "source": ["* e1"]},
+    ]
+
+    plan = scaffolding._plan_scaffolding(cells)
+
+    assert plan['dirs'] == ['A', 'A/B', 'A/B/C', 'A/D', 'E']
+    assert plan['notebooks'] == [
+        'root.ipynb', 'A/B/b1.ipynb', 'A/B/b2.ipynb', 'A/D/d1.ipynb', 'E/e1.ipynb'
+    ]
+
+
+def test__generate_notebooks():
+    notebooks = ['NB1.ipynb', 'NB2.ipynb']
+
+    scaffolding._generate_notebooks(TMP_DIR, notebooks)
+    scaffolding._generate_notebooks(TMP_DIR, [])  # test no error
 
     assert Path(TMP_DIR / "NB1.ipynb").exists()
     assert Path(TMP_DIR / "NB2.ipynb").exists()
 
 
-def test__create_scaffolding():
-    scaffolding.BASE_DIR = BASE_DIR
+def test__materialize():
+    root = TMP_DIR / 'materialize'
+    plan = dict(dirs=['A', 'A/B', 'C'], notebooks=['A/B/nb.ipynb'])
+
+    scaffolding._materialize(plan, root)
+    scaffolding._materialize(plan, root)  # test no error
+
+    assert (root / 'A' / 'B' / 'nb.ipynb').is_file()
+    assert (root / 'C').is_dir()
+
+
+@pytest.mark.parametrize('strategy', scaffolding.MATERIALIZE_STRATEGIES)
+@pytest.mark.parametrize('threads', [1, None])
+def test__generate_notebooks_strategy(strategy, threads):
+    root = TMP_DIR / 'strategy_{}_{}'.format(strategy, threads)
+    root.mkdir()
+    (root / 'A').mkdir()
+    (root / 'keep.ipynb').write_text('my work')
+    notebooks = ['NB1.ipynb', 'A/NB2.ipynb', 'keep.ipynb']
+
+    scaffolding._generate_notebooks(root, notebooks, overwrite=False,
+                                    strategy=strategy, threads=threads)
+
+    template = scaffolding.TEMPLATE_NOTEBOOK_PATH.read_bytes()
+    assert (root / 'NB1.ipynb').read_bytes() == template
+    assert (root / 'A' / 'NB2.ipynb').read_bytes() == template
+    assert (root / 'keep.ipynb').read_text() == 'my work'
+
+    scaffolding._generate_notebooks(root, notebooks, strategy=strategy,
+                                    threads=threads)
+
+    assert (root / 'keep.ipynb').read_bytes() == template
+
+
+def test__generate_notebooks_hardlink(monkeypatch):
+    root = TMP_DIR / 'hardlink'
+    root.mkdir()
+    scaffolding._generate_notebooks(root, ['NB1.ipynb'], strategy='hardlink')
+    template = scaffolding.TEMPLATE_NOTEBOOK_PATH.read_bytes()
+
+    master = root / (scaffolding.TEMPLATE_MASTER_NAME + '.ipynb')
+    assert os.path.samefile(str(master), str(root / 'NB1.ipynb'))
+    assert (root / 'NB1.ipynb').stat().st_mode & 0o777 == \
+        scaffolding.READ_ONLY_MODE
+
+    # the master is kept while the template does not change
+    scaffolding._generate_notebooks(root, ['NB2.ipynb'], strategy='hardlink')
+    assert os.path.samefile(str(master), str(root / 'NB1.ipynb'))
+
+    # a new template keeps the old master aside, with its links
+    monkeypatch.setattr(scaffolding, '_get_template', lambda x: b'new')
+    scaffolding._generate_notebooks(root, ['NB3.ipynb'], strategy='hardlink')
+    assert not os.path.samefile(str(master), str(root / 'NB1.ipynb'))
+    assert master.read_bytes() == (root / 'NB3.ipynb').read_bytes() == b'new'
+
+    # read-only files which are not linked are left untouched
+    helpers = root / 'helpers.py'
+    helpers.write_text('VALUE = 1\n')
+    helpers.chmod(scaffolding.READ_ONLY_MODE)
+    inode = helpers.stat().st_ino
+
+    # materialized notebooks are writable and no longer shared
+    assert scaffolding._materialize_links(root) == ['NB1.ipynb',
+                                                    'NB2.ipynb',
+                                                    'NB3.ipynb']
+    (root / 'NB2.ipynb').write_text('my work')
+
+    assert (root / 'NB2.ipynb').read_text() == 'my work'
+    assert (root / 'NB1.ipynb').read_bytes() == template
+    assert master.read_bytes() == (root / 'NB3.ipynb').read_bytes() == b'new'
+    assert helpers.stat().st_ino == inode
+    assert helpers.stat().st_mode & 0o777 == scaffolding.READ_ONLY_MODE
+    assert scaffolding._materialize_links(root) == []
+
+
+@pytest.mark.xfail(raises=ValueError)
+def test__generate_notebooks_wrong_strategy():
+    scaffolding._generate_notebooks(TMP_DIR, [], strategy='whatever')
+
+
+def test__get_template():
+    template_path = scaffolding.TEMPLATE_NOTEBOOK_PATH
+
+    assert scaffolding._get_template(template_path) is \
+        scaffolding._get_template(template_path)
+    assert scaffolding._get_template(template_path) == \
+        template_path.read_bytes()
+
+
+@pytest.mark.parametrize('strategy', scaffolding.MATERIALIZE_STRATEGIES)
+def test__generate_notebooks_py(strategy):
+    root = TMP_DIR / 'py_{}'.format(strategy)
+    root.mkdir()
+
+    scaffolding._generate_notebooks(root, ['NB1.py'], strategy=strategy,
+                                    notebook_format='py')
+
+    assert (root / 'NB1.py').read_bytes() == \
+        scaffolding.TEMPLATE_SCRIPT_PATH.read_bytes()
+
+
+def test__generate_notebooks_keep_existing():
+    root = TMP_DIR / 'keep'
+    root.mkdir()
+    (root / 'NB1.ipynb').write_text('my work')
+
+    scaffolding._generate_notebooks(
+        root,
+        ['NB1.ipynb', 'NB2.ipynb'],
+        overwrite=False
+    )
+
+    assert (root / 'NB1.ipynb').read_text() == 'my work'
+    assert (root / 'NB2.ipynb').read_bytes() == \
+        scaffolding.TEMPLATE_NOTEBOOK_PATH.read_bytes()
+
+
+def test__update_manifest():
+    root = TMP_DIR / 'manifest'
+    root.mkdir()
+    assert scaffolding._load_manifest(root) == dict(dirs=[], notebooks=[])
+
+    plan = dict(dirs=['A', 'B'], notebooks=['A/a.ipynb', 'B/b.ipynb'])
+    scaffolding._materialize(plan, root)
+
+    previous = scaffolding._load_manifest(root)
+    assert scaffolding._update_manifest(root, plan, previous) == []
+    assert scaffolding._load_manifest(root) == plan
+
+    new_plan = dict(dirs=['A'], notebooks=['A/a.ipynb'])
+    (root / 'B' / 'b.ipynb').unlink()  # removed orphans are forgotten
+
+    previous = scaffolding._load_manifest(root)
+    assert scaffolding._update_manifest(root, new_plan, previous) == ['B']
+    assert scaffolding._load_manifest(root) == dict(
+        dirs=['A', 'B'],
+        notebooks=['A/a.ipynb']
+    )
+
+
+def test__create_scaffolding_sync(monkeypatch):
+    monkeypatch.setattr(scaffolding, 'BASE_DIR', BASE_DIR)
+    root = BASE_DIR / 'tmp' / 'sync'
+    cells = [
+        {"cell_type": "markdown", "source": ["# A"]},
+        {"cell_type": "markdown", "source": ["* a1\n", "* a2"]},
+        {"cell_type": "markdown", "source": ["# B"]},
+        {"cell_type": "markdown", "source": ["* b1"]},
+    ]
+
+    assert scaffolding._create_scaffolding('tmp', 'sync', cells) == []
+    (root / 'A' / 'a1.ipynb').write_text('my work')
+
+    cells[1]['source'].append('* a3')
+    orphans = scaffolding._create_scaffolding('tmp', 'sync', cells[:2],
+                                              sync=True)
+
+    assert (root / 'A' / 'a1.ipynb').read_text() == 'my work'
+    assert (root / 'A' / 'a3.ipynb').exists()
+    assert orphans == ['B', 'B/b1.ipynb']
+
+
+def test__diff_scaffolding():
+    root = TMP_DIR / 'diff'
+    (root / 'A').mkdir(parents=True)
+    (root / 'A' / 'a.ipynb').touch()
+    (root / 'A' / 'summary.html').touch()
+    (root / 'A' / 'old.py').write_text(
+        '# %% [markdown]\n# # Asserts\n\n# %%\n1 == 1\n')
+    (root / 'A' / 'helpers.py').write_text('VALUE = 1\n')
+    (root / 'A' / '_setup.ipynb').touch()
+    (root / '.template.ipynb').touch()
+    (root / 'A' / '.ipynb_checkpoints').mkdir()
+    (root / 'A' / '.ipynb_checkpoints' / 'a-checkpoint.ipynb').touch()
+    (root / 'Old').mkdir()
+    plan = dict(dirs=['A', 'B'], notebooks=['A/a.ipynb', 'B/b.ipynb'])
+
+    assert scaffolding._diff_scaffolding(plan, root) == [
+        ('=', 'A'),
+        ('+', 'B'),
+        ('=', 'A/a.ipynb'),
+        ('+', 'B/b.ipynb'),
+        ('-', 'A/old.py'),
+        ('-', 'Old'),
+    ]
+
+
+def test__create_scaffolding(monkeypatch):
+    monkeypatch.setattr(scaffolding, 'BASE_DIR', BASE_DIR)
     framework_fake_name = 'tmp'
     framework_fake_version = 'test'
 
@@ -137,22 +376,32 @@ def test__create_scaffolding():
     assert not file3.exists()
 
 
-def test__level_in():
-    # assert it works the first time
-    assert Path(scaffolding._level_in(TMP_DIR, "test_in")).exists()
-    # assert it still works
-    assert Path(scaffolding._level_in(TMP_DIR, "test_in")).exists()
+def test_create(monkeypatch):
+    monkeypatch.setattr(scaffolding, 'BASE_DIR', BASE_DIR)
+    framework_fake_name = 'tmp'
+    framework_fake_version = 'test'
+
+    scaffolding.create(framework_fake_name, framework_fake_version, SCHEMA_FILE)
+    # assert raises no error
+
+
+def test_create_markdown(monkeypatch):
+    monkeypatch.setattr(scaffolding, 'BASE_DIR', BASE_DIR)
 
+    scaffolding.create('tmp', 'markdown', RESOURCES_DIR / 'HOW_TO.md')
 
-def test__level_out():
-    assert Path(scaffolding._level_out(BASE_DIR / 'tmp')).resolve() == BASE_DIR
+    assert (TMP_DIR / 'markdown' / 'Estructuras de datos' /
+            '¿Qué estructuras de datos maneja?' / 'csv.ipynb').exists()
 
 
-def test_create():
-    scaffolding.BASE_DIR = BASE_DIR
+def test_create_dry_run(capsys, monkeypatch):
+    monkeypatch.setattr(scaffolding, 'BASE_DIR', BASE_DIR)
     framework_fake_name = 'tmp'
-    framework_fake_version = 'test'
+    framework_fake_version = 'dry_run'
 
-    scaffolding.create(framework_fake_name, framework_fake_version, SCHEMA_FILE)
-    # assert raises no error
+    scaffolding.create(framework_fake_name, framework_fake_version,
+                       SCHEMA_FILE, dry_run=True)
+
+    assert not (TMP_DIR / framework_fake_version).exists()
+    assert capsys.readouterr().out.startswith('+ ')
 
@@ -0,0 +1,112 @@
+import os
+import sys
+import json
+import subprocess
+import xml.etree.ElementTree as ET
+
+import pytest
+
+from pathlib import Path
+from shutil import copyfile
+from nb2report import reporting, sinks
+
+
+TMP_DIR = Path(os.environ['TMP_DIR'])
+DUMMY_ASSERT_TRUE = Path(os.environ['DUMMY_ASSERT_TRUE'])
+DUMMY_ASSERT_FALSE = Path(os.environ['DUMMY_ASSERT_FALSE'])
+
+
+RECORDS = [
+    dict(path='A/a.ipynb', result='KO', seconds=0.5, asserts=[
+        dict(cell=3, passed=True, output='True', seconds=0.1),
+        dict(cell=4, passed=False, output='False', seconds=0.2),
+    ]),
+    dict(path='b.ipynb', result='OOM', seconds=None, asserts=[]),
+    dict(path='c.ipynb', result='SKIPPED', seconds=None, asserts=[]),
+]
+
+
+def test_import_is_lazy():
+    code = ('import sys, nb2report.cli; '
+            'print(sorted({"xml.sax", "pstats", "zipfile", "tarfile"} '
+            '& set(sys.modules)))')
+    output = subprocess.run([sys.executable, '-c', code],
+                            stdout=subprocess.PIPE, check=True).stdout
+
+    assert output.decode().strip() == '[]'
+
+
+def test_parse_sink():
+    assert sinks.parse_sink('jsonl:a/b.jsonl') == ('jsonl', 'a/b.jsonl')
+
+    with pytest.raises(ValueError):
+        sinks.parse_sink('html:summary.html')
+    with pytest.raises(ValueError):
+        sinks.parse_sink('junit')
+
+
+def test_json_lines_sink():
+    path = TMP_DIR / 'sink.jsonl'
+    sink = sinks.JsonLinesSink(path)
+    for record in RECORDS:
+        sink.write(record)
+    sink.close()
+
+    lines = [json.loads(x) for x in path.read_text().splitlines()]
+    assert [x['type'] for x in lines] == \
+        ['assert', 'assert', 'notebook', 'notebook', 'notebook', 'summary']
+    assert lines[2]['failures'] == 1
+    assert lines[-1]['results'] == dict(KO=1, OOM=1, SKIPPED=1)
+
+
+def test_junit_sink():
+    path = TMP_DIR / 'sink.xml'
+    sink = sinks.JUnitSink(path)
+    sink.write(RECORDS[0])
+    assert path.read_text().count('<testcase') == 2  # streamed already
+    for record in RECORDS[1:]:
+        sink.write(record)
+    sink.close()
+
+    suites = ET.parse(str(path)).getroot().findall('testsuite')
+    assert [x.get('name') for x in suites] == [x['path'] for x in RECORDS]
+    assert [(x.get('tests'), x.get('failures'), x.get('errors'),
+             x.get('skipped')) for x in suites] == \
+        [('2', '1', '0', '0'), ('1', '0', '1', '0'), ('1', '0', '0', '1')]
+    assert suites[0].find('testcase').get('classname') == 'A.a'
+
+
+def test_junit_sink_violations():
+    path = TMP_DIR / 'sink_violations.xml'
+    sink = sinks.JUnitSink(path)
+    sink.write(dict(path='a.ipynb', result='OVER-BUDGET', seconds=2.0,
+                    asserts=[dict(cell=2, passed=True, output='True',
+                                  seconds=2.0)],
+                    violations=['cell 2 took 2.00s, over its 1.00s budget']))
+    sink.close()
+
+    suite = ET.parse(str(path)).getroot().find('testsuite')
+    assert (suite.get('tests'), suite.get('failures')) == ('2', '1')
+    assert suite.findall('testcase')[-1].get('name') == 'budget'
+    assert 'over its 1.00s budget' in \
+        suite.find('testcase/failure').get('message')
+
+
+def test_generate_summary_sinks(monkeypatch):
+    monkeypatch.setattr(reporting, 'BASE_DIR', TMP_DIR.parent)
+    root = TMP_DIR / 'sinks'
+    root.mkdir()
+    copyfile(DUMMY_ASSERT_TRUE, root / 'a.ipynb')
+    copyfile(DUMMY_ASSERT_FALSE, root / 'b.ipynb')
+    junit = TMP_DIR / 'sinks.xml'
+    jsonl = TMP_DIR / 'sinks.jsonl'
+
+    reporting.generate_summary(TMP_DIR.name, 'sinks',
+                               sinks=[('junit', junit), ('jsonl', jsonl)])
+
+    suites = ET.parse(str(junit)).getroot().findall('testsuite')
+    assert [(x.get('name'), x.get('failures')) for x in suites] == \
+        [('a.ipynb', '0'), ('b.ipynb', '1')]
+    lines = [json.loads(x) for x in jsonl.read_text().splitlines()]
+    assert lines[-1]['results'] == dict(OK=1, KO=1)
+    assert (root / reporting.REPORTING_FILE_NAME).is_file()
@@ -0,0 +1,74 @@
+import os
+import json
+import logging
+
+from pathlib import Path
+from shutil import copyfile
+from nb2report import reporting, tracing
+
+
+TMP_DIR = Path(os.environ['TMP_DIR'])
+DUMMY_ASSERT_TRUE = Path(os.environ['DUMMY_ASSERT_TRUE'])
+
+
+def _read_trace(path):
+    return [json.loads(x) for x in path.read_text().splitlines()]
+
+
+def test_span_disabled():
+    tracing.stop()
+
+    with tracing.span('load', path='a.ipynb') as span:
+        span.set(cells=3)
+
+    assert span is tracing.NULL_SPAN
+    assert tracing.current_path() is None
+
+
+def test_span():
+    path = TMP_DIR / 'trace_span.jsonl'
+    tracing.start(path)
+    try:
+        with tracing.span('outer', a=1):
+            with tracing.span('inner') as span:
+                span.set(b=2)
+        try:
+            with tracing.span('failing'):
+                raise ValueError()
+        except ValueError:
+            pass
+    finally:
+        tracing.stop()
+
+    inner, outer, failing = _read_trace(path)
+    assert (inner['name'], inner['attrs']) == ('inner', dict(b=2))
+    assert (outer['name'], outer['attrs']) == ('outer', dict(a=1))
+    assert inner['parent'] == outer['id'] and outer['parent'] is None
+    assert outer['duration'] >= inner['duration'] >= 0
+    assert failing['attrs'] == dict(error='ValueError')
+
+
+def test_generate_summary_trace(monkeypatch):
+    monkeypatch.setattr(reporting, 'BASE_DIR', TMP_DIR.parent)
+    root = TMP_DIR / 'traced'
+    root.mkdir()
+    copyfile(DUMMY_ASSERT_TRUE, root / 'a.ipynb')
+    path = TMP_DIR / 'trace_summary.jsonl'
+
+    tracing.start(path)
+    try:
+        reporting.generate_summary(TMP_DIR.name, 'traced')
+    finally:
+        tracing.stop()
+
+    spans = _read_trace(path)
+    assert [x['name'] for x in spans][0] == 'discovery'
+    assert [x['name'] for x in spans][-1] == 'render'
+    assert {x['name'] for x in spans} == \
+        {'discovery', 'load', 'execute-cell', 'evaluate', 'render'}
+    assert all(x['attrs']['result'] for x in spans if x['name'] == 'evaluate')
+
+
+def test_import_keeps_root_logging():
+    assert not any(x.__class__ is logging.StreamHandler
+                   for x in logging.getLogger().handlers)